@@ -0,0 +1,93 @@
+# the walkable graph of a grid in compressed sparse row (CSR) form: the
+# neighbors of cell i are targets[offsets[i]:offsets[i + 1]], so generating
+# them costs two array reads and a slice, with no bounds or blocked checks
+from array import array
+
+try:
+    import numpy as np
+except ImportError:     # numpy is optional; Adjacency falls back to a loop
+    np = None
+
+class Adjacency:
+    ''' class holding the open N/S/W/E neighbors of every cell of a grid
+        (cells addressed by their flat id, row * cols + col), in the same
+        N/S/W/E order the searches have always used; blocked cells have
+        neighbors too, but are never themselves a neighbor
+    '''
+    __slots__ = ("offsets", "targets", "_version")
+
+    def __init__(self, open_cells: bytes, cols: int, version: int = 0):
+        ''' initializer method for an Adjacency, building both arrays
+        Parameters:
+            open_cells: one byte per cell, non-zero if the cell may be moved
+                        into
+            cols:       number of columns in the grid
+            version:    the grid version the arrays were built from, so the
+                        owner can tell when they have gone stale
+        '''
+        n = len(open_cells)
+        rows = n // cols
+        self._version = version
+        if np is not None:
+            mask = np.frombuffer(bytes(open_cells), dtype = np.uint8).reshape(rows, cols) != 0
+            ids = np.arange(n, dtype = np.int32).reshape(rows, cols)
+            candidates = np.zeros((rows, cols, 4), dtype = np.int32)
+            valid = np.zeros((rows, cols, 4), dtype = bool)
+            # candidates[row, col, k] is the neighbor in direction k (N/S/W/E),
+            # and valid[row, col, k] says whether it exists and is open
+            candidates[1:, :, 0] = ids[:-1]
+            valid[1:, :, 0] = mask[:-1]
+            candidates[:-1, :, 1] = ids[1:]
+            valid[:-1, :, 1] = mask[1:]
+            candidates[:, 1:, 2] = ids[:, :-1]
+            valid[:, 1:, 2] = mask[:, :-1]
+            candidates[:, :-1, 3] = ids[:, 1:]
+            valid[:, :-1, 3] = mask[:, 1:]
+            # boolean indexing walks the cells in order, and each cell's
+            # directions in N/S/W/E order
+            self.targets = array('i', candidates[valid].tobytes())
+            counts = valid.sum(axis = 2, dtype = np.int32).ravel()
+            self.offsets = array('i', np.concatenate(([0], np.cumsum(counts))).astype(np.int32).tobytes())
+            return
+
+        offsets = array('i', [0]) * (n + 1)
+        targets = array('i')
+        for i in range(n):
+            col = i % cols
+            targets.extend([j for j in (i - cols if i >= cols else -1,
+                                        i + cols if i + cols < n else -1,
+                                        i - 1 if col > 0 else -1,
+                                        i + 1 if col + 1 < cols else -1)
+                            if j >= 0 and open_cells[j]])
+            offsets[i + 1] = len(targets)
+        self.offsets = offsets
+        self.targets = targets
+
+    def neighbors(self, i: int) -> array:
+        ''' returns the open neighbors of cell i '''
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def version(self) -> int:
+        ''' returns the grid version the arrays were built from '''
+        return self._version
+
+    def nbytes(self) -> int:
+        ''' returns the memory held by the two arrays, in bytes '''
+        return (len(self.offsets) + len(self.targets)) * self.offsets.itemsize
+
+def main():
+    # a 3x4 grid with a wall down the middle column except at the bottom
+    #   . . X .
+    #   . . X .
+    #   . . . .
+    open_cells = bytes([1, 1, 0, 1,
+                        1, 1, 0, 1,
+                        1, 1, 1, 1])
+    adjacency = Adjacency(open_cells, 4)
+    print(f"offsets {list(adjacency.offsets)}")
+    print(f"targets {list(adjacency.targets)}")
+    for i in range(len(open_cells)):
+        print(f"{i}: {list(adjacency.neighbors(i))}")
+
+if __name__ == "__main__":
+    main()
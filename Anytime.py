@@ -0,0 +1,297 @@
+# trading path quality for speed: weighted A* inflates the heuristic by a factor
+# w = 1 + epsilon, which makes the search dive at the goal and expand far fewer
+# cells, and with a consistent heuristic (and no re-expansions) the path it
+# finds is still at most w times the shortest; ARA* (anytime repairing A*)
+# runs it with a large w for a quick first path, then lowers w and repairs the
+# same search -- re-expanding only the cells whose cost went down -- for
+# better and better paths, each with a proven bound, until w reaches 1
+from Adjacency import *
+from FlatSearch import _finish
+from PriorityQueue import *
+from SearchStats import *
+from array import array
+from typing import Iterator, List, NamedTuple, Tuple
+import time
+
+# expansions between looks at the clock
+_CHECK_EVERY = 64
+
+def flat_bounded_a_star(passable: bytes, cols: int, start: int, goal: int, parents: array, \
+                        epsilon: float = 0.1, stats: SearchStats = None, \
+                        hooks: SearchHooks = None, adjacency: Adjacency = None) -> Tuple[int, int]:
+    ''' function to perform weighted A* over flat cell ids, ordering the queue
+        by f = g + (1 + epsilon) * h with the Manhattan distance as h; cells
+        are expanded at most once, and the path found is at most 1 + epsilon
+        times as long as the shortest (so at most 10% longer for 0.1)
+    Parameters:
+        epsilon: how far above the shortest the path may be, as a fraction
+                 of it (0 for plain A*)
+        the others as described for flat_dfs
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    Raises:
+        ValueError if epsilon is negative
+    '''
+    if epsilon < 0:
+        raise ValueError("epsilon must not be negative")
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(passable)
+    if adjacency is None:
+        adjacency = Adjacency(passable, cols)
+    offsets, targets = adjacency.offsets, adjacency.targets
+    weight = 1 + epsilon
+    cost = array('i', [-1]) * n     # g(n) for each cell, -1 if not yet seen
+    closed = bytearray(n)           # cells already expanded
+    goal_row, goal_col = divmod(goal, cols)
+    to_explore = IndexedPriorityQueue()
+
+    row, col = divmod(start, cols)
+    h = abs(goal_row - row) + abs(goal_col - col)
+    cost[start] = 0
+    to_explore.insert((weight * h, h), start)
+    num_pushes, pops, peak, found = 1, 0, 1, -1
+    if on_push is not None: on_push(start)
+
+    while not to_explore.is_empty():
+        i = to_explore.remove_min()._value
+        pops += 1
+        closed[i] = 1
+        if i == goal:
+            found = i
+            break
+        if on_expand is not None: on_expand(i)
+
+        updated_cost = cost[i] + 1
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if passable[j] and not closed[j] and (cost[j] < 0 or updated_cost < cost[j]):
+                cost[j] = updated_cost
+                row, col_j = divmod(j, cols)
+                h = abs(goal_row - row) + abs(goal_col - col_j)
+                to_explore.update_or_insert((updated_cost + weight * h, h), j)
+                parents[j] = i
+                num_pushes += 1
+                if on_push is not None: on_push(j)
+        if len(to_explore) > peak:
+            peak = len(to_explore)
+
+    _finish(stats, hooks, found, num_pushes, pops, pops - (found >= 0), peak)
+    return found, num_pushes
+
+class Improvement(NamedTuple):
+    ''' a path found by an anytime search, with what is known about it '''
+    cost:       int         # steps from the start to the goal
+    bound:      float       # proven: cost is at most bound times the shortest
+    weight:     float       # the heuristic weight of the round that found it
+    expansions: int         # cells expanded so far, over all rounds
+    elapsed:    float       # seconds spent searching so far
+    path:       list        # the cells from the start to the goal
+
+################################################################################
+class AnytimeSearch:
+    ''' class running ARA* over flat cell ids (cells addressed by row * cols
+        + col): each round is a weighted A* that picks up where the last one
+        stopped, so a round only re-expands cells whose cost has dropped;
+        the search can be stopped at any time and carried on later
+    '''
+    def __init__(self, passable: bytes, cols: int, start: int, goal: int, \
+                       epsilon: float = 1.0, decrement: float = 0.2, \
+                       stats: SearchStats = None, hooks: SearchHooks = None, \
+                       adjacency: Adjacency = None):
+        ''' initializer method for an AnytimeSearch; no search is done yet
+        Parameters:
+            passable:  one byte per cell, non-zero if the cell may be moved
+                       into (i.e., it is neither blocked nor the start)
+            cols:      number of columns in the grid
+            start:     id of the start cell
+            goal:      id of the goal cell
+            epsilon:   the first round's heuristic weight is 1 + epsilon
+            decrement: how much the weight drops after each round
+            stats:     optional SearchStats to add the counts of every round to
+            hooks:     optional SearchHooks to call as cells are pushed and
+                       expanded, and with the goal for every improvement
+            adjacency: Adjacency of the grid (one is built if None)
+        Raises:
+            ValueError if epsilon is negative or decrement isn't positive
+        '''
+        if epsilon < 0:
+            raise ValueError("epsilon must not be negative")
+        if decrement <= 0:
+            raise ValueError("decrement must be positive")
+        n = len(passable)
+        if adjacency is None:
+            adjacency = Adjacency(passable, cols)
+        self._passable  = passable
+        self._offsets, self._targets = adjacency.offsets, adjacency.targets
+        self._cols      = cols
+        self._start     = start
+        self._goal      = goal
+        self._goal_row, self._goal_col = divmod(goal, cols)
+        self._weight    = 1 + epsilon
+        self._decrement = decrement
+        self._stats     = stats
+        self._hooks     = hooks
+        self._cost      = array('i', [-1]) * n     # g(n), -1 if not yet seen
+        self._parents   = array('i', [-1]) * n
+        self._closed    = bytearray(n)     # expanded in the current round
+        self._stale     = bytearray(n)     # in _incons
+        self._incons: List[int] = []        # closed cells whose cost dropped since
+        self._open      = IndexedPriorityQueue()
+        self._cost[start] = 0
+        self._open.insert(self._key(start), start)
+        if hooks is not None and hooks.on_push is not None:
+            hooks.on_push(start)
+        self._best: Improvement = None
+        self._expansions = 0
+        self._elapsed    = 0.0
+        self._finished   = False
+
+    def _heuristic(self, i: int) -> int:
+        row, col = divmod(i, self._cols)
+        return abs(self._goal_row - row) + abs(self._goal_col - col)
+
+    def _key(self, i: int) -> Tuple[float, int]:
+        h = self._heuristic(i)
+        return (self._cost[i] + self._weight * h, h)
+
+    def done(self) -> bool:
+        ''' indicates whether the search has finished: it has a path proven
+            shortest, or has shown the goal can't be reached '''
+        return self._finished
+
+    def best(self) -> 'Improvement | None':
+        ''' returns the best path found so far (None if none yet) '''
+        return self._best
+
+    def _improvePath(self, deadline: float) -> bool:
+        ''' helper method running the current round's weighted A* until the
+            goal's cost is no more than the smallest key on the queue
+        Returns:
+            True if the round finished, False if the deadline came first
+        '''
+        on_push, on_expand = (None, None) if self._hooks is None else (self._hooks.on_push, self._hooks.on_expand)
+        passable, offsets, targets = self._passable, self._offsets, self._targets
+        cost, parents, closed, goal = self._cost, self._parents, self._closed, self._goal
+        weight, to_explore = self._weight, self._open
+        num_pushes, pops, peak, left = 0, 0, len(to_explore), _CHECK_EVERY
+        finished = True
+        while not to_explore.is_empty():
+            if cost[goal] >= 0 and cost[goal] <= to_explore.min()._key[0]:
+                break
+            left -= 1
+            if left == 0:
+                left = _CHECK_EVERY
+                if deadline is not None and time.perf_counter() >= deadline:
+                    finished = False
+                    break
+            i = to_explore.remove_min()._value
+            pops += 1
+            closed[i] = 1
+            if on_expand is not None: on_expand(i)
+
+            updated_cost = cost[i] + 1
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                if passable[j] and (cost[j] < 0 or updated_cost < cost[j]):
+                    cost[j] = updated_cost
+                    parents[j] = i
+                    if not closed[j]:
+                        h = self._heuristic(j)
+                        to_explore.update_or_insert((updated_cost + weight * h, h), j)
+                        num_pushes += 1
+                        if on_push is not None: on_push(j)
+                    elif not self._stale[j]:
+                        self._stale[j] = 1
+                        self._incons.append(j)
+            if len(to_explore) > peak:
+                peak = len(to_explore)
+        self._expansions += pops
+        if self._stats is not None:
+            self._stats.count(num_pushes, pops, pops, peak)
+        return finished
+
+    def _nextRound(self) -> float:
+        ''' helper method to start the next round: the weight is lowered, and
+            the cells left on the queue and those whose cost dropped after
+            they were expanded are queued again under the new weight
+        Returns:
+            the smallest g + h over those cells (a lower bound on the length
+            of a shortest path), or None if there are none
+        '''
+        waiting = [self._open.remove_min()._value for _ in range(len(self._open))]
+        waiting += self._incons
+        lower = None
+        for i in waiting:
+            estimate = self._cost[i] + self._heuristic(i)
+            if lower is None or estimate < lower:
+                lower = estimate
+        self._weight = max(1.0, self._weight - self._decrement)
+        for i in self._incons:
+            self._stale[i] = 0
+        self._incons = []
+        self._closed = bytearray(len(self._closed))
+        for i in waiting:
+            if not self._open.contains(i):
+                self._open.insert(self._key(i), i)
+        return lower
+
+    def improvements(self, deadline: float = None) -> Iterator[Improvement]:
+        ''' method to run rounds until the search is done or the deadline
+            passes, yielding each path that is shorter, or proven closer to
+            the shortest, than the one before; called again, it carries on
+            where it stopped
+        Parameters:
+            deadline: time.perf_counter() value to stop at (None for no limit)
+        Yields:
+            an Improvement for each better path; its path is a list of ids
+        '''
+        while not self._finished:
+            began = time.perf_counter()
+            finished = self._improvePath(deadline)
+            self._elapsed += time.perf_counter() - began
+            if not finished:
+                return
+            cost = self._cost[self._goal]
+            if cost < 0:
+                self._finished = True       # the goal can't be reached
+                return
+            # the parents may already give a shorter path than the goal's
+            # cost says, as cells on it can have been improved since
+            path = [self._goal]
+            while path[-1] != self._start:
+                path.append(self._parents[path[-1]])
+            path.reverse()
+            cost = len(path) - 1
+            weight = self._weight
+            began = time.perf_counter()
+            lower = self._nextRound()
+            self._elapsed += time.perf_counter() - began
+            bound = weight if lower is None or lower <= 0 else max(1.0, min(weight, cost / lower))
+            if lower is None or bound == 1.0 or weight == 1.0:
+                bound, self._finished = 1.0, True
+            if self._best is None or cost < self._best.cost or bound < self._best.bound:
+                self._best = Improvement(cost, bound, weight, self._expansions, self._elapsed, path)
+                if self._hooks is not None and self._hooks.on_goal is not None:
+                    self._hooks.on_goal(self._goal)
+                yield self._best
+
+    def run(self, time_limit: float = None) -> List[Improvement]:
+        ''' method to search for up to time_limit seconds (no limit if None)
+        Returns:
+            the Improvements found in this call
+        '''
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        return list(self.improvements(deadline))
+
+def main():
+    from Maze import Maze, Position
+    maze = Maze(200, 200, 0.3, Position(0, 0), Position(199, 199), compact = True, \
+                generator = "random", seed = 1)
+    print(maze.search("a_star"))
+    for epsilon in (0.1, 0.5, 2.0):
+        print(f"epsilon {epsilon}: {maze.search('bounded_a_star', epsilon = epsilon)}")
+    report = lambda found: print(f"  cost {found.cost}, at most {found.bound:.3f} x shortest "
+                                 f"(weight {found.weight:.1f}, {found.expansions} expansions, "
+                                 f"{found.elapsed * 1000:.1f} ms)")
+    print(maze.search("anytime_a_star", time_limit = 1.0, epsilon = 2.0, decrement = 0.5, on_improve = report))
+
+if __name__ == "__main__":
+    main()
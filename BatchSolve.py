@@ -0,0 +1,124 @@
+# solving many independent mazes across a process pool: only the specs (a few
+# numbers each) go to the workers, which generate each grid themselves and
+# search it there, so no grid or Cell graph ever crosses a process boundary
+# and generation runs in parallel with everything else; results stream back
+# chunk by chunk as they finish
+from Maze import *
+from Generators import generate
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+import itertools
+import os
+
+class MazeSpec(NamedTuple):
+    ''' what is needed to build and solve one maze '''
+    rows:         int
+    cols:         int
+    seed:         int
+    prop_blocked: float = 0.2
+    start:        Tuple[int, int] = (0, 0)
+    goal:         Tuple[int, int] = None    # defaults to the bottom-right cell
+    method:       str = "a_star"            # one of Maze.SEARCHES
+    generator:    str = "random"            # one of Maze.GENERATORS
+
+class BatchResult(NamedTuple):
+    ''' the outcome of one maze of a batch '''
+    index: int                          # position of the spec in the batch
+    spec:  MazeSpec
+    path:  'List[Tuple[int, int]] | None'   # (row, col) cells, start to goal
+    stats: Dict[str, object]            # SearchStats.as_dict() of the search
+
+def _goalOf(spec: MazeSpec) -> Tuple[int, int]:
+    return (spec.rows - 1, spec.cols - 1) if spec.goal is None else spec.goal
+
+def _check(spec: MazeSpec) -> None:
+    ''' raises ValueError for a spec that can't be solved as given '''
+    if spec.method not in Maze.SEARCHES:
+        raise ValueError(f"method must be one of {', '.join(Maze.SEARCHES)}")
+    if spec.generator not in Maze.GENERATORS:
+        raise ValueError(f"generator must be one of {', '.join(Maze.GENERATORS)}")
+    for row, col in (spec.start, _goalOf(spec)):
+        if not (0 <= row < spec.rows and 0 <= col < spec.cols):
+            raise ValueError(f"({row}, {col}) is outside the {spec.rows} x {spec.cols} grid")
+
+def _solveChunk(chunk: List[Tuple[int, MazeSpec]], paths: bool) -> List[BatchResult]:
+    ''' worker function: generates and solves the mazes of one chunk
+    Parameters:
+        chunk: (index in the batch, spec) of each maze
+        paths: whether to send back the paths, or only the stats
+    Returns:
+        a BatchResult for each maze
+    '''
+    results = []
+    for index, spec in chunk:
+        cells = bytearray(spec.rows * spec.cols)
+        start = spec.start[0] * spec.cols + spec.start[1]
+        goal_row, goal_col = _goalOf(spec)
+        generate(cells, spec.cols, start, goal_row * spec.cols + goal_col, spec.generator, \
+                 spec.prop_blocked, BLOCKED_CODE, EMPTY_CODE, spec.seed)
+        maze = Maze._fromCells(cells, spec.rows, spec.cols, Position(*spec.start), \
+                               Position(goal_row, goal_col), engine = "flat")
+        stats = maze.search(spec.method)
+        path = None
+        if paths and stats.found:
+            cell, path = maze.getGoal(), []
+            while cell is not None:
+                path.append(tuple(cell.getPosition()))
+                cell = cell._parent
+            path.reverse()
+        results.append(BatchResult(index, spec, path, stats.as_dict()))
+    return results
+
+def solve_batch(specs: Iterable[MazeSpec], workers: int = None, chunk_size: int = 32, \
+                paths: bool = True) -> Iterator[BatchResult]:
+    ''' function to solve many mazes in parallel, yielding results as they
+        come in (so not in spec order; see BatchResult.index); the specs are
+        consumed lazily, with at most two chunks per worker in flight, so an
+        endless stream of specs can be fed through
+    Parameters:
+        specs:      the mazes to solve
+        workers:    number of worker processes (the number of CPUs if None)
+        chunk_size: number of mazes sent to a worker at a time; bigger chunks
+                    cost less overhead, smaller ones stream results sooner
+        paths:      whether to return the paths, or only the stats
+    Returns:
+        an iterator of BatchResults, one per spec
+    Raises:
+        ValueError if a spec names an unknown method or generator, or has a
+        start or goal outside its grid
+    '''
+    workers = workers or os.cpu_count() or 1
+    numbered = enumerate(specs)
+    in_flight = set()           # futures of the chunks handed out
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        try:
+            while True:
+                while len(in_flight) < 2 * workers:
+                    chunk = list(itertools.islice(numbered, chunk_size))
+                    if not chunk:
+                        break
+                    for _, spec in chunk:
+                        _check(spec)
+                    in_flight.add(pool.submit(_solveChunk, chunk, paths))
+                if not in_flight:
+                    return
+                done, in_flight = wait(in_flight, return_when = FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+def main():
+    import time
+    specs = [MazeSpec(100, 100, seed, 0.25) for seed in range(200)]
+    for workers in (1, os.cpu_count() or 1):
+        began = time.perf_counter()
+        results = list(solve_batch(specs, workers, paths = False))
+        elapsed = time.perf_counter() - began
+        solved = sum(result.stats["found"] for result in results)
+        print(f"{workers} worker(s): {len(results)} mazes ({solved} solvable) in {elapsed:.2f} s, "
+              f"{len(results) / elapsed:.0f} mazes/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# benchmark harness: sweeps grid sizes, blocking densities and seeds over the
+# Maze search methods, writes what each search did to JSON, and can compare a
+# run against a stored baseline to catch performance regressions, e.g.
+#   python Benchmark.py --sizes 20 200 2000 --output run.json
+#   python Benchmark.py --baseline run.json --threshold 0.25
+#   python Benchmark.py --methods dijkstra terrain_a_star --max-weight 9 --queues bucket heap
+from Maze import *
+from Generators import random_weights
+from typing import Dict, List
+import argparse
+import json
+import platform
+
+# the searches that take step costs, and so a queue option
+WEIGHTED = ("dijkstra", "terrain_a_star")
+
+def run_case(size: int, density: float, seed: int, method: str, engine: str, \
+             memory: bool, repeat: int = 1, max_weight: int = 1, \
+             queue: str = None) -> Dict[str, object]:
+    ''' function to build one maze and run one search on it
+    Parameters:
+        size:    number of rows and columns of the (square) maze
+        density: proportion of cells blocked
+        seed:    seed for the maze generator
+        method:  the search to run, one of Maze.SEARCHES
+        engine:  the Maze engine to use, one of Maze.ENGINES
+        memory:  whether to run the search a second time under tracemalloc
+                 to measure its peak memory (the timed run is never traced)
+        repeat:  number of timed runs, each on a freshly built maze (so no
+                 cache carries over); the fastest one is kept
+        max_weight: if above 1, every cell gets a random step cost from 1 to
+                 max_weight (drawn with the same seed)
+        queue:   the priority queue for the WEIGHTED searches, one of
+                 Maze.QUEUES (None for the others)
+    Returns:
+        a dict describing the case and the search's stats
+    '''
+    def build() -> Maze:
+        maze = Maze(size, size, density, Position(0, 0), Position(size - 1, size - 1), \
+                    compact = True, engine = engine, generator = "random", seed = seed)
+        if max_weight > 1:
+            weights = bytearray(size * size)
+            random_weights(weights, max_weight, seed)
+            maze.set_weights(weights)
+        return maze
+
+    options = {} if queue is None else {"queue": queue}
+    stats = min((build().search(method, **options) for _ in range(repeat)), \
+                key = lambda stats: stats.wall_time)
+    case = {"size": size, "density": density, "seed": seed, "method": method, "engine": engine,
+            "max_weight": max_weight, "queue": queue}
+    case.update(stats.as_dict())
+    if memory:
+        case["memory_peak"] = build().search(method, trace_memory = True, **options).memory_peak
+    return case
+
+def sweep(sizes: List[int], densities: List[float], seeds: List[int], \
+          methods: List[str], engine: str, memory: bool, repeat: int, \
+          cell_limit: int, verbose: bool = True, max_weight: int = 1, \
+          queues: List[str] = ("bucket",), memory_limit: int = None) -> List[Dict[str, object]]:
+    ''' function to run every combination of size, density, seed and method
+        (and queue, for the WEIGHTED searches)
+    Parameters:
+        sizes, densities, seeds, methods, engine, memory, repeat, max_weight:
+                    see run_case
+        cell_limit: with the "cell" engine, the largest size to run
+                    dfs/bfs/a_star on (they walk Cell objects and are far too
+                    slow for big grids)
+        verbose:    whether to print each result as it comes in
+        queues:     the queues to run each of the WEIGHTED searches with
+        memory_limit: the largest size to measure memory on (tracemalloc
+                    makes the searches many times slower); no limit if None
+    Returns:
+        the list of results, one dict per case
+    '''
+    results = []
+    for size in sizes:
+        for density in densities:
+            for seed in seeds:
+                for method, queue in [(method, queue) for method in methods
+                                      for queue in (queues if method in WEIGHTED else (None,))]:
+                    if engine == "cell" and method in ("dfs", "bfs", "a_star") and size > cell_limit:
+                        continue
+                    traced = memory and (memory_limit is None or size <= memory_limit)
+                    case = run_case(size, density, seed, method, engine, traced, repeat, \
+                                    max_weight, queue)
+                    results.append(case)
+                    if verbose:
+                        memory_peak = "" if case["memory_peak"] is None else f", {case['memory_peak']} bytes"
+                        name = method if queue is None else f"{method}/{queue}"
+                        print(f"{size:>5} {density:<5} {seed:>3} {name:<21} "
+                              f"{case['wall_time'] * 1000:10.2f} ms, {case['pushes']} pushes, "
+                              f"{case['expansions']} expansions{memory_peak}")
+    return results
+
+def _key(case: Dict[str, object]) -> tuple:
+    # results from before weights were added have neither max_weight nor queue
+    return (case["method"], case.get("queue"), case["engine"], case["size"], case["density"], \
+            case["seed"], case.get("max_weight", 1))
+
+def compare(results: List[Dict[str, object]], baseline: List[Dict[str, object]], \
+            threshold: float, min_time: float) -> List[str]:
+    ''' function to compare a run against a baseline, case by case
+    Parameters:
+        results:   the cases of this run
+        baseline:  the cases of the baseline run
+        threshold: allowed slowdown as a fraction, e.g., 0.2 for 20%
+        min_time:  seconds below which a case is too quick to time reliably
+                   (its wall time is not compared)
+    Returns:
+        a list of messages, one for each regression: a case that became more
+        than threshold slower, or that now does more pushes/expansions, uses
+        more than threshold more memory, or finds a different result
+    '''
+    base = {_key(case): case for case in baseline}
+    regressions = []
+    for case in results:
+        old = base.get(_key(case))
+        if old is None:
+            continue
+        name = "{} queue={} engine={} size={} density={} seed={} max_weight={}".format(*_key(case))
+        if case["found"] != old["found"] or case["path_length"] != old["path_length"]:
+            regressions.append(f"{name}: path length {old['path_length']} -> {case['path_length']}")
+        elif case.get("path_cost") != old.get("path_cost", case.get("path_cost")):
+            regressions.append(f"{name}: path cost {old['path_cost']} -> {case['path_cost']}")
+        if max(case["wall_time"], old["wall_time"]) >= min_time and \
+           case["wall_time"] > old["wall_time"] * (1 + threshold):
+            regressions.append(f"{name}: wall time {old['wall_time'] * 1000:.2f} ms -> "
+                               f"{case['wall_time'] * 1000:.2f} ms")
+        for counter in ("pushes", "expansions"):
+            if case[counter] > old[counter]:
+                regressions.append(f"{name}: {counter} {old[counter]} -> {case[counter]}")
+        if case["memory_peak"] is not None and old["memory_peak"] is not None and \
+           case["memory_peak"] > old["memory_peak"] * (1 + threshold):
+            regressions.append(f"{name}: peak memory {old['memory_peak']} -> {case['memory_peak']} bytes")
+    return regressions
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description = "Benchmark the Maze search methods.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [20, 100, 500],
+                        help = "rows (and columns) of the mazes to generate (the defaults "
+                               "take a few minutes; larger sizes such as 2000 can take hours)")
+    parser.add_argument("--densities", type = float, nargs = "+", default = [0.1, 0.2, 0.3],
+                        help = "proportions of blocked cells")
+    parser.add_argument("--seeds", type = int, nargs = "+", default = [0, 1, 2],
+                        help = "generator seeds; each gives one maze per size and density")
+    parser.add_argument("--methods", nargs = "+", choices = Maze.SEARCHES, default = list(Maze.SEARCHES),
+                        help = "search methods to run")
+    parser.add_argument("--engine", choices = Maze.ENGINES, default = "flat",
+                        help = "Maze engine for dfs/bfs/a_star")
+    parser.add_argument("--max-weight", type = int, default = 1,
+                        help = "give cells random step costs from 1 to this (at most 255)")
+    parser.add_argument("--queues", nargs = "+", choices = Maze.QUEUES, default = list(Maze.QUEUES),
+                        help = "priority queues to run dijkstra and terrain_a_star with")
+    parser.add_argument("--cell-limit", type = int, default = 100,
+                        help = "largest size for dfs/bfs/a_star with the cell engine")
+    parser.add_argument("--repeat", type = int, default = 3,
+                        help = "timed runs per case; the fastest is kept")
+    parser.add_argument("--no-memory", action = "store_true",
+                        help = "skip the (slow) tracemalloc run of each case")
+    parser.add_argument("--memory-limit", type = int, default = 100,
+                        help = "largest size to run the tracemalloc run on")
+    parser.add_argument("--output", default = "benchmark.json",
+                        help = "file to write the results to")
+    parser.add_argument("--baseline", help = "results file to compare this run against")
+    parser.add_argument("--threshold", type = float, default = 0.2,
+                        help = "allowed slowdown against the baseline, as a fraction")
+    parser.add_argument("--min-time", type = float, default = 0.005,
+                        help = "seconds under which wall times are not compared")
+    parser.add_argument("--quiet", action = "store_true", help = "don't print each result")
+    args = parser.parse_args(argv)
+
+    results = sweep(args.sizes, args.densities, args.seeds, args.methods, args.engine,
+                    not args.no_memory, args.repeat, args.cell_limit, not args.quiet,
+                    args.max_weight, args.queues, args.memory_limit)
+    with open(args.output, "w") as file:
+        json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                   "results": results}, file, indent = 1)
+    print(f"wrote {len(results)} results to {args.output}")
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, args.threshold, args.min_time)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    print(f"{len(regressions)} regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# a bucket (Dial) queue: for searches whose priorities are small non-negative
+# integers that never drop below the last one removed -- as in Dijkstra's
+# algorithm, or A* with a consistent heuristic, when each step costs a small
+# integer -- a circular array of buckets, one per priority, gives O(1) insert
+# and remove_min in place of a heap's O(log n)
+from PriorityQueue import Entry, EmptyError
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+class BucketQueue(Generic[V]):
+    ''' class to implement a monotone priority queue of integer priorities,
+        where every priority inserted is at least the last one removed (or
+        the first one inserted, before any is removed) and at most span above
+        it; items with equal priorities come out newest first (which, in A*,
+        favors the cells deepest into the search). There is no decrease-key:
+        an item whose priority drops is inserted again, and the caller skips
+        the stale copy when it comes out
+    '''
+    __slots__ = ('_buckets', '_span', '_current', '_size')
+
+    def __init__(self, span: int):
+        ''' initializer method for a BucketQueue
+        Parameters:
+            span: the largest amount by which a priority may exceed the last
+                  one removed (e.g., the largest step cost, for Dijkstra)
+        Raises:
+            ValueError if span is negative
+        '''
+        if span < 0:
+            raise ValueError("span must not be negative")
+        self._buckets: list[list] = [list() for _ in range(span + 1)]
+        self._span:    int = span
+        self._current: int = None   # the last priority removed
+        self._size:    int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def is_empty(self) -> bool:
+        return self._size == 0
+
+    def insert(self, key: int, item: V) -> None:
+        ''' inserts an item
+        Parameters:
+            key:  the priority of the item
+            item: the item to insert
+        Raises:
+            ValueError if key is below the last priority removed, or more
+            than span above it
+        '''
+        if self._current is None:
+            self._current = key     # the first priority stands in for the last removed
+        elif not (self._current <= key <= self._current + self._span):
+            raise ValueError(f"priority {key} is outside [{self._current}, {self._current + self._span}]")
+        self._buckets[key % len(self._buckets)].append(item)
+        self._size += 1
+
+    def remove_min(self) -> Entry:
+        if self._size == 0:
+            raise EmptyError("can't remove from empty queue")
+        buckets, key = self._buckets, self._current
+        # at most span + 1 buckets are looked at, since the queue isn't empty
+        while not buckets[key % len(buckets)]:
+            key += 1
+        self._current = key
+        self._size -= 1
+        return Entry(key, buckets[key % len(buckets)].pop())
+
+    def min(self) -> Entry:
+        if self._size == 0:
+            raise EmptyError("can't remove from empty queue")
+        buckets, key = self._buckets, self._current
+        while not buckets[key % len(buckets)]:
+            key += 1
+        return Entry(key, buckets[key % len(buckets)][-1])
+
+def main():
+    bq = BucketQueue(span = 3)
+    bq.insert(2, 'task1')
+    bq.insert(4, 'task2')
+    bq.insert(2, 'task3')
+    print(f"Minimum element: {bq.min()}")
+    print(f"Removed: {bq.remove_min()}")
+    bq.insert(5, 'task4')       # anything in [2, 5] may now be inserted
+    print("Removing elements:")
+    while not bq.is_empty():
+        print(bq.remove_min())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# connected-component labels for the open cells of a grid, so "can a reach
+# b?" is answered by comparing two labels instead of running a search
+from Stack import *
+from array import array
+
+try:
+    import numpy as np
+except ImportError:     # numpy is optional; the labels are then flood-filled
+    np = None
+
+def _runLabels(open_cells: bytes, cols: int) -> 'np.ndarray':
+    ''' function to label the 4-connected components of a grid with NumPy
+        array operations: every horizontal run of open cells is a node, runs
+        touching in adjacent rows are joined, and the joins are resolved by
+        union-find done a whole array at a time (each round hooks every root
+        onto the smallest root it touches, then points every run straight
+        at its root)
+    Parameters:
+        open_cells: one byte per cell, non-zero if the cell is not blocked
+        cols:       number of columns in the grid
+    Returns:
+        an int32 array with one entry per cell: the component label (labels
+        are numbered 0, 1, ... in order of each component's first cell), or
+        -1 for blocked cells
+    '''
+    mask = np.frombuffer(bytes(open_cells), dtype = np.uint8).reshape(-1, cols) != 0
+    starts = mask.copy()
+    starts[:, 1:] &= ~mask[:, :-1]
+    runs = np.cumsum(starts.ravel(), dtype = np.int32).reshape(mask.shape) - 1
+    count = int(runs[-1, -1]) + 1 if mask.size else 0
+    # the cells open in two adjacent rows join the runs above and below;
+    # along a row, only the first cell of each such overlap needs keeping
+    both = mask[:-1] & mask[1:]
+    first = both.copy()
+    first[:, 1:] &= ~(both[:, :-1] & ~starts[:-1, 1:] & ~starts[1:, 1:])
+    upper, lower = runs[:-1][first], runs[1:][first]
+    parent = np.arange(count, dtype = np.int32)
+    while True:
+        a, b = parent[upper], parent[lower]
+        differ = a != b
+        if not differ.any():
+            break
+        np.minimum.at(parent, np.maximum(a, b)[differ], np.minimum(a, b)[differ])
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    # number the roots in order, so labels follow the cells' order
+    roots = parent == np.arange(count)
+    number = np.cumsum(roots) - 1
+    labels = np.full(mask.size, -1, dtype = np.int32)
+    flat = mask.ravel()
+    labels[flat] = number[parent[runs.ravel()[flat]]]
+    return labels
+
+class ComponentIndex:
+    ''' class that labels every open cell of a grid (cells addressed by their
+        flat id, row * cols + col) with the id of its 4-connected component,
+        and keeps the labels up to date as single cells are blocked/unblocked
+    '''
+    __slots__ = ("_open", "_cols", "_labels", "_sizes", "_next_label")
+
+    def __init__(self, open_cells: bytes, cols: int):
+        ''' initializer method for a ComponentIndex, labeling every component
+            once (with _runLabels if numpy is available, else by flood fill)
+        Parameters:
+            open_cells: one byte per cell, 1 if the cell is not blocked, 0 o/w
+            cols:       number of columns in the grid
+        '''
+        self._open:   bytearray = bytearray(open_cells)
+        self._cols:   int       = cols
+        self._labels: array     = array('i', [-1]) * len(open_cells)   # -1: blocked
+        self._sizes:  dict      = dict()    # label -> number of cells
+        self._next_label: int   = 0
+
+        if np is not None:
+            labels = _runLabels(self._open, cols)
+            self._labels = array('i', labels.tobytes())
+            sizes = np.bincount(labels[labels >= 0])
+            self._sizes = dict(enumerate(sizes.tolist()))
+            self._next_label = len(sizes)
+            return
+
+        # unlabeled holds a 1 for every open cell not yet given a label, so
+        # find() can skip straight to the next one in C
+        unlabeled = bytearray(self._open)
+        i = unlabeled.find(1)
+        while i >= 0:
+            label = self._newLabel()
+            for j in self._fill(i, -1, label):
+                unlabeled[j] = 0
+            i = unlabeled.find(1, i + 1)
+
+    def _newLabel(self) -> int:
+        label = self._next_label
+        self._next_label += 1
+        return label
+
+    def _neighbors(self, i: int) -> list:
+        ''' returns the open cells N/S/W/E of cell i '''
+        cols, n = self._cols, len(self._open)
+        col = i % cols
+        return [j for j in (i - cols if i >= cols else -1,
+                            i + cols if i + cols < n else -1,
+                            i - 1 if col > 0 else -1,
+                            i + 1 if col + 1 < cols else -1)
+                if j >= 0 and self._open[j]]
+
+    def _fill(self, seed: int, old: int, new: int) -> list:
+        ''' relabels the open cells connected to seed that carry label old
+        Returns:
+            the list of relabeled cells
+        '''
+        labels = self._labels
+        labels[seed] = new
+        filled = [seed]
+        stack = Stack()
+        stack.push(seed)
+        while not stack.is_empty():
+            i = stack.pop()
+            fresh = [j for j in self._neighbors(i) if labels[j] == old]
+            for j in fresh:
+                labels[j] = new
+            filled.extend(fresh)
+            stack.extend(fresh)
+        self._sizes[new] = self._sizes.get(new, 0) + len(filled)
+        return filled
+
+    def label(self, i: int) -> int:
+        ''' returns the component label of cell i, or -1 if it is blocked '''
+        return self._labels[i]
+
+    def connected(self, a: int, b: int) -> bool:
+        ''' indicates whether cells a and b are open and in the same component '''
+        return self._labels[a] >= 0 and self._labels[a] == self._labels[b]
+
+    def __len__(self) -> int:
+        ''' returns the number of components '''
+        return len(self._sizes)
+
+    def block(self, i: int) -> None:
+        ''' updates the labels after cell i becomes blocked: its component may
+            split, so each neighbor's part is re-flooded with a fresh label
+            (work proportional to the size of that one component)
+        '''
+        if not self._open[i]:
+            return
+        old = self._labels[i]
+        self._open[i] = 0
+        self._labels[i] = -1
+        del self._sizes[old]
+        for j in self._neighbors(i):
+            if self._labels[j] == old:
+                self._fill(j, old, self._newLabel())
+
+    def unblock(self, i: int) -> None:
+        ''' updates the labels after cell i becomes open: it joins (and merges)
+            the components of its neighbors, relabeling the smaller ones into
+            the largest, or starts a component of its own
+        '''
+        if self._open[i]:
+            return
+        self._open[i] = 1
+        neighbors = self._neighbors(i)
+        touching = {self._labels[j]: j for j in neighbors}
+        if not touching:
+            self._labels[i] = self._newLabel()
+            self._sizes[self._labels[i]] = 1
+            return
+        keep = max(touching, key = lambda label: self._sizes[label])
+        for label, j in touching.items():
+            if label != keep:
+                del self._sizes[label]
+                self._fill(j, label, keep)
+        self._labels[i] = keep
+        self._sizes[keep] += 1
+
+def main():
+    # two rooms split by a wall, then joined by opening one wall cell
+    #   . . X . .
+    #   . . X . .
+    open_cells = bytes([1, 1, 0, 1, 1,
+                        1, 1, 0, 1, 1])
+    index = ComponentIndex(open_cells, 5)
+    print(f"components: {len(index)}, 0 reaches 4: {index.connected(0, 4)}")
+    index.unblock(2)
+    print(f"components: {len(index)}, 0 reaches 4: {index.connected(0, 4)}")
+    index.block(2)
+    index.block(7)
+    print(f"components: {len(index)}, 0 reaches 4: {index.connected(0, 4)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# corridor contraction: random and perfect mazes are mostly corridors and dead
+# ends, so before searching, dead ends are filled in (a cell with one open
+# neighbor, other than the start or goal, can't be on a path between them),
+# and every chain of cells with exactly two open neighbors is collapsed into
+# one edge weighted by its length; the search then runs over the junctions
+# alone, and the corridors on its route are walked back out into cells
+from Adjacency import *
+from PriorityQueue import *
+from SearchStats import *
+from array import array
+from typing import Dict, Tuple
+import time
+
+class ContractedGraph:
+    ''' class holding the contracted graph of a grid for one start and goal:
+        its nodes are the junctions (cells left with other than two open
+        neighbors once dead ends are filled) and the start and goal, and its
+        edges are the corridors between them, in CSR form like Adjacency;
+        paths found over it are shortest paths in the grid
+    '''
+    def __init__(self, open_cells: bytes, cols: int, start: int, goal: int, \
+                       adjacency: Adjacency = None, version: int = 0):
+        ''' initializer method for a ContractedGraph, running the preprocessing
+        Parameters:
+            open_cells: one byte per cell, non-zero if the cell is not blocked
+            cols:       number of columns in the grid
+            start:      id of the start cell
+            goal:       id of the goal cell
+            adjacency:  Adjacency of the grid (one is built if None)
+            version:    the grid version the graph is built from, so the
+                        owner can tell when it has gone stale
+        '''
+        began = time.perf_counter()
+        n = len(open_cells)
+        if adjacency is None:
+            adjacency = Adjacency(open_cells, cols)
+        offsets, targets = adjacency.offsets, adjacency.targets
+        self._cols    = cols
+        self._start   = start
+        self._goal    = goal
+        self._version = version
+        self._offsets, self._targets = offsets, targets
+
+        # the open cells and the steps between them, before any reduction
+        self._open_cells = sum(1 for i in range(n) if open_cells[i])
+        self._open_edges = sum(offsets[i + 1] - offsets[i] for i in range(n) if open_cells[i]) // 2
+
+        # only the cells connected to the start can be on a path from it
+        kept = bytearray(n)         # 1 for the cells left after the reduction
+        reached = [start] if open_cells[start] else []
+        for i in reached:
+            kept[i] = 1
+        for i in reached:           # grows as it goes: a BFS
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                if not kept[j]:
+                    kept[j] = 1
+                    reached.append(j)
+        self._unreachable = self._open_cells - len(reached)
+
+        # dead-end filling: remove cells with at most one kept neighbor until
+        # none is left, which eats every dead-end branch back to its junction
+        degree = array('i', [0]) * n
+        for i in reached:
+            degree[i] = offsets[i + 1] - offsets[i]
+        ends = [i for i in reached if degree[i] <= 1 and i != start and i != goal]
+        self._dead_ends = 0
+        while ends:
+            i = ends.pop()
+            kept[i] = 0
+            self._dead_ends += 1
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                if kept[j]:
+                    degree[j] -= 1
+                    if degree[j] == 1 and j != start and j != goal:
+                        ends.append(j)
+        self._kept = kept
+
+        # the nodes: every kept cell that is not the middle of a corridor
+        self._node_of = array('i', [-1]) * n    # node number of each cell, -1 if none
+        self._nodes = array('i')                # cell id of each node
+        for i in reached:
+            if kept[i] and (degree[i] != 2 or i == start or i == goal):
+                self._node_of[i] = len(self._nodes)
+                self._nodes.append(i)
+
+        # the edges: from each node, follow each corridor to the node at its
+        # other end; an edge keeps the corridor's first cell, so the cells can
+        # be walked again when a path uses it
+        self._edge_offsets = array('i', [0])
+        self._edge_sources = array('i')     # node at the near end
+        self._edge_targets = array('i')     # node at the far end
+        self._edge_lengths = array('i')     # steps along the corridor
+        self._edge_firsts  = array('i')     # first cell after the near end
+        for u in self._nodes:
+            for first in targets[offsets[u]:offsets[u + 1]]:
+                if not kept[first]:
+                    continue
+                previous, i, length = u, first, 1
+                while self._node_of[i] < 0:
+                    previous, i = i, self._next(previous, i)
+                    length += 1
+                if i != u:          # a loop back to the same node is no use
+                    self._edge_sources.append(self._node_of[u])
+                    self._edge_targets.append(self._node_of[i])
+                    self._edge_lengths.append(length)
+                    self._edge_firsts.append(first)
+            self._edge_offsets.append(len(self._edge_targets))
+        self._build_seconds = time.perf_counter() - began
+
+    def _next(self, previous: int, i: int) -> int:
+        ''' returns the kept neighbor of corridor cell i other than previous '''
+        for j in self._targets[self._offsets[i]:self._offsets[i + 1]]:
+            if self._kept[j] and j != previous:
+                return j
+        raise ValueError(f"cell {i} is not in a corridor")
+
+    def version(self) -> int:
+        ''' returns the grid version the graph was built from '''
+        return self._version
+
+    def search(self, start: int, goal: int, parents: array, stats: SearchStats = None, \
+                     hooks: SearchHooks = None, heuristic: bool = True) -> Tuple[int, int]:
+        ''' method to find a shortest path from the start to the goal with A*
+            over the contracted graph (the Manhattan distance between the
+            ends of a corridor never exceeds its length, so the heuristic is
+            still consistent), then walk the corridors on the route
+        Parameters:
+            start:     id of the start cell (the one the graph was built for)
+            goal:      id of the goal cell (the one the graph was built for)
+            parents:   int array (one entry per cell) that receives, for every
+                       cell on the path, the id of the cell before it
+            stats:     optional SearchStats that receives the counts, which
+                       are of nodes rather than cells
+            hooks:     optional SearchHooks to call with the cell ids of the
+                       nodes as they are pushed/expanded
+            heuristic: False to run Dijkstra's algorithm instead
+        Returns:
+            a tuple (goal id or -1 if the goal can't be reached, number of
+            pushes)
+        Raises:
+            ValueError if start or goal is not the one the graph was built for
+        '''
+        if start != self._start or goal != self._goal:
+            raise ValueError("a ContractedGraph only answers queries between its own start and goal")
+        on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+        nodes, edge_offsets = self._nodes, self._edge_offsets
+        edge_targets, edge_lengths = self._edge_targets, self._edge_lengths
+        goal_row, goal_col = divmod(goal, self._cols)
+        def estimate(u: int) -> int:
+            if not heuristic:
+                return 0
+            row, col = divmod(nodes[u], self._cols)
+            return abs(goal_row - row) + abs(goal_col - col)
+
+        source, target = self._node_of[start], self._node_of[goal]
+        if source < 0 or target < 0:
+            if stats is not None:
+                stats.count(0, 0, 0, 0)
+            return -1, 0
+        cost = array('i', [-1]) * len(nodes)
+        via = array('i', [-1]) * len(nodes)     # edge each node was reached by
+        closed = bytearray(len(nodes))
+        to_explore = IndexedPriorityQueue()
+        h = estimate(source)
+        cost[source] = 0
+        to_explore.insert((h, h), source)
+        num_pushes, pops, peak, found = 1, 0, 1, -1
+        if on_push is not None: on_push(start)
+
+        while not to_explore.is_empty():
+            u = to_explore.remove_min()._value
+            pops += 1
+            closed[u] = 1
+            if u == target:
+                found = goal
+                break
+            if on_expand is not None: on_expand(nodes[u])
+            for e in range(edge_offsets[u], edge_offsets[u + 1]):
+                v = edge_targets[e]
+                updated_cost = cost[u] + edge_lengths[e]
+                if not closed[v] and (cost[v] < 0 or updated_cost < cost[v]):
+                    cost[v] = updated_cost
+                    via[v] = e
+                    h = estimate(v)
+                    to_explore.update_or_insert((updated_cost + h, h), v)
+                    num_pushes += 1
+                    if on_push is not None: on_push(nodes[v])
+            if len(to_explore) > peak:
+                peak = len(to_explore)
+
+        if stats is not None:
+            stats.count(num_pushes, pops, pops - (found >= 0), peak)
+        if found < 0:
+            return -1, num_pushes
+        v = target
+        while v != source:
+            v = self._expand(via[v], parents)
+        if hooks is not None and hooks.on_goal is not None:
+            hooks.on_goal(goal)
+        return found, num_pushes
+
+    def _expand(self, e: int, parents: array) -> int:
+        ''' helper method to set the parents along the corridor of edge e
+        Returns:
+            the node the edge starts from
+        '''
+        u = self._edge_sources[e]
+        previous, i = self._nodes[u], self._edge_firsts[e]
+        parents[i] = previous
+        while self._node_of[i] < 0:
+            previous, i = i, self._next(previous, i)
+            parents[i] = previous
+        return u
+
+    def stats(self) -> Dict[str, float]:
+        ''' method to report how much smaller the contracted graph is
+        Returns:
+            a dict with the open cells and steps between them in the grid,
+            the cells dropped as unreachable or filled as dead ends, the
+            nodes and edges left, the fraction of nodes and of edges removed,
+            the seconds the preprocessing took, and the memory held by the
+            graph's arrays in bytes
+        '''
+        edges = len(self._edge_targets) // 2
+        arrays = (self._node_of, self._nodes, self._edge_offsets, self._edge_sources, self._edge_targets,
+                  self._edge_lengths, self._edge_firsts)
+        return {"cells": self._open_cells, "steps": self._open_edges,
+                "unreachable": self._unreachable, "dead_ends": self._dead_ends,
+                "nodes": len(self._nodes), "edges": edges,
+                "node_reduction": 1 - len(self._nodes) / max(self._open_cells, 1),
+                "edge_reduction": 1 - edges / max(self._open_edges, 1),
+                "preprocessing_seconds": self._build_seconds,
+                "nbytes": len(self._kept) + sum(len(a) * a.itemsize for a in arrays)}
+
+def main():
+    from Maze import Maze, Position
+    for generator in ("random", "kruskal"):
+        maze = Maze(200, 200, 0.25, Position(0, 0), Position(199, 199), compact = True, \
+                    generator = generator, seed = 1)
+        print(f"{generator}: {maze.contraction().stats()}")
+        print(maze.search("a_star"))
+        print(maze.search("contracted_search"))     # the graph is already built
+
+if __name__ == "__main__":
+    main()
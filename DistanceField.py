@@ -0,0 +1,108 @@
+# whole-grid breadth-first distances computed one wavefront (BFS layer) at a
+# time with NumPy array operations, so there is no Python loop over cells
+from typing import List, Tuple
+
+try:
+    import numpy as np
+except ImportError:     # numpy is optional; only this module needs it
+    np = None
+
+def open_mask(codes: bytes, rows: int, cols: int, blocked_code: int) -> 'np.ndarray':
+    ''' function to view a flat buffer of cell contents codes (as kept by a
+        compact Maze) as a rows x cols boolean grid of open cells
+    Parameters:
+        codes:        one contents code per cell, indexed by row * cols + col
+        rows:         number of rows in the grid
+        cols:         number of columns in the grid
+        blocked_code: the code used for blocked cells
+    Returns:
+        a rows x cols boolean array, True where the cell is not blocked
+    Raises:
+        ImportError if numpy is not installed
+    '''
+    if np is None:
+        raise ImportError("open_mask requires numpy")
+    return np.frombuffer(codes, dtype=np.uint8).reshape(rows, cols) != blocked_code
+
+def wavefront(open_cells: 'np.ndarray', source: Tuple[int, int]) -> 'np.ndarray':
+    ''' function to compute the BFS distance from a source cell to every cell
+        of a grid, expanding a whole layer per step: the frontier is shifted
+        N/S/W/E over a copy of the grid padded with a blocked border (so no
+        bounds checks are needed), masked by the open cells not yet reached,
+        and becomes the next layer
+    Parameters:
+        open_cells: rows x cols boolean array, True where a cell can be entered
+        source:    (row, col) of the cell to measure distances from
+    Returns:
+        a rows x cols int32 array of distances, -1 where a cell is blocked or
+        can't be reached from the source
+    Raises:
+        ImportError if numpy is not installed
+    '''
+    if np is None:
+        raise ImportError("wavefront requires numpy")
+    rows, cols = open_cells.shape
+    width = cols + 2
+    padded = np.zeros((rows + 2, width), dtype=bool)
+    padded[1:-1, 1:-1] = open_cells
+    unseen = padded.ravel()             # open cells not yet reached
+    dist = np.full(unseen.shape, -1, dtype=np.int32)
+    owner = np.empty(unseen.shape, dtype=np.int64)
+    shifts = np.array([-width, width, -1, 1])
+
+    frontier = np.array([(source[0] + 1) * width + source[1] + 1])
+    if not unseen[frontier[0]]:
+        return dist.reshape(rows + 2, width)[1:-1, 1:-1].copy()
+    unseen[frontier] = False
+    layer = 0
+    while frontier.size:
+        dist[frontier] = layer
+        candidates = (frontier[:, None] + shifts).ravel()
+        candidates = candidates[unseen[candidates]]
+        # a cell can be next to several frontier cells; keep the first copy
+        # of each by letting every copy claim the cell and keeping the winner
+        owner[candidates] = np.arange(candidates.size)
+        frontier = candidates[owner[candidates] == np.arange(candidates.size)]
+        unseen[frontier] = False
+        layer += 1
+    return dist.reshape(rows + 2, width)[1:-1, 1:-1].copy()
+
+def descend(field: 'np.ndarray', target: Tuple[int, int]) -> List[Tuple[int, int]]:
+    ''' function to recover a shortest path from a distance field by gradient
+        descent: starting at the target, repeatedly step to a neighbor (tried
+        in N/S/W/E order) whose distance is one less, until distance 0
+    Parameters:
+        field:  a distance grid as returned by wavefront
+        target: (row, col) of the cell the path should end at
+    Returns:
+        a list of (row, col) tuples from the source to the target, or an empty
+        list if the target is unreachable
+    '''
+    rows, cols = field.shape
+    row, col = target
+    if field[row, col] < 0:
+        return []
+    path = [(row, col)]
+    while field[row, col] > 0:
+        step = field[row, col] - 1
+        for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= r < rows and 0 <= c < cols and field[r, c] == step:
+                row, col = r, c
+                break
+        path.append((row, col))
+    path.reverse()
+    return path
+
+def main():
+    if np is None:
+        print("numpy is not installed")
+        return
+    open_cells = np.array([[1, 1, 0, 1],
+                           [1, 1, 0, 1],
+                           [1, 1, 1, 1]], dtype=bool)
+    field = wavefront(open_cells, (0, 0))
+    print(field)
+    print(descend(field, (0, 3)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+# search kernels that work on integer cell ids (row * cols + col) rather than
+# on Cell objects, so a Maze of any size can be searched in linear time
+from Stack import *
+from Queue import *
+from PriorityQueue import *
+from BucketQueue import *
+from Adjacency import *
+from SearchStats import *
+from array import array
+from typing import Tuple
+
+def _csr(passable: bytes, cols: int, start: int, adjacency: Adjacency) -> tuple:
+    ''' helper function for the kernels that returns the (offsets, targets)
+        arrays to take neighbors from: those of adjacency if given (e.g., the
+        one a Maze caches), else ones built for this search, with the start
+        counted as open so that a search from the goal may step onto it '''
+    if adjacency is None:
+        open_cells = bytearray(passable)
+        open_cells[start] = 1
+        adjacency = Adjacency(open_cells, cols)
+    return adjacency.offsets, adjacency.targets
+
+def _finish(stats: SearchStats, hooks: SearchHooks, found: int, pushes: int, \
+            pops: int, expansions: int, peak_frontier: int) -> None:
+    ''' helper function for the kernels to hand their counts to stats (if
+        any) and report the goal to the on_goal hook (if any) '''
+    if stats is not None:
+        stats.count(pushes, pops, expansions, peak_frontier)
+    if found >= 0 and hooks is not None and hooks.on_goal is not None:
+        hooks.on_goal(found)
+
+def flat_dfs(passable: bytes, cols: int, start: int, goal: int, \
+             parents: array, stats: SearchStats = None, \
+             hooks: SearchHooks = None, adjacency: Adjacency = None) -> Tuple[int, int]:
+    ''' function to perform DFS (using a stack) over flat cell ids, visiting
+        neighbors in the same N/S/W/E order as Maze.getSearchLocations
+    Parameters:
+        passable: one byte per cell, non-zero if the cell may be moved into
+                  (i.e., it is neither blocked nor the start)
+        cols:     number of columns in the grid
+        start:    id of the start cell
+        goal:     id of the goal cell
+        parents:  int array (one entry per cell) that receives the id of the
+                  cell each visited cell was reached from
+        stats:    optional SearchStats that receives the counts of the search
+        hooks:    optional SearchHooks to call as cells are pushed/expanded
+        adjacency: optional Adjacency of the grid (with the start open) to
+                  take neighbors from; one is built for the search if None
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(passable)
+    offsets, targets = _csr(passable, cols, start, adjacency)
+    visited = bytearray(n)      # visited bitmap, one byte per cell
+    stack = Stack()
+    stack.push(start)
+    visited[start] = 1
+    num_pushes, pops, peak, found = 1, 0, 1, -1
+    if on_push is not None: on_push(start)
+
+    while not stack.is_empty():
+        i = stack.pop()
+        pops += 1
+        if i == goal:
+            found = i
+            break
+        if on_expand is not None: on_expand(i)
+
+        # the open neighbors, read off the CSR arrays
+        fresh = [j for j in targets[offsets[i]:offsets[i + 1]] if passable[j] and not visited[j]]
+        for j in fresh:
+            visited[j] = 1
+            parents[j] = i
+        stack.extend(fresh)
+        num_pushes += len(fresh)
+        if on_push is not None:
+            for j in fresh: on_push(j)
+        if num_pushes - pops > peak:    # every cell is pushed at most once
+            peak = num_pushes - pops
+
+    # every cell popped but the goal is expanded
+    _finish(stats, hooks, found, num_pushes, pops, pops - (found >= 0), peak)
+    return found, num_pushes
+
+def flat_bfs(passable: bytes, cols: int, start: int, goal: int, \
+             parents: array, stats: SearchStats = None, \
+             hooks: SearchHooks = None, adjacency: Adjacency = None) -> Tuple[int, int]:
+    ''' function to perform BFS (using a queue) over flat cell ids; see
+        flat_dfs for a description of the parameters
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(passable)
+    offsets, targets = _csr(passable, cols, start, adjacency)
+    visited = bytearray(n)
+    queue = Queue()
+    queue.push(start)
+    visited[start] = 1
+    num_pushes, pops, peak, found = 1, 0, 1, -1
+    if on_push is not None: on_push(start)
+
+    while not queue.is_empty():
+        i = queue.pop()
+        pops += 1
+        if i == goal:
+            found = i
+            break
+        if on_expand is not None: on_expand(i)
+
+        fresh = [j for j in targets[offsets[i]:offsets[i + 1]] if passable[j] and not visited[j]]
+        for j in fresh:
+            visited[j] = 1
+            parents[j] = i
+        queue.extend(fresh)
+        num_pushes += len(fresh)
+        if on_push is not None:
+            for j in fresh: on_push(j)
+        if num_pushes - pops > peak:
+            peak = num_pushes - pops
+
+    _finish(stats, hooks, found, num_pushes, pops, pops - (found >= 0), peak)
+    return found, num_pushes
+
+def flat_a_star(passable: bytes, cols: int, start: int, goal: int, \
+                parents: array, stats: SearchStats = None, \
+                hooks: SearchHooks = None, adjacency: Adjacency = None) -> Tuple[int, int]:
+    ''' function to perform A* (using an IndexedPriorityQueue) over flat cell
+        ids, with the Manhattan distance to the goal as the heuristic; each
+        cell is in the queue at most once and is expanded at most once; see
+        flat_dfs for a description of the parameters
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(passable)
+    offsets, targets = _csr(passable, cols, start, adjacency)
+    cost = array('i', [-1]) * n     # g(n) for each cell, -1 if not yet seen
+    closed = bytearray(n)           # cells already expanded
+    goal_row, goal_col = divmod(goal, cols)
+    to_explore = IndexedPriorityQueue()
+
+    row, col = divmod(start, cols)
+    h = abs(goal_row - row) + abs(goal_col - col)
+    cost[start] = 0
+    to_explore.insert((h, h), start)
+    num_pushes, pops, peak, found = 1, 0, 1, -1
+    if on_push is not None: on_push(start)
+
+    while not to_explore.is_empty():
+        i = to_explore.remove_min()._value
+        pops += 1
+        closed[i] = 1
+        if i == goal:
+            found = i
+            break
+        if on_expand is not None: on_expand(i)
+
+        updated_cost = cost[i] + 1      # cost is one step away from i
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if passable[j] and not closed[j] and \
+               (cost[j] < 0 or updated_cost < cost[j]):
+                cost[j] = updated_cost
+                row, col_j = divmod(j, cols)
+                h = abs(goal_row - row) + abs(goal_col - col_j)
+                to_explore.update_or_insert((updated_cost + h, h), j)
+                parents[j] = i
+                num_pushes += 1
+                if on_push is not None: on_push(j)
+        if len(to_explore) > peak:
+            peak = len(to_explore)
+
+    _finish(stats, hooks, found, num_pushes, pops, pops - (found >= 0), peak)
+    return found, num_pushes
+
+def _splice(parents: array, successors: array, meet: int, goal: int) -> None:
+    ''' helper function to join the two halves of a bidirectional search: the
+        successor chain from the meeting cell to the goal is reversed into
+        parents, so parents then leads from the goal all the way to the start
+    '''
+    i = meet
+    while i != goal:
+        parents[successors[i]] = i
+        i = successors[i]
+
+def flat_bidirectional_bfs(passable: bytes, cols: int, start: int, goal: int, \
+                           parents: array, stats: SearchStats = None, \
+                           hooks: SearchHooks = None, adjacency: Adjacency = None) -> Tuple[int, int]:
+    ''' function to perform BFS from the start and the goal at the same time,
+        one whole layer at a time, always growing the smaller frontier; when a
+        layer touches a cell labeled by the other side, the layer is finished
+        and the shortest of the joins seen is kept, which is optimal because
+        every cell on a shorter path would already carry both labels; see
+        flat_dfs for a description of the parameters
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(passable)
+    if start == goal:
+        _finish(stats, hooks, goal, 1, 1, 0, 1)
+        return goal, 1
+    offsets, targets = _csr(passable, cols, start, adjacency)
+    dist = (array('i', [-1]) * n, array('i', [-1]) * n)     # forward, backward
+    links = (parents, array('i', [-1]) * n)     # parents, successors
+    frontiers = ([start], [goal])
+    dist[0][start] = 0
+    dist[1][goal]  = 0
+    num_pushes, pops, peak, found = 2, 0, 2, -1
+    if on_push is not None: on_push(start); on_push(goal)
+    best, meet = -1, -1
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        mine, other, link = dist[side], dist[1 - side], links[side]
+        layer = []
+        for i in frontiers[side]:
+            if on_expand is not None: on_expand(i)
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                if mine[j] < 0:
+                    mine[j] = mine[i] + 1
+                    link[j] = i
+                    layer.append(j)
+                    num_pushes += 1
+                    if on_push is not None: on_push(j)
+                if other[j] >= 0 and (best < 0 or mine[j] + other[j] < best):
+                    best, meet = mine[j] + other[j], j
+        pops += len(frontiers[side])
+        frontiers = (layer, frontiers[1]) if side == 0 else (frontiers[0], layer)
+        if len(frontiers[0]) + len(frontiers[1]) > peak:
+            peak = len(frontiers[0]) + len(frontiers[1])
+        if best >= 0:
+            _splice(parents, links[1], meet, goal)
+            found = goal
+            break
+
+    # a layer is popped and expanded as a whole
+    _finish(stats, hooks, found, num_pushes, pops, pops, peak)
+    return found, num_pushes
+
+def flat_bidirectional_a_star(passable: bytes, cols: int, start: int, goal: int, \
+                              parents: array, stats: SearchStats = None, \
+                              hooks: SearchHooks = None, adjacency: Adjacency = None) -> Tuple[int, int]:
+    ''' function to perform A* from the start (towards the goal) and from the
+        goal (towards the start) at the same time, expanding the side with the
+        smaller queue; every time a cell gets a cost from both sides the join
+        is recorded, and the search stops as soon as either queue's smallest f
+        is no less than the best join, since with a consistent heuristic no
+        path through the cells left in that queue can be shorter; see flat_dfs
+        for a description of the parameters
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(passable)
+    if start == goal:
+        _finish(stats, hooks, goal, 1, 1, 0, 1)
+        return goal, 1
+    offsets, targets = _csr(passable, cols, start, adjacency)
+    cost   = (array('i', [-1]) * n, array('i', [-1]) * n)  # forward, backward
+    closed = (bytearray(n), bytearray(n))
+    links  = (parents, array('i', [-1]) * n)
+    queues = (IndexedPriorityQueue(), IndexedPriorityQueue())
+    aims = (divmod(goal, cols), divmod(start, cols))     # what each side heads for
+
+    for side, origin in ((0, start), (1, goal)):
+        row, col = divmod(origin, cols)
+        h = abs(aims[side][0] - row) + abs(aims[side][1] - col)
+        cost[side][origin] = 0
+        queues[side].insert((h, h), origin)
+        if on_push is not None: on_push(origin)
+    num_pushes, pops, peak = 2, 0, 2
+    best, meet = -1, -1
+
+    while not queues[0].is_empty() and not queues[1].is_empty():
+        if best >= 0 and (queues[0].min()._key[0] >= best or queues[1].min()._key[0] >= best):
+            break
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        mine, other, link = cost[side], cost[1 - side], links[side]
+        to_explore, done = queues[side], closed[side]
+        target_row, target_col = aims[side]
+
+        i = to_explore.remove_min()._value
+        pops += 1
+        done[i] = 1
+        if on_expand is not None: on_expand(i)
+        updated_cost = mine[i] + 1
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if done[j]:
+                continue
+            if mine[j] < 0 or updated_cost < mine[j]:
+                mine[j] = updated_cost
+                row, col_j = divmod(j, cols)
+                h = abs(target_row - row) + abs(target_col - col_j)
+                to_explore.update_or_insert((updated_cost + h, h), j)
+                link[j] = i
+                num_pushes += 1
+                if on_push is not None: on_push(j)
+            if other[j] >= 0 and (best < 0 or mine[j] + other[j] < best):
+                best, meet = mine[j] + other[j], j
+        if len(queues[0]) + len(queues[1]) > peak:
+            peak = len(queues[0]) + len(queues[1])
+
+    found = -1
+    if best >= 0:
+        _splice(parents, links[1], meet, goal)
+        found = goal
+    # every cell popped is expanded (the search stops on the queues' keys)
+    _finish(stats, hooks, found, num_pushes, pops, pops, peak)
+    return found, num_pushes
+
+def flat_least_cost(passable: bytes, cols: int, start: int, goal: int, \
+                    parents: array, weights: bytes, heuristic: bool = True, \
+                    queue: str = "bucket", stats: SearchStats = None, \
+                    hooks: SearchHooks = None, adjacency: Adjacency = None) -> Tuple[int, int]:
+    ''' function to find a least-cost path over flat cell ids when moving
+        into cell j costs weights[j]: A* with the Manhattan distance times the
+        smallest weight as the heuristic (consistent, so each cell is expanded
+        at most once), or Dijkstra's algorithm if heuristic is False
+    Parameters:
+        weights:   one integer cost (1 to 255) per cell
+        heuristic: whether to guide the search towards the goal (A*)
+        queue:     "bucket" for a BucketQueue (Dial's algorithm: O(1) pushes
+                   and pops, since every priority is within the largest
+                   weight of the last one removed) or "heap" for an
+                   IndexedPriorityQueue with decrease-key
+        the others as described for flat_dfs
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(passable)
+    offsets, targets = _csr(passable, cols, start, adjacency)
+    cost = array('i', [-1]) * n     # g(n) for each cell, -1 if not yet seen
+    closed = bytearray(n)           # cells already expanded
+    goal_row, goal_col = divmod(goal, cols)
+    scale = min(weights) if heuristic else 0
+    bucket = queue == "bucket"
+    # f = g + h grows by between weights[j] - scale and weights[j] + scale
+    # from a cell to its neighbor j, so never drops below the last f removed
+    to_explore = BucketQueue(max(weights) + scale) if bucket else IndexedPriorityQueue()
+
+    row, col = divmod(start, cols)
+    h = scale * (abs(goal_row - row) + abs(goal_col - col))
+    cost[start] = 0
+    if bucket:
+        to_explore.insert(h, start)
+    else:
+        to_explore.insert((h, h), start)
+    num_pushes, pops, peak, found = 1, 0, 1, -1
+    if on_push is not None: on_push(start)
+
+    while not to_explore.is_empty():
+        i = to_explore.remove_min()._value
+        if closed[i]:
+            continue                # a stale copy left in the bucket queue
+        pops += 1
+        closed[i] = 1
+        if i == goal:
+            found = i
+            break
+        if on_expand is not None: on_expand(i)
+
+        cost_i = cost[i]
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if passable[j] and not closed[j]:
+                updated_cost = cost_i + weights[j]
+                if cost[j] < 0 or updated_cost < cost[j]:
+                    cost[j] = updated_cost
+                    row, col_j = divmod(j, cols)
+                    h = scale * (abs(goal_row - row) + abs(goal_col - col_j))
+                    if bucket:
+                        to_explore.insert(updated_cost + h, j)
+                    else:
+                        to_explore.update_or_insert((updated_cost + h, h), j)
+                    parents[j] = i
+                    num_pushes += 1
+                    if on_push is not None: on_push(j)
+        if len(to_explore) > peak:
+            peak = len(to_explore)
+
+    _finish(stats, hooks, found, num_pushes, pops, pops - (found >= 0), peak)
+    return found, num_pushes
+
+def main():
+    # a 3x4 grid with a wall down the middle column except at the bottom
+    #   S . X .
+    #   . . X .
+    #   . . . G
+    passable = bytes([0, 1, 0, 1,
+                      1, 1, 0, 1,
+                      1, 1, 1, 1])
+    for kernel in (flat_dfs, flat_bfs, flat_a_star, \
+                   flat_bidirectional_bfs, flat_bidirectional_a_star):
+        parents = array('i', [-1]) * len(passable)
+        stats = SearchStats(kernel.__name__)
+        goal, num_pushes = kernel(passable, 4, 0, 11, parents, stats)
+        path = [goal]
+        while path[-1] != 0:
+            path.append(parents[path[-1]])
+        print(f"{kernel.__name__}: path {path[::-1]}, pushes {num_pushes}, "
+              f"expansions {stats.expansions}, peak frontier {stats.peak_frontier}")
+
+    # the same grid where the bottom-left 2x2 block is mud, costing 5 to enter
+    weights = bytes([1, 1, 1, 1,
+                     5, 5, 1, 1,
+                     5, 5, 1, 1])
+    for queue in ("bucket", "heap"):
+        parents = array('i', [-1]) * len(passable)
+        goal, num_pushes = flat_least_cost(passable, 4, 0, 11, parents, weights, queue = queue)
+        path = [goal]
+        while path[-1] != 0:
+            path.append(parents[path[-1]])
+        print(f"flat_least_cost ({queue}): path {path[::-1]}, cost {sum(weights[i] for i in path[:-1])}")
+
+if __name__ == "__main__":
+    main()
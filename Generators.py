@@ -0,0 +1,243 @@
+# maze generators that write straight into a flat buffer of contents codes
+# (one byte per cell, indexed by row * cols + col, as kept by a compact Maze):
+# random blocking done as one vectorized NumPy draw, and "perfect" mazes --
+# exactly one path between any two rooms -- so a solution always exists
+from Stack import *
+from array import array
+from typing import List
+import random
+
+try:
+    import numpy as np
+except ImportError:     # numpy is optional; random_blocking falls back to random
+    np = None
+
+def random_blocking(cells: bytearray, cols: int, start: int, goal: int, \
+                    prop_blocked: float, blocked_code: int, seed: int = None) -> None:
+    ''' function to block a given proportion of the cells other than the start
+        and goal, chosen uniformly at random; for a given seed the same cells
+        are blocked every time (with NumPy's PCG64 generator when numpy is
+        installed, otherwise with random.Random -- the two pick different
+        cells for the same seed)
+    Parameters:
+        cells:        flat buffer of contents codes, all empty on entry
+        cols:         number of columns in the grid
+        start:        id of the start cell (never blocked)
+        goal:         id of the goal cell (never blocked)
+        prop_blocked: proportion of the other cells to block
+        blocked_code: the code to write into blocked cells
+        seed:         seed for the random generator (None for a fresh one)
+    '''
+    n = len(cells)
+    k = round((n - 2) * prop_blocked)
+    low, high = sorted((start, goal))
+    # indices are drawn from the n - 2 cells left once the start and goal are
+    # taken out, then shifted past them to get their ids in the grid
+    if np is not None:
+        blocked = np.random.default_rng(seed).choice(n - 2, size = k, replace = False)
+        blocked += blocked >= low
+        blocked += blocked >= high
+        np.frombuffer(cells, dtype = np.uint8)[blocked] = blocked_code
+        return
+    for b in random.Random(seed).sample(range(n - 2), k):
+        if b >= low:  b += 1
+        if b >= high: b += 1
+        cells[b] = blocked_code
+
+# The perfect-maze generators below work on "rooms", the cells whose row and
+# column are both even; the cells between two rooms are the walls that may be
+# knocked down to join them, and everything else stays blocked. Room (i, j) is
+# numbered i * room_cols + j.
+
+def _rooms(cells: bytearray, cols: int, blocked_code: int) -> tuple:
+    ''' blocks every cell and returns (room rows, room cols) of the grid '''
+    cells[:] = bytes([blocked_code]) * len(cells)
+    rows = len(cells) // cols
+    return (rows + 1) // 2, (cols + 1) // 2
+
+def _adjacent(room: int, room_rows: int, room_cols: int) -> List[int]:
+    ''' returns the rooms N/S/W/E of a room '''
+    i, j = divmod(room, room_cols)
+    return [r for r in (room - room_cols if i > 0 else -1,
+                        room + room_cols if i + 1 < room_rows else -1,
+                        room - 1 if j > 0 else -1,
+                        room + 1 if j + 1 < room_cols else -1) if r >= 0]
+
+def _cellOf(room: int, room_cols: int, cols: int) -> int:
+    i, j = divmod(room, room_cols)
+    return 2 * i * cols + 2 * j
+
+def _join(cells: bytearray, room_cols: int, cols: int, a: int, b: int, empty_code: int) -> None:
+    ''' opens room b and the wall between it and room a '''
+    cell_a, cell_b = _cellOf(a, room_cols, cols), _cellOf(b, room_cols, cols)
+    cells[(cell_a + cell_b) // 2] = empty_code
+    cells[cell_b] = empty_code
+
+def _connect(cells: bytearray, cols: int, cell: int, empty_code: int) -> None:
+    ''' opens a (start or goal) cell that may not be a room, along with the
+        cells leading from it to the room at or up and left of it '''
+    row, col = divmod(cell, cols)
+    room_row, room_col = row - row % 2, col - col % 2
+    for i in (cell, row * cols + room_col, room_row * cols + room_col):
+        cells[i] = empty_code
+
+def recursive_backtracker(cells: bytearray, cols: int, start: int, goal: int, \
+                          blocked_code: int, empty_code: int = 0, seed: int = None) -> None:
+    ''' function to carve a perfect maze by a randomized depth-first walk:
+        from the current room knock down the wall to a random unvisited
+        neighbor and move there, backing up when there is none (long, winding
+        corridors with few dead ends)
+    Parameters:
+        cells:        flat buffer of contents codes, overwritten
+        cols:         number of columns in the grid
+        start:        id of the start cell (joined to the maze if not a room)
+        goal:         id of the goal cell (joined to the maze if not a room)
+        blocked_code: the code to write into blocked cells
+        empty_code:   the code to write into open cells
+        seed:         seed for the random generator (None for a fresh one)
+    '''
+    room_rows, room_cols = _rooms(cells, cols, blocked_code)
+    rng = random.Random(seed)
+    visited = bytearray(room_rows * room_cols)
+    first = rng.randrange(len(visited))
+    visited[first] = 1
+    cells[_cellOf(first, room_cols, cols)] = empty_code
+    stack = Stack()
+    stack.push(first)
+    while not stack.is_empty():
+        room = stack.top()
+        fresh = [r for r in _adjacent(room, room_rows, room_cols) if not visited[r]]
+        if not fresh:
+            stack.pop()
+            continue
+        nxt = rng.choice(fresh)
+        visited[nxt] = 1
+        _join(cells, room_cols, cols, room, nxt, empty_code)
+        stack.push(nxt)
+    _connect(cells, cols, start, empty_code)
+    _connect(cells, cols, goal, empty_code)
+
+def _find(parent: array, room: int) -> int:
+    ''' returns the representative of a room's set, halving the path to it '''
+    while parent[room] != room:
+        parent[room] = parent[parent[room]]
+        room = parent[room]
+    return room
+
+def kruskal(cells: bytearray, cols: int, start: int, goal: int, \
+            blocked_code: int, empty_code: int = 0, seed: int = None) -> None:
+    ''' function to carve a perfect maze with randomized Kruskal: visit the
+        walls between rooms in random order and knock each one down if the
+        rooms on either side are not yet connected, tracked with union-find
+        (many short dead ends)
+    Parameters:
+        as for recursive_backtracker
+    '''
+    room_rows, room_cols = _rooms(cells, cols, blocked_code)
+    num_rooms = room_rows * room_cols
+    for room in range(num_rooms):
+        cells[_cellOf(room, room_cols, cols)] = empty_code
+    walls = [(room, room + 1) for room in range(num_rooms) if (room + 1) % room_cols] + \
+            [(room, room + room_cols) for room in range(num_rooms - room_cols)]
+    random.Random(seed).shuffle(walls)
+
+    parent = array('i', range(num_rooms))
+    size   = array('i', [1]) * num_rooms
+    for a, b in walls:
+        root_a, root_b = _find(parent, a), _find(parent, b)
+        if root_a == root_b:
+            continue
+        if size[root_a] < size[root_b]:
+            root_a, root_b = root_b, root_a
+        parent[root_b] = root_a             # union by size
+        size[root_a] += size[root_b]
+        _join(cells, room_cols, cols, a, b, empty_code)
+    _connect(cells, cols, start, empty_code)
+    _connect(cells, cols, goal, empty_code)
+
+def wilson(cells: bytearray, cols: int, start: int, goal: int, \
+           blocked_code: int, empty_code: int = 0, seed: int = None) -> None:
+    ''' function to carve a perfect maze with Wilson's algorithm: from each
+        room not yet in the maze take a random walk until it hits the maze,
+        then add the walk with its loops erased; every perfect maze is equally
+        likely to come out (an unbiased uniform spanning tree)
+    Parameters:
+        as for recursive_backtracker
+    '''
+    room_rows, room_cols = _rooms(cells, cols, blocked_code)
+    num_rooms = room_rows * room_cols
+    rng = random.Random(seed)
+    in_maze = bytearray(num_rooms)
+    root = rng.randrange(num_rooms)
+    in_maze[root] = 1
+    cells[_cellOf(root, room_cols, cols)] = empty_code
+    # the last room each walk left every room for; overwriting it when a walk
+    # comes back to a room is what erases the loop
+    step = array('i', [-1]) * num_rooms
+    for first in range(num_rooms):
+        room = first
+        while not in_maze[room]:
+            step[room] = rng.choice(_adjacent(room, room_rows, room_cols))
+            room = step[room]
+        room = first
+        while not in_maze[room]:
+            in_maze[room] = 1
+            cells[_cellOf(room, room_cols, cols)] = empty_code
+            _join(cells, room_cols, cols, step[room], room, empty_code)
+            room = step[room]
+    _connect(cells, cols, start, empty_code)
+    _connect(cells, cols, goal, empty_code)
+
+def random_weights(weights: bytearray, max_weight: int, seed: int = None) -> None:
+    ''' function to give every cell a traversal cost drawn uniformly from 1 to
+        max_weight (as Maze.set_weights takes them)
+    Parameters:
+        weights:    flat buffer of one cost per cell, overwritten
+        max_weight: the largest cost (at most 255)
+        seed:       seed for the random generator (None for a fresh one)
+    '''
+    if np is not None:
+        np.frombuffer(weights, dtype = np.uint8)[:] = \
+            np.random.default_rng(seed).integers(1, max_weight + 1, size = len(weights))
+        return
+    rng = random.Random(seed)
+    weights[:] = bytes(rng.randint(1, max_weight) for _ in range(len(weights)))
+
+# the generators that always produce a solvable maze, by name
+PERFECT = {"backtracker": recursive_backtracker, "kruskal": kruskal, "wilson": wilson}
+
+def generate(cells: bytearray, cols: int, start: int, goal: int, generator: str, \
+             prop_blocked: float, blocked_code: int, empty_code: int = 0, \
+             seed: int = None) -> None:
+    ''' function to run a generator chosen by name
+    Parameters:
+        cells:        flat buffer of contents codes (any writable buffer,
+                      e.g., a memoryview of shared memory), all empty on entry
+        cols:         number of columns in the grid
+        start:        id of the start cell
+        goal:         id of the goal cell
+        generator:    "random" or one of PERFECT
+        prop_blocked: proportion of cells to block ("random" only)
+        blocked_code: the code to write into blocked cells
+        empty_code:   the code to write into open cells
+        seed:         seed for the generator (None for a fresh one)
+    Raises:
+        ValueError if generator is not a known name
+    '''
+    if generator == "random":
+        random_blocking(cells, cols, start, goal, prop_blocked, blocked_code, seed)
+    elif generator in PERFECT:
+        PERFECT[generator](cells, cols, start, goal, blocked_code, empty_code, seed)
+    else:
+        raise ValueError(f"generator must be one of random, {', '.join(PERFECT)}")
+
+def main():
+    for name, generator in PERFECT.items():
+        cells = bytearray(9 * 15)
+        generator(cells, 15, 0, 9 * 15 - 1, blocked_code = 1, seed = 7)
+        print(f"{name}:")
+        for row in range(9):
+            print("".join("#" if code else " " for code in cells[row * 15:(row + 1) * 15]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+# hierarchical path-finding (HPA*): the grid is cut into square clusters, the
+# cells where neighboring clusters connect ("entrances") become the nodes of a
+# small abstract graph whose edges are the distances across each cluster, and
+# a query searches that graph first and then refines only the clusters on the
+# chosen route with the ordinary cell-level search
+from FlatSearch import *
+from PriorityQueue import *
+from SearchStats import *
+from array import array
+from typing import Dict, List, Set, Tuple
+import sys
+import time
+
+class HierarchicalPlanner:
+    ''' class holding the abstract cluster graph of a Maze; paths found are
+        usually within a few percent of the shortest, not guaranteed shortest;
+        edits should go through set_blocked so that only the touched cluster
+        (and its borders with its neighbors) is recomputed -- edits made
+        directly on the Maze are noticed through its version and cause a full
+        rebuild on the next query
+    '''
+    def __init__(self, maze: 'Maze', cluster_size: int = 10):
+        ''' initializer method for a HierarchicalPlanner, running the full
+            preprocessing
+        Parameters:
+            maze:         the Maze to plan on
+            cluster_size: the number of rows and columns in each cluster
+        Raises:
+            ValueError if cluster_size is less than 2
+        '''
+        if cluster_size < 2:
+            raise ValueError("cluster_size must be at least 2")
+        self._maze = maze
+        self._rows = maze._num_rows
+        self._cols = maze._num_cols
+        self._size = cluster_size
+        self._cluster_rows = (self._rows + cluster_size - 1) // cluster_size
+        self._cluster_cols = (self._cols + cluster_size - 1) // cluster_size
+        self._build()
+
+    ############################################################################
+    # preprocessing
+
+    def _build(self) -> None:
+        ''' helper method to compute every border and cluster from scratch '''
+        began = time.perf_counter()
+        self._open = bytearray(self._maze._codes().translate(self._maze._OPEN))
+        self._version = self._maze._version
+        # (cluster, cluster) -> list of (cell, cell) transitions across that border
+        self._borders: Dict[Tuple[int, int], List[Tuple[int, int]]] = dict()
+        # node -> nodes in a neighboring cluster one step away
+        self._inter: Dict[int, Set[int]] = dict()
+        # cluster -> {node -> {node in the same cluster -> distance}}
+        self._intra: Dict[int, Dict[int, Dict[int, int]]] = dict()
+
+        for cluster in range(self._cluster_rows * self._cluster_cols):
+            for other in self._neighborClusters(cluster):
+                if other > cluster:
+                    self._buildBorder(cluster, other)
+        for cluster in range(self._cluster_rows * self._cluster_cols):
+            self._buildCluster(cluster)
+        self._build_seconds = time.perf_counter() - began
+
+    def _bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        ''' returns (first row, last row + 1, first col, last col + 1) '''
+        cluster_row, cluster_col = divmod(cluster, self._cluster_cols)
+        row, col = cluster_row * self._size, cluster_col * self._size
+        return row, min(row + self._size, self._rows), col, min(col + self._size, self._cols)
+
+    def _clusterOf(self, i: int) -> int:
+        row, col = divmod(i, self._cols)
+        return (row // self._size) * self._cluster_cols + col // self._size
+
+    def _neighborClusters(self, cluster: int) -> List[int]:
+        cluster_row, cluster_col = divmod(cluster, self._cluster_cols)
+        return [other for other, ok in ((cluster - self._cluster_cols, cluster_row > 0),
+                                        (cluster + self._cluster_cols, cluster_row + 1 < self._cluster_rows),
+                                        (cluster - 1, cluster_col > 0),
+                                        (cluster + 1, cluster_col + 1 < self._cluster_cols)) if ok]
+
+    def _buildBorder(self, first: int, second: int) -> None:
+        ''' helper method to (re)compute the transitions between two adjacent
+            clusters (first < second): every maximal run of open cell pairs
+            across the border gets one transition in its middle, or two at
+            its ends if it is 6 or more cells long
+        '''
+        for a, b in self._borders.pop((first, second), []):
+            self._inter[a].discard(b)
+            self._inter[b].discard(a)
+
+        row0, row1, col0, col1 = self._bounds(first)
+        if first // self._cluster_cols == second // self._cluster_cols:
+            # side by side: the border is a column
+            pairs = [(r * self._cols + col1 - 1, r * self._cols + col1) for r in range(row0, row1)]
+        else:
+            # one above the other: the border is a row
+            pairs = [((row1 - 1) * self._cols + c, row1 * self._cols + c) for c in range(col0, col1)]
+
+        transitions = []
+        run: List[Tuple[int, int]] = []
+        for a, b in pairs + [(-1, -1)]:
+            if a >= 0 and self._open[a] and self._open[b]:
+                run.append((a, b))
+                continue
+            if len(run) >= 6:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        self._borders[(first, second)] = transitions
+        for a, b in transitions:
+            self._inter.setdefault(a, set()).add(b)
+            self._inter.setdefault(b, set()).add(a)
+
+    def _localGrid(self, cluster: int) -> bytearray:
+        ''' returns a copy of the open flags of one cluster's cells, indexed by
+            local ids (row - first row) * width + (col - first col) '''
+        row0, row1, col0, col1 = self._bounds(cluster)
+        local = bytearray()
+        for row in range(row0, row1):
+            local += self._open[row * self._cols + col0:row * self._cols + col1]
+        return local
+
+    def _localDistances(self, cluster: int, source: int, targets: Set[int], \
+                        local: bytearray = None) -> Dict[int, int]:
+        ''' helper method to BFS from source without leaving its cluster, on a
+            copy of the cluster's cells addressed by local ids
+        Parameters:
+            cluster: the cluster holding source
+            source:  id of the cell to start from
+            targets: ids of the cells to measure the distance to
+            local:   the cluster's _localGrid, if already built
+        Returns:
+            {target: distance} for the targets reached
+        '''
+        row0, row1, col0, col1 = self._bounds(cluster)
+        width, cols = col1 - col0, self._cols
+        if local is None:
+            local = self._localGrid(cluster)
+        size = len(local)
+        local_targets = {(t // cols - row0) * width + t % cols - col0: t for t in targets}
+
+        source_row, source_col = divmod(source, cols)
+        first = (source_row - row0) * width + source_col - col0
+        dist = [-1] * size
+        dist[first] = 0
+        found = {source: 0} if first in local_targets else {}
+        frontier = [first]
+        for i in frontier:          # frontier grows while it is walked: a queue
+            if len(found) == len(local_targets):
+                break
+            step = dist[i] + 1
+            col = i % width
+            for j in (i - width if i >= width else -1,
+                      i + width if i + width < size else -1,
+                      i - 1 if col > 0 else -1,
+                      i + 1 if col + 1 < width else -1):
+                if j >= 0 and local[j] and dist[j] < 0:
+                    dist[j] = step
+                    frontier.append(j)
+                    if j in local_targets:
+                        found[local_targets[j]] = step
+        return found
+
+    def _buildCluster(self, cluster: int) -> None:
+        ''' helper method to (re)compute the distances between every pair of
+            entrance nodes inside one cluster '''
+        nodes = set()
+        for other in self._neighborClusters(cluster):
+            key = (min(cluster, other), max(cluster, other))
+            for a, b in self._borders.get(key, []):
+                nodes.add(a if self._clusterOf(a) == cluster else b)
+        local = self._localGrid(cluster)
+        self._intra[cluster] = {node: {other: d for other, d in
+                                       self._localDistances(cluster, node, nodes, local).items() if other != node}
+                                for node in nodes}
+
+    def set_blocked(self, position: 'Position', flag: bool) -> None:
+        ''' method to block or unblock a cell of the Maze, then recompute the
+            borders of the cluster containing it and the entrance distances of
+            that cluster and of the neighbors sharing those borders
+        Parameters:
+            position: Position of the cell to change
+            flag:     True to block the cell, False to make it empty
+        Raises:
+            ValueError as for Maze.set_blocked
+        '''
+        stale = self._version != self._maze._version
+        self._maze.set_blocked(position, flag)
+        if stale:
+            return      # the next query rebuilds everything anyway
+        self._version = self._maze._version
+        i = self._maze._flatIndex(position)
+        self._open[i] = 0 if flag else 1
+        cluster = self._clusterOf(i)
+        neighbors = self._neighborClusters(cluster)
+        for other in neighbors:
+            self._buildBorder(min(cluster, other), max(cluster, other))
+        for changed in [cluster] + neighbors:
+            self._buildCluster(changed)
+
+    ############################################################################
+    # queries
+
+    def search(self, start: int, goal: int, parents: array, \
+                     stats: SearchStats = None, hooks: SearchHooks = None) -> Tuple[int, int]:
+        ''' method to find a path between two cells: the start and goal are
+            linked to the entrances of their clusters, the abstract graph is
+            searched with A* (Manhattan heuristic), and each abstract edge on
+            the result is refined with flat_a_star inside its own cluster
+        Parameters:
+            start:   id of the start cell
+            goal:    id of the goal cell
+            parents: int array (one entry per cell) that receives, for every
+                     cell on the path, the id of the cell before it
+            stats:   optional SearchStats that receives the counts of the
+                     abstract search and the refinements together
+            hooks:   optional SearchHooks to call as abstract nodes are
+                     pushed/expanded (refinements don't call them)
+        Returns:
+            a tuple (goal id or -1 if the goal can't be reached, number of
+            pushes made by the abstract search and the refinements together)
+        '''
+        if self._version != self._maze._version:
+            self._build()
+        if not (self._open[start] and self._open[goal]):
+            return -1, 0
+        on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+
+        # temporary edges from the start and to the goal inside their clusters
+        start_cluster, goal_cluster = self._clusterOf(start), self._clusterOf(goal)
+        from_start = self._localDistances(start_cluster, start,
+                                          set(self._intra[start_cluster]) | ({goal} if goal_cluster == start_cluster else set()))
+        to_goal = self._localDistances(goal_cluster, goal, set(self._intra[goal_cluster]))
+
+        def neighbors(u: int) -> List[Tuple[int, int]]:
+            result = [(v, 1) for v in self._inter.get(u, ())]
+            result += self._intra[self._clusterOf(u)].get(u, {}).items()
+            if u == start:
+                result += from_start.items()
+            if u in to_goal:
+                result.append((goal, to_goal[u]))
+            return result
+
+        goal_row, goal_col = divmod(goal, self._cols)
+        def heuristic(u: int) -> int:
+            row, col = divmod(u, self._cols)
+            return abs(goal_row - row) + abs(goal_col - col)
+
+        cost = {start: 0}
+        abstract_parent = {start: -1}
+        closed = set()
+        to_explore = IndexedPriorityQueue()
+        to_explore.insert((heuristic(start), heuristic(start)), start)
+        num_pushes, pops, peak = 1, 0, 1
+        if on_push is not None: on_push(start)
+        while not to_explore.is_empty():
+            u = to_explore.remove_min()._value
+            pops += 1
+            closed.add(u)
+            if u == goal:
+                break
+            if on_expand is not None: on_expand(u)
+            for v, d in neighbors(u):
+                if v in closed or v == u:
+                    continue
+                if v not in cost or cost[u] + d < cost[v]:
+                    cost[v] = cost[u] + d
+                    abstract_parent[v] = u
+                    h = heuristic(v)
+                    to_explore.update_or_insert((cost[v] + h, h), v)
+                    num_pushes += 1
+                    if on_push is not None: on_push(v)
+            peak = max(peak, len(to_explore))
+        found = goal in closed
+        if stats is not None:
+            stats.count(num_pushes, pops, pops - found, peak)
+        if not found:
+            return -1, num_pushes
+
+        route = [goal]
+        while abstract_parent[route[-1]] >= 0:
+            route.append(abstract_parent[route[-1]])
+        route.reverse()
+        for u, v in zip(route, route[1:]):
+            num_pushes += self._refine(u, v, parents, stats)
+        if hooks is not None and hooks.on_goal is not None:
+            hooks.on_goal(goal)
+        return goal, num_pushes
+
+    def _refine(self, u: int, v: int, parents: array, stats: SearchStats = None) -> int:
+        ''' helper method to fill in the cells between two consecutive abstract
+            nodes, running flat_a_star on just the cluster that holds both
+        Returns:
+            the number of pushes made
+        '''
+        if self._clusterOf(u) != self._clusterOf(v):    # a step across a border
+            parents[v] = u
+            return 0
+        row0, row1, col0, col1 = self._bounds(self._clusterOf(u))
+        width = col1 - col0
+        local = self._localGrid(self._clusterOf(u))
+        def localId(i: int) -> int:
+            row, col = divmod(i, self._cols)
+            return (row - row0) * width + col - col0
+        local[localId(u)] = 0           # flat kernels never re-enter the start
+        local_parents = array('i', [-1]) * len(local)
+        found, num_pushes = flat_a_star(bytes(local), width, localId(u), localId(v), local_parents, stats)
+        i = localId(v)
+        while i != localId(u):
+            row, col = divmod(i, width)
+            parent_row, parent_col = divmod(local_parents[i], width)
+            parents[(row + row0) * self._cols + col + col0] = \
+                (parent_row + row0) * self._cols + parent_col + col0
+            i = local_parents[i]
+        return num_pushes
+
+    ############################################################################
+    # reporting
+
+    def stats(self) -> Dict[str, float]:
+        ''' method to report the size and cost of the abstract graph
+        Returns:
+            a dict with the number of clusters, abstract nodes and edges, the
+            seconds the last full preprocessing took, and the approximate
+            memory held by the abstract graph in bytes
+        '''
+        nodes = sum(len(cluster) for cluster in self._intra.values())
+        edges = sum(len(links) for links in self._inter.values()) // 2 + \
+                sum(len(links) for cluster in self._intra.values() for links in cluster.values()) // 2
+        nbytes = sys.getsizeof(self._open) + sys.getsizeof(self._borders) + \
+                 sys.getsizeof(self._inter) + sys.getsizeof(self._intra)
+        nbytes += sum(sys.getsizeof(pairs) for pairs in self._borders.values())
+        nbytes += sum(sys.getsizeof(links) for links in self._inter.values())
+        nbytes += sum(sys.getsizeof(cluster) + sum(sys.getsizeof(links) for links in cluster.values())
+                      for cluster in self._intra.values())
+        return {"clusters": len(self._intra), "nodes": nodes, "edges": edges,
+                "preprocessing_seconds": self._build_seconds, "nbytes": nbytes}
+
+def main():
+    from Maze import Maze, Position
+    import random
+    random.seed(46545)
+    maze = Maze(100, 100, goal = Position(99, 99), compact = True)
+    planner = maze.hierarchy(cluster_size = 10)
+    print(planner.stats())
+    parents = array('i', [-1]) * (100 * 100)
+    goal, num_pushes = planner.search(0, 100 * 100 - 1, parents)
+    steps = 0
+    i = goal
+    while i > 0:
+        i = parents[i]
+        steps += 1
+    print(f"path of {steps} steps with {num_pushes} pushes")
+
+if __name__ == "__main__":
+    main()
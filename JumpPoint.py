@@ -0,0 +1,154 @@
+# Jump Point Search for 4-connected grids where every step costs 1: A* only
+# pushes "jump points" -- cells where a shortest path may have to turn -- and
+# skips over the runs of cells in between, which all shortest paths share
+from PriorityQueue import *
+from SearchStats import *
+from array import array
+from typing import Tuple
+
+def flat_jump_point_search(passable: bytes, cols: int, start: int, goal: int, \
+                           parents: array, stats: SearchStats = None, \
+                           hooks: SearchHooks = None) -> Tuple[int, int]:
+    ''' function to perform Jump Point Search over flat cell ids, with the
+        Manhattan distance to the goal as the heuristic
+
+        Among equally short paths it only follows those that move vertically
+        as early as possible, so:
+          * a cell reached vertically may continue vertically or turn either
+            way horizontally; a vertical jump stops at a cell from which a
+            horizontal scan finds a jump point (or at the goal)
+          * a cell reached horizontally may only continue horizontally, unless
+            the cell above (below) it is open while the one above (below) the
+            cell it came from is blocked -- a "forced" neighbor that no path
+            turning earlier could have reached as cheaply -- so a horizontal
+            jump stops at such cells (or at the goal)
+    Parameters:
+        passable: one byte per cell, non-zero if the cell may be moved into
+                  (i.e., it is neither blocked nor the start)
+        cols:     number of columns in the grid
+        start:    id of the start cell
+        goal:     id of the goal cell
+        parents:  int array (one entry per cell) that receives, for every cell
+                  on the path found, the id of the cell before it
+        stats:    optional SearchStats that receives the counts of the search
+                  (only jump points are pushed and expanded)
+        hooks:    optional SearchHooks to call as jump points are
+                  pushed/expanded
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(passable)
+    rows = n // cols
+    goal_row, goal_col = divmod(goal, cols)
+
+    def is_open(row: int, col: int) -> bool:
+        return 0 <= row < rows and 0 <= col < cols and passable[row * cols + col]
+
+    def forced(row: int, col: int, dc: int) -> bool:
+        ''' whether a horizontal move (in direction dc) into (row, col) has a
+            forced neighbor above or below '''
+        return (is_open(row - 1, col) and not is_open(row - 1, col - dc)) or \
+               (is_open(row + 1, col) and not is_open(row + 1, col - dc))
+
+    def jump_horizontal(row: int, col: int, dc: int) -> int:
+        while True:
+            col += dc
+            if not is_open(row, col):
+                return -1
+            i = row * cols + col
+            if i == goal or forced(row, col, dc):
+                return i
+
+    def jump_vertical(row: int, col: int, dr: int) -> int:
+        while True:
+            row += dr
+            if not is_open(row, col):
+                return -1
+            i = row * cols + col
+            if i == goal or jump_horizontal(row, col, -1) >= 0 or jump_horizontal(row, col, 1) >= 0:
+                return i
+
+    cost = {start: 0}               # g of each jump point seen so far
+    jump_parent = {start: -1}       # jump point each jump point was reached from
+    closed = set()
+    to_explore = IndexedPriorityQueue()
+    h = abs(goal_row - start // cols) + abs(goal_col - start % cols)
+    to_explore.insert((h, h), start)
+    num_pushes, pops, peak, found = 1, 0, 1, -1
+    if on_push is not None: on_push(start)
+
+    while not to_explore.is_empty():
+        i = to_explore.remove_min()._value
+        pops += 1
+        closed.add(i)
+        if i == goal:
+            # fill in the cells between consecutive jump points
+            while jump_parent[i] >= 0:
+                j = jump_parent[i]
+                step = (1 if i > j else -1) * (1 if i // cols == j // cols else cols)
+                for k in range(i, j, -step):
+                    parents[k] = k - step
+                i = j
+            found = goal
+            break
+        if on_expand is not None: on_expand(i)
+
+        row, col = divmod(i, cols)
+        parent = jump_parent[i]
+        if parent < 0:                  # the start: every direction
+            jumps = [jump_vertical(row, col, -1), jump_vertical(row, col, 1),
+                     jump_horizontal(row, col, -1), jump_horizontal(row, col, 1)]
+        elif parent % cols == col:      # reached vertically
+            dr = 1 if row > parent // cols else -1
+            jumps = [jump_vertical(row, col, dr),
+                     jump_horizontal(row, col, -1), jump_horizontal(row, col, 1)]
+        else:                           # reached horizontally
+            dc = 1 if col > parent % cols else -1
+            jumps = [jump_horizontal(row, col, dc)]
+            if is_open(row - 1, col) and not is_open(row - 1, col - dc):
+                jumps.append(jump_vertical(row, col, -1))
+            if is_open(row + 1, col) and not is_open(row + 1, col - dc):
+                jumps.append(jump_vertical(row, col, 1))
+
+        for j in jumps:
+            if j < 0 or j in closed:
+                continue
+            j_row, j_col = divmod(j, cols)
+            updated_cost = cost[i] + abs(j_row - row) + abs(j_col - col)
+            if j not in cost or updated_cost < cost[j]:
+                cost[j] = updated_cost
+                jump_parent[j] = i
+                h = abs(goal_row - j_row) + abs(goal_col - j_col)
+                to_explore.update_or_insert((updated_cost + h, h), j)
+                num_pushes += 1
+                if on_push is not None: on_push(j)
+        if len(to_explore) > peak:
+            peak = len(to_explore)
+
+    if stats is not None:
+        stats.count(num_pushes, pops, pops - (found >= 0), peak)
+    if found >= 0 and hooks is not None and hooks.on_goal is not None:
+        hooks.on_goal(found)
+    return found, num_pushes
+
+def main():
+    # a 5x5 grid with a single wall segment
+    #   S . . . .
+    #   . . . . .
+    #   . X X X .
+    #   . . . . .
+    #   . . . . G
+    passable = bytearray([1] * 25)
+    passable[0] = 0
+    for blocked in (11, 12, 13):
+        passable[blocked] = 0
+    parents = array('i', [-1]) * len(passable)
+    goal, num_pushes = flat_jump_point_search(bytes(passable), 5, 0, 24, parents)
+    path = [goal]
+    while path[-1] != 0:
+        path.append(parents[path[-1]])
+    print(f"path {path[::-1]}, pushes {num_pushes}")
+
+if __name__ == "__main__":
+    main()
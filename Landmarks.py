@@ -0,0 +1,312 @@
+# ALT heuristics (A*, landmarks, triangle inequality): the distance from every
+# cell to a few landmark cells is worked out once with BFS, and then for any
+# cell i and goal g and landmark L, |d(L, i) - d(L, g)| <= d(i, g), so the
+# largest of these bounds is an admissible (and consistent) estimate that,
+# unlike the Manhattan distance, knows about the walls a path must go around
+from Adjacency import *
+from FlatSearch import _finish
+from PriorityQueue import *
+from SearchStats import *
+from array import array
+from typing import Callable, List, Tuple
+import struct
+import sys
+import time
+import zlib
+
+# the ways of placing landmarks: "farthest" puts each one at the cell farthest
+# from those already chosen, "corners" first takes the cells nearest the
+# grid's corners and the middles of its sides, then carries on as "farthest"
+SELECTIONS = ("farthest", "corners")
+
+MAGIC   = b"ALTL"
+VERSION = 1
+# magic, format version, selection, rows, cols, number of landmarks asked
+# for, number chosen, CRC-32 of the open cells the tables were computed on
+HEADER  = struct.Struct("<4sHH5I")
+# maps every byte to 1 if it is non-zero, 0 o/w
+_NONZERO = bytes([0]) + bytes([1]) * 255
+
+def _distances(offsets: array, targets: array, source: int) -> array:
+    ''' returns the BFS distance from source to every cell, -1 if unreachable '''
+    distance = array('i', [-1]) * (len(offsets) - 1)
+    distance[source] = 0
+    frontier = [source]
+    for i in frontier:              # grows as it goes: a BFS
+        d = distance[i] + 1
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if distance[j] < 0:
+                distance[j] = d
+                frontier.append(j)
+    return distance
+
+def _fingerprint(open_cells: bytes) -> int:
+    ''' returns a CRC-32 of the open cells, to tell whether saved tables
+        still belong to a grid '''
+    return zlib.crc32(bytes(open_cells).translate(_NONZERO))
+
+class Landmarks:
+    ''' class holding the landmark cells of a grid and the BFS distance from
+        each of them to every cell (cells addressed by their flat id,
+        row * cols + col); the landmarks are all placed in the component of
+        one origin cell (e.g., a Maze's start), and give no bound for cells
+        outside it
+    '''
+    def __init__(self, open_cells: bytes, cols: int, origin: int, count: int = 8, \
+                       selection: str = "farthest", adjacency: Adjacency = None, \
+                       version: int = 0):
+        ''' initializer method for Landmarks, choosing the landmarks and
+            running one BFS from each
+        Parameters:
+            open_cells: one byte per cell, non-zero if the cell is not blocked
+            cols:       number of columns in the grid
+            origin:     id of an open cell in the component to cover
+            count:      number of landmarks wanted (fewer are chosen if the
+                        component has fewer cells)
+            selection:  how to place them, one of SELECTIONS
+            adjacency:  Adjacency of the grid (one is built if None)
+            version:    the grid version the tables are built from, so the
+                        owner can tell when they have gone stale
+        Raises:
+            ValueError if count is less than 1, selection is not one of
+            SELECTIONS, or origin is blocked
+        '''
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        if selection not in SELECTIONS:
+            raise ValueError(f"selection must be one of {', '.join(SELECTIONS)}")
+        if not open_cells[origin]:
+            raise ValueError("the origin cell is blocked")
+        began = time.perf_counter()
+        n = len(open_cells)
+        if adjacency is None:
+            adjacency = Adjacency(open_cells, cols)
+        offsets, targets = adjacency.offsets, adjacency.targets
+        self._rows, self._cols = n // cols, cols
+        self._count       = count
+        self._selection   = selection
+        self._version     = version
+        self._fingerprint = _fingerprint(open_cells)
+
+        # the cells of the origin's component, and for each the distance to
+        # the nearest landmark so far (from the origin, to start with)
+        nearest = _distances(offsets, targets, origin)
+        component = [i for i in range(n) if nearest[i] >= 0]
+        candidates: List[int] = []
+        if selection == "corners":
+            rows = self._rows
+            for row, col in ((0, 0), (0, cols - 1), (rows - 1, 0), (rows - 1, cols - 1),
+                             (0, cols // 2), (rows - 1, cols // 2), (rows // 2, 0), (rows // 2, cols - 1)):
+                candidates.append(min(component, key = lambda i: abs(i // cols - row) + abs(i % cols - col)))
+
+        self._landmarks = array('i')
+        self._tables: List[array] = []
+        while len(self._landmarks) < min(count, len(component)):
+            if candidates:
+                landmark = candidates.pop(0)
+                if landmark in self._landmarks:
+                    continue
+            else:
+                landmark = max(component, key = nearest.__getitem__)
+                if nearest[landmark] == 0 and self._landmarks:
+                    break           # every cell is a landmark already
+            table = _distances(offsets, targets, landmark)
+            if not self._landmarks:
+                nearest = array(table.typecode, table)
+            for i in component:
+                if table[i] < nearest[i]:
+                    nearest[i] = table[i]
+            self._landmarks.append(landmark)
+            self._tables.append(table)
+        self._build_seconds = time.perf_counter() - began
+
+    def landmarks(self) -> List[int]:
+        ''' returns the ids of the landmark cells '''
+        return list(self._landmarks)
+
+    def count(self) -> int:
+        ''' returns the number of landmarks asked for (more than landmarks()
+            holds if the component has fewer cells) '''
+        return self._count
+
+    def selection(self) -> str:
+        ''' returns how the landmarks were placed, one of SELECTIONS '''
+        return self._selection
+
+    def version(self) -> int:
+        ''' returns the grid version the tables were built from '''
+        return self._version
+
+    def heuristic(self, goal: int) -> Callable[[int], int]:
+        ''' method to build the ALT estimate of the distance to a goal
+        Parameters:
+            goal: id of the goal cell
+        Returns:
+            a function from a cell id to the largest of the landmark bounds
+            and the Manhattan distance
+        '''
+        pairs = [(table, table[goal]) for table in self._tables if table[goal] >= 0]
+        cols = self._cols
+        goal_row, goal_col = divmod(goal, cols)
+        def estimate(i: int) -> int:
+            row, col = divmod(i, cols)
+            h = abs(goal_row - row) + abs(goal_col - col)
+            for table, to_goal in pairs:
+                d = table[i] - to_goal
+                if d > h:
+                    h = d
+                elif -d > h:
+                    h = -d
+            return h
+        return estimate
+
+    def nbytes(self) -> int:
+        ''' returns the memory held by the distance tables, in bytes '''
+        return sum(len(table) * table.itemsize for table in self._tables)
+
+    def stats(self) -> dict:
+        ''' returns the number of landmarks, the seconds the BFS runs took and
+            the memory held by the tables '''
+        return {"landmarks": len(self._landmarks), "selection": self._selection,
+                "preprocessing_seconds": self._build_seconds, "nbytes": self.nbytes()}
+
+    def save(self, path: str) -> None:
+        ''' method to write the landmarks and their tables to a file, so they
+            can be loaded rather than computed again
+        Parameters:
+            path: name of the file to create (or overwrite)
+        '''
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, SELECTIONS.index(self._selection), self._rows, \
+                                   self._cols, self._count, len(self._landmarks), self._fingerprint))
+            for values in [self._landmarks] + self._tables:
+                if sys.byteorder == "big":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(file)
+
+    @classmethod
+    def load(cls, path: str, open_cells: bytes, cols: int, version: int = 0) -> 'Landmarks':
+        ''' method to read landmarks written by save
+        Parameters:
+            path:       name of the file
+            open_cells: the grid's open cells, checked against those the
+                        tables were computed on
+            cols:       number of columns in the grid
+            version:    the grid version to record, as for the initializer
+        Returns:
+            the Landmarks
+        Raises:
+            ValueError if the file is not a landmarks file of this version,
+            or was computed on a different grid
+        '''
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError("not a landmarks file (too short)")
+            magic, file_version, selection, rows, file_cols, asked, count, fingerprint = \
+                HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError("not a landmarks file (bad magic number)")
+            if file_version != VERSION:
+                raise ValueError(f"unsupported landmarks file version {file_version}")
+            if selection >= len(SELECTIONS):
+                raise ValueError(f"unknown landmark selection {selection}")
+            if (rows * file_cols, file_cols) != (len(open_cells), cols) or \
+               fingerprint != _fingerprint(open_cells):
+                raise ValueError("the landmarks file was computed on a different grid")
+            landmarks = cls.__new__(cls)
+            landmarks._rows, landmarks._cols = rows, cols
+            landmarks._count       = asked
+            landmarks._selection   = SELECTIONS[selection]
+            landmarks._version     = version
+            landmarks._fingerprint = fingerprint
+            landmarks._build_seconds = 0.0
+            try:
+                landmarks._landmarks = array('i')
+                landmarks._landmarks.fromfile(file, count)
+                landmarks._tables = []
+                for _ in range(count):
+                    table = array('i')
+                    table.fromfile(file, rows * cols)
+                    landmarks._tables.append(table)
+            except EOFError:
+                raise ValueError("landmarks file size doesn't match its header") from None
+        if sys.byteorder == "big":
+            for values in [landmarks._landmarks] + landmarks._tables:
+                values.byteswap()
+        return landmarks
+
+def flat_alt(passable: bytes, cols: int, start: int, goal: int, parents: array, \
+             landmarks: Landmarks, stats: SearchStats = None, hooks: SearchHooks = None, \
+             adjacency: Adjacency = None) -> Tuple[int, int]:
+    ''' function to perform A* over flat cell ids with the ALT heuristic of
+        landmarks (see Landmarks.heuristic) in place of the Manhattan
+        distance; it is consistent, so paths are shortest and each cell is
+        expanded at most once, and in mazes with long detours far fewer cells
+        are expanded than by flat_a_star; see flat_dfs for the other
+        parameters
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(passable)
+    if adjacency is None:
+        adjacency = Adjacency(passable, cols)
+    offsets, targets = adjacency.offsets, adjacency.targets
+    estimate = landmarks.heuristic(goal)
+    cost = array('i', [-1]) * n     # g(n) for each cell, -1 if not yet seen
+    closed = bytearray(n)           # cells already expanded
+    to_explore = IndexedPriorityQueue()
+
+    h = estimate(start)
+    cost[start] = 0
+    to_explore.insert((h, h), start)
+    num_pushes, pops, peak, found = 1, 0, 1, -1
+    if on_push is not None: on_push(start)
+
+    while not to_explore.is_empty():
+        i = to_explore.remove_min()._value
+        pops += 1
+        closed[i] = 1
+        if i == goal:
+            found = i
+            break
+        if on_expand is not None: on_expand(i)
+
+        updated_cost = cost[i] + 1
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if passable[j] and not closed[j] and (cost[j] < 0 or updated_cost < cost[j]):
+                cost[j] = updated_cost
+                h = estimate(j)
+                to_explore.update_or_insert((updated_cost + h, h), j)
+                parents[j] = i
+                num_pushes += 1
+                if on_push is not None: on_push(j)
+        if len(to_explore) > peak:
+            peak = len(to_explore)
+
+    _finish(stats, hooks, found, num_pushes, pops, pops - (found >= 0), peak)
+    return found, num_pushes
+
+def main():
+    from Maze import Maze, Position
+    import os, tempfile
+    maze = Maze(150, 150, 0.2, Position(0, 0), Position(149, 149), compact = True, \
+                generator = "kruskal", seed = 3)
+    for selection in SELECTIONS:
+        print(maze.landmarks(8, selection).stats())
+        print(maze.search("alt_a_star", count = 8, selection = selection))
+    print(maze.search("a_star"))
+
+    # the tables are saved next to the maze, and picked up again on load
+    path = os.path.join(tempfile.gettempdir(), "example.maze")
+    maze.save(path)
+    loaded = Maze.load(path)
+    print(loaded.landmarks(8, "corners").stats())
+    print(loaded.search("alt_a_star", selection = "corners"))
+    os.remove(path)
+    os.remove(path + ".landmarks")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,35 @@
 from Stack import *
 from Queue import *
 from PriorityQueue import *
+from FlatSearch import *
+from SparseSearch import *
+from SearchStats import *
+from JumpPoint import *
+from MultiSearch import *
+from Components import *
+from Adjacency import *
+from PathCache import *
+from Replanner import *
+from Hierarchy import *
+from Contraction import *
+from Landmarks import Landmarks, flat_alt, SELECTIONS as LANDMARK_SELECTIONS
+from Anytime import AnytimeSearch, Improvement, flat_bounded_a_star
+from Stepper import Stepper, BudgetExhausted
+from Generators import generate, PERFECT
+from Render import render
+from MazeFile import Header, PackedGrid, write as write_maze_file
+from DistanceField import wavefront, descend, open_mask
 from enum import Enum
-from typing import List, NamedTuple, Optional
-from typing import Union
+from typing import Callable, Iterable, List, NamedTuple, Optional
+from typing import Union, TextIO, Tuple
+from array import array
+import functools
+import io
+import os
 import random
+import sys
+import time
+import tracemalloc
 
 ################################################################################
 class Contents(str, Enum):
@@ -18,6 +43,18 @@ class Contents(str, Enum):
     BLOCKED = "░" #"X"
     PATH    = "*" #"*"
 
+# compact storage keeps one byte per cell holding the index of its Contents
+# entry (in declaration order), e.g., _CONTENTS[_CODE[Contents.GOAL]] is GOAL
+_CONTENTS     = tuple(Contents)
+_CODE         = {contents: code for code, contents in enumerate(_CONTENTS)}
+EMPTY_CODE    = _CODE[Contents.EMPTY]
+START_CODE    = _CODE[Contents.START]
+GOAL_CODE     = _CODE[Contents.GOAL]
+BLOCKED_CODE  = _CODE[Contents.BLOCKED]
+PATH_CODE     = _CODE[Contents.PATH]
+# the character shown for each code when rendering (see Render)
+_SYMBOLS      = {code: contents.value for code, contents in enumerate(_CONTENTS)}
+
 ################################################################################
 class Position(NamedTuple):
     ''' just allows us to use .row and .col rather than the less-easy-to-read
@@ -110,14 +147,112 @@ class Cell:
                self._position.col == other._position.col and \
                self._contents == other._contents
 
+################################################################################
+class CellView(Cell):
+    ''' a Cell created on demand for a compact Maze -- it stores only the Maze
+        and the flat index (row * cols + col) of the cell; contents, parent,
+        cost and heuristic are read from and written to the Maze's parallel
+        arrays, so the rest of the code can treat it like any other Cell
+    '''
+    def __init__(self, maze: 'Maze', index: int):
+        self._maze:  'Maze' = maze
+        self._index: int    = index
+
+    @property
+    def _position(self) -> Position:
+        return Position(*divmod(self._index, self._maze._num_cols))
+
+    @property
+    def _contents(self) -> Contents:
+        return _CONTENTS[self._maze._cells[self._index]]
+
+    @_contents.setter
+    def _contents(self, contents: Contents) -> None:
+        self._maze._cells[self._index] = _CODE[contents]
+
+    @property
+    def _parent(self) -> 'Cell':
+        parent = self._maze._parents[self._index]
+        return None if parent < 0 else CellView(self._maze, parent)
+
+    @_parent.setter
+    def _parent(self, cell: 'Cell') -> None:
+        self._maze._parents[self._index] = \
+            -1 if cell is None else self._maze._flatIndex(cell._position)
+
+    @property
+    def _g(self) -> int:
+        return self._maze._costs[self._index]
+
+    @_g.setter
+    def _g(self, item: int) -> None:
+        self._maze._costs[self._index] = item
+
+    @property
+    def _h(self) -> int:
+        return self._maze._heuristics[self._index]
+
+    @_h.setter
+    def _h(self, item: int) -> None:
+        self._maze._heuristics[self._index] = item
+
+################################################################################
+def _recorded(search):
+    ''' decorator for the Maze search methods that starts a fresh SearchStats
+        for each call (so counts never carry over from an earlier search),
+        times the call, and fills in the path length (and, with weights, its
+        cost) from the parents
+    '''
+    @functools.wraps(search)
+    def recorded(self: 'Maze', *args, **kwargs) -> Union[Cell, None]:
+        self._stats = stats = SearchStats(search.__name__)
+        self._num_pushes = 0
+        # paths are read back by following parents to one without a parent,
+        # and multi_search may have given the start one
+        self._start._parent = None
+        began = time.perf_counter()
+        goal = search(self, *args, **kwargs)
+        stats.wall_time = time.perf_counter() - began
+        stats.found = goal is not None
+        if goal is not None:
+            steps, cost, cell = 0, 0, goal
+            weights = self._weights
+            while cell._parent is not None:
+                if weights is not None:
+                    cost += weights[self._flatIndex(cell._position)]
+                cell = cell._parent
+                steps += 1
+            stats.path_length = steps
+            stats.path_cost = steps if weights is None else cost
+        return goal
+    return recorded
+
 ################################################################################
 class Maze:
     ''' class representing a 2D maze of Cell objects '''
 
+    ENGINES = ("cell", "flat")   # valid choices for the engine argument
+    # the search methods, by name, that search() can run
+    SEARCHES = ("dfs", "bfs", "a_star", "bidirectional_bfs", "bidirectional_a_star", \
+                "jump_point_search", "hpa_star", "dijkstra", "terrain_a_star", \
+                "contracted_search", "alt_a_star", "bounded_a_star", "anytime_a_star")
+    # the priority queues the weighted searches (dijkstra, terrain_a_star) can use
+    QUEUES = ("bucket", "heap")
+    # valid choices for the generator argument: "random" blocks prop_blocked
+    # of the cells, the others carve perfect (always solvable) mazes
+    GENERATORS = ("random",) + tuple(PERFECT)
+
+    # maps each contents code to 1 if the cell is not blocked
+    _OPEN     = bytes(0 if code == BLOCKED_CODE else 1 for code in range(256))
+    # maps each contents code to 1 if a search may move into such a cell
+    _PASSABLE = bytes(0 if code in (START_CODE, BLOCKED_CODE) else 1 for code in range(256))
+
     def __init__(self, rows: int = 20, cols: int = 20, prop_blocked: float = 0.2, \
                        start: Position = Position(0, 0), \
                        goal:  Position = Position(19, 19), \
-                       debug: bool = False):
+                       debug: bool = False, compact: bool = False, \
+                       engine: str = "cell", generator: str = None, \
+                       seed: int = None):
         ''' initializer method for a Maze object
         Parameters:
             rows:          number of rows in the grid
@@ -126,6 +261,18 @@ class Maze:
             start:         Position object indicating the (row,col) of the start cell
             goal:          Position object indicating the (row,col) of the goal cell
             debug:         whether to use one of the Maze examples from course slides
+            compact:       whether to store the grid in flat arrays (one byte of
+                           contents per cell, plus integer parent/cost arrays
+                           indexed by row * cols + col) rather than as a 2D list
+                           of Cell objects; Cells are then created on demand
+            engine:        which search implementation dfs/bfs/a_star use --
+                           "cell" walks Cell objects via getSearchLocations,
+                           "flat" runs the integer-id kernels in FlatSearch
+            generator:     None to block cells with the module's random state
+                           (as random.seed sets it), or one of Maze.GENERATORS
+                           to build the grid with the Generators module (see
+                           _generate); prop_blocked only applies to "random"
+            seed:          seed for the generator (None for a fresh one)
         '''
         try:
             float(prop_blocked)
@@ -138,17 +285,36 @@ class Maze:
         if not isinstance(start, Position) or not isinstance(goal, Position):
             raise ValueError("start and goal must both be Position objects")
 
+        if engine not in Maze.ENGINES:
+            raise ValueError(f"engine must be one of {', '.join(Maze.ENGINES)}")
+
+        if generator is not None and generator not in Maze.GENERATORS:
+            raise ValueError(f"generator must be one of {', '.join(Maze.GENERATORS)}")
+
         if debug:
             rows = 6; cols = 5;
             start = Position(5, 0)
             goal  = Position(0, 4)
 
 
-        self._num_rows = rows
-        self._num_cols = cols
+        self._initState(rows, cols, compact, engine)
+        codes = None
+        if generator is not None and not debug:
+            codes = self._generate(start, goal, prop_blocked, generator, seed)
+
+        if compact:
+            self._initCompact(start, goal, prop_blocked, debug, codes)
+            return
+
         self._start    = Cell(start.row, start.col, Contents.START)
         self._goal     = Cell(goal.row,  goal.col,  Contents.GOAL)
-        self._num_pushes = 0
+
+        if codes is not None:
+            self._grid: list[list[Cell]] = \
+                [ [Cell(r,c, _CONTENTS[codes[r * cols + c]]) for c in range(cols)] for r in range(rows) ]
+            self._grid[start.row][start.col] = self._start
+            self._grid[goal.row][goal.col]   = self._goal
+            return
 
         # create a rows x cols 2D list of Cell objects, intially all empty
         self._grid: list[list[Cell]] = \
@@ -165,9 +331,11 @@ class Maze:
         #   options and self._grid so that updates to options will be seen
         #   in self._grid (i.e., options is not a deep copy of cells);
         if not debug:
-            options = [cell for row in self._grid for cell in row]
-            options.remove(self._start)
-            options.remove(self._goal)
+            # skip the start and goal by identity while flattening, which
+            # gives the same list as removing them afterwards without two
+            # linear scans comparing Cells
+            options = [cell for row in self._grid for cell in row
+                       if cell is not self._start and cell is not self._goal]
             blocked = random.sample(options, k = round((rows * cols - 2) * prop_blocked))
             for b in blocked:
                 b._contents = Contents.BLOCKED  # this is changing self._grid!
@@ -177,16 +345,720 @@ class Maze:
             for p in pos:
                 self._grid[p[0]][p[1]]._contents = Contents.BLOCKED
 
+    def _initState(self, rows: int, cols: int, compact: bool, engine: str) -> None:
+        ''' helper method for the initializer (and load) that sets the size,
+            storage and search options and the empty caches
+        '''
+        self._num_rows = rows
+        self._num_cols = cols
+        self._num_pushes = 0
+        self._compact  = compact
+        self._engine   = engine
+        self._version  = 0          # bumped every time set_blocked edits the grid
+        self._components: ComponentIndex = None     # built on first use
+        self._adjacency:  Adjacency      = None     # built on first use, rebuilt after edits
+        self._row_reader: Tuple[int, RowReader] = None  # (version, rows read) of a mapped grid
+        self._goal_tree:  GoalTree       = None     # built on first path_from
+        self._replanner:  Replanner      = None     # created by replanner()
+        self._hierarchy:  HierarchicalPlanner = None    # created by hierarchy()
+        self._contraction: ContractedGraph = None   # built by contraction()
+        self._landmarks:  Landmarks      = None     # built (or loaded) by landmarks()
+        self._landmarks_path: str        = None     # file load found them saved in
+        self._stats:      SearchStats    = None     # stats of the latest search
+        self._hooks:      SearchHooks    = None     # set by set_hooks
+        self._weights:    bytearray      = None     # step costs, set by set_weight(s)
+
+    def __getattr__(self, name: str):
+        ''' allocates the parent/cost/heuristic arrays of a compact Maze the
+            first time each one is used, since a Maze loaded from a file may be
+            far bigger than any search on it will need them to be
+        '''
+        if name in ("_parents", "_costs", "_heuristics") and self.__dict__.get("_compact"):
+            n = self._num_rows * self._num_cols
+            if isinstance(self.__dict__.get("_cells"), PackedGrid):
+                # a mapped grid may be too big for arrays; only the cells a
+                # search reaches are stored
+                value = SparseInts(-1 if name == "_parents" else 0)
+            else:
+                value = array('i', [-1]) * n if name == "_parents" else array('i', bytes(4 * n))
+            setattr(self, name, value)
+            return value
+        raise AttributeError(f"'Maze' object has no attribute '{name}'")
+
+    @classmethod
+    def load(cls, path: str, mapped: bool = True, engine: str = "cell") -> 'Maze':
+        ''' method to load a Maze saved by save; the Maze always uses compact
+            storage
+        Parameters:
+            path:   name of the maze file
+            mapped: whether to search the file in place through a memory map
+                    (opening is then instant, and dfs, bfs and a_star read
+                    only the rows they look at and keep their state in
+                    dicts, so they cost in proportion to the cells they
+                    reach; edits are kept in memory and never written back),
+                    rather than reading the whole grid into a bytearray of
+                    one contents code per cell; the other searches, and
+                    is_reachable, still build structures over the whole grid
+            engine: which search implementation dfs/bfs/a_star use
+        Returns:
+            the loaded Maze
+        Raises:
+            ValueError if the file is not a valid maze file, or engine is
+            not one of Maze.ENGINES
+        '''
+        if engine not in Maze.ENGINES:
+            raise ValueError(f"engine must be one of {', '.join(Maze.ENGINES)}")
+        grid = PackedGrid(path, BLOCKED_CODE, EMPTY_CODE)
+        header = grid.header()
+        if not mapped:
+            cells = bytearray(bytes(grid))
+            grid.close()
+            grid = cells
+
+        maze = cls._fromCells(grid, header.rows, header.cols, \
+                              Position(*header.start), Position(*header.goal), engine)
+        if os.path.exists(path + ".landmarks"):
+            maze._landmarks_path = path + ".landmarks"
+        return maze
+
+    @classmethod
+    def _fromCells(cls, cells: bytearray, rows: int, cols: int, \
+                        start: Position, goal: Position, engine: str = "cell") -> 'Maze':
+        ''' method to create a compact Maze around an existing flat buffer of
+            contents codes, which becomes its storage (it is not copied)
+        Parameters:
+            cells:  one contents code per cell, indexed by row * cols + col
+            rows:   number of rows in the grid
+            cols:   number of columns in the grid
+            start:  Position of the start cell (its code is set to START)
+            goal:   Position of the goal cell (its code is set to GOAL)
+            engine: which search implementation dfs/bfs/a_star use
+        Returns:
+            the new Maze
+        '''
+        maze = cls.__new__(cls)
+        maze._initState(rows, cols, True, engine)
+        maze._cells = cells
+        start_index = maze._flatIndex(start)
+        goal_index  = maze._flatIndex(goal)
+        maze._cells[start_index] = START_CODE
+        maze._cells[goal_index]  = GOAL_CODE
+        maze._start = CellView(maze, start_index)
+        maze._goal  = CellView(maze, goal_index)
+        return maze
+
+    def save(self, path: str) -> None:
+        ''' method to save the Maze in the bit-packed format of MazeFile (one
+            bit per cell, 1 if blocked), writing one row at a time so the whole
+            grid is never copied; path marks are not saved; landmark tables
+            built for the current grid (see landmarks) are saved next to it,
+            in path + ".landmarks", for load to pick up
+        Parameters:
+            path: name of the file to create (or overwrite)
+        '''
+        header = Header(self._num_rows, self._num_cols, \
+                        tuple(self._start.getPosition()), tuple(self._goal.getPosition()))
+        write_maze_file(path, header, (self._rowCodes(r) for r in range(self._num_rows)), BLOCKED_CODE)
+        if self._landmarks is not None and self._landmarks.version() == self._version:
+            self._landmarks.save(path + ".landmarks")
+
+    def _rowCodes(self, row: int, first: int = 0, last: int = None) -> bytes:
+        ''' method to return the contents codes of (part of) one row of the grid
+        Parameters:
+            row:   the row number
+            first: the first column wanted
+            last:  one past the last column wanted (None for the end of the row)
+        Returns:
+            a bytes-like object with one code per column from first to last
+        '''
+        last = self._num_cols if last is None else last
+        if self._compact:
+            return self._cells[row * self._num_cols + first:row * self._num_cols + last]
+        return bytes([_CODE[cell._contents] for cell in self._grid[row][first:last]])
+
+    def _generate(self, start: Position, goal: Position, prop_blocked: float, \
+                        generator: str, seed: int) -> bytearray:
+        ''' helper method for the initializer that builds the grid with one of
+            the Generators functions, writing into a flat buffer of contents
+            codes (which becomes the storage itself when compact=True)
+        Parameters:
+            start:         Position of the start cell
+            goal:          Position of the goal cell
+            prop_blocked:  proportion of cells to block ("random" only)
+            generator:     one of Maze.GENERATORS
+            seed:          seed for the generator
+        Returns:
+            a bytearray with one contents code per cell, start and goal included
+        '''
+        cells = bytearray(self._num_rows * self._num_cols)
+        start_index = self._flatIndex(start)
+        goal_index  = self._flatIndex(goal)
+        generate(cells, self._num_cols, start_index, goal_index, generator, \
+                 prop_blocked, BLOCKED_CODE, EMPTY_CODE, seed)
+        cells[start_index] = START_CODE
+        cells[goal_index]  = GOAL_CODE
+        return cells
+
+    def _initCompact(self, start: Position, goal: Position, \
+                           prop_blocked: float, debug: bool, \
+                           codes: bytearray = None) -> None:
+        ''' helper method for the initializer that sets up the flat-array
+            storage used when compact=True: _cells holds one contents code per
+            cell, and _parents/_costs/_heuristics are parallel int arrays
+            (-1 meaning no parent), all indexed by row * cols + col
+        Parameters:
+            start:         Position of the start cell
+            goal:          Position of the goal cell
+            prop_blocked:  proportion of cells to be blocked
+            debug:         whether to use the Maze example from course slides
+            codes:         the grid made by _generate, if a generator was used
+        '''
+        n = self._num_rows * self._num_cols
+        self._cells       = bytearray(n) if codes is None else codes   # all EMPTY_CODE (0)
+        # _parents, _costs and _heuristics are allocated on first use (see __getattr__)
+
+        start_index = self._flatIndex(start)
+        goal_index  = self._flatIndex(goal)
+        self._start = CellView(self, start_index)
+        self._goal  = CellView(self, goal_index)
+        if codes is not None:
+            return
+        self._cells[start_index] = START_CODE
+        self._cells[goal_index]  = GOAL_CODE
+
+        if not debug:
+            # sampling indices from a range of the same length as the options
+            # list used by the Cell grid picks exactly the same cells for the
+            # same random seed; each sampled index is then shifted past the
+            # start and goal to recover its flat index in the grid
+            low, high = sorted((start_index, goal_index))
+            blocked = random.sample(range(n - 2), k = round((n - 2) * prop_blocked))
+            for b in blocked:
+                if b >= low:  b += 1
+                if b >= high: b += 1
+                self._cells[b] = BLOCKED_CODE
+        else:
+            # for example from slides
+            pos = [(1,0),(1,3),(2,1),(2,4),(3,2),(5,1),(5,3),(5,4)]
+            for p in pos:
+                self._cells[p[0] * self._num_cols + p[1]] = BLOCKED_CODE
+
+    def _flatIndex(self, position: Position) -> int:
+        ''' method to convert a (row,col) Position to its flat index
+        Parameters:
+            position: a Position in the grid
+        Returns:
+            the integer row * cols + col
+        '''
+        return position.row * self._num_cols + position.col
+
+    def _positionOf(self, index: int) -> Position:
+        ''' method to convert a flat index back to a (row,col) Position
+        Parameters:
+            index: row * cols + col of a cell
+        Returns:
+            the Position of that cell
+        '''
+        return Position(*divmod(index, self._num_cols))
+
+    def _cellAt(self, row: int, col: int) -> Cell:
+        ''' method to return the Cell at the given row and column, creating a
+            CellView on demand when the Maze uses compact storage
+        Parameters:
+            row: row of the cell
+            col: column of the cell
+        Returns:
+            the Cell object at (row, col)
+        '''
+        if self._compact:
+            return CellView(self, row * self._num_cols + col)
+        return self._grid[row][col]
+
+    def _codes(self) -> bytes:
+        ''' method to return the contents code of every cell in one flat buffer
+        Returns:
+            a bytes-like object with one entry per cell (indexed by
+            row * cols + col); the compact storage itself when compact=True
+        '''
+        if self._compact:
+            return self._cells
+        return bytes([_CODE[cell._contents] for row in self._grid for cell in row])
+
+    def _passable(self) -> bytes:
+        ''' method to build a flat mask of the cells a search may move into
+        Returns:
+            a bytes object with one entry per cell (indexed by row * cols + col)
+            that is 1 if the cell is neither blocked nor the start, 0 o/w
+        '''
+        return self._codes().translate(Maze._PASSABLE)
+
+    def _flatSearch(self, kernel) -> Union[Cell, None]:
+        ''' method to run one of the FlatSearch kernels on this Maze and convert
+            its result back to Cells, linking the parents along the path so
+            that showPath works as it does for the Cell-based searches
+        Parameters:
+            kernel: one of the FlatSearch kernels (or one with the same
+                    signature), given the Maze's current stats and hooks
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        '''
+        if self._ruledOut():
+            return None
+
+        n = self._num_rows * self._num_cols
+        parents = self._parents if self._compact else array('i', [-1]) * n
+        start = self._flatIndex(self._start.getPosition())
+        goal  = self._flatIndex(self._goal.getPosition())
+
+        found, num_pushes = kernel(self._passable(), self._num_cols, start, goal, parents, \
+                                   self._stats, self._hooks)
+        self._num_pushes += num_pushes
+        if found < 0:
+            self._exhausted()
+            return None
+
+        if not self._compact:
+            self._linkPath(found, start, parents)
+        return self._goal
+
+    def _linkPath(self, found: int, start: int, parents: array) -> None:
+        ''' method to set the Cell parents along a path found by a flat search
+            (only the cells on the path need them), so that getParent and
+            showPath can follow it
+        Parameters:
+            found:   id of the cell the path ends at
+            start:   id of the cell the path starts at
+            parents: int array giving the id of the cell before each one
+        '''
+        i = found
+        while i != start:
+            self._cellAt(*divmod(i, self._num_cols))._parent = \
+                self._cellAt(*divmod(parents[i], self._num_cols))
+            i = parents[i]
+
+    def _componentIndex(self) -> ComponentIndex:
+        ''' method to return the connected-component labels of the open cells,
+            labeling them the first time they are needed
+        Returns:
+            the Maze's ComponentIndex
+        '''
+        if self._components is None:
+            self._components = ComponentIndex(self._codes().translate(Maze._OPEN), self._num_cols)
+        return self._components
+
+    def _ruledOut(self) -> bool:
+        ''' method for the searches to skip a search that can't succeed: the
+            component labels are only looked at once they exist (see
+            _exhausted), so a search that finds its goal never pays for them
+        Returns:
+            True if the labels are built and show that the goal can't be
+            reached from the start, False o/w
+        '''
+        return self._components is not None and \
+               not self._components.connected(self._flatIndex(self._start.getPosition()), \
+                                              self._flatIndex(self._goal.getPosition()))
+
+    def _exhausted(self) -> None:
+        ''' method for a search to call when it has emptied its frontier
+            without reaching the goal: the component labels are built then, so
+            that later searches between cells that aren't connected are ruled
+            out at once rather than searching the whole component again; a
+            memory-mapped grid is never labeled here, as that reads all of it
+        '''
+        if not self._mapped():
+            self._componentIndex()
+
+    def _mapped(self) -> bool:
+        ''' returns True if the Maze searches a memory-mapped file in place '''
+        return self._compact and isinstance(self._cells, PackedGrid)
+
+    def _flatKernel(self, kernel):
+        ''' method to pick the kernel dfs, bfs and a_star run with the flat
+            engine: the FlatSearch kernel over the cached Adjacency, or for a
+            memory-mapped grid its SparseSearch counterpart, which reads rows
+            on demand rather than building arrays over the whole grid
+        Parameters:
+            kernel: one of the FlatSearch kernels named in SPARSE_KERNELS
+        Returns:
+            the kernel to pass to _flatSearch
+        '''
+        if self._mapped():
+            return SPARSE_KERNELS[kernel.__name__]
+        return functools.partial(kernel, adjacency = self.adjacency())
+
+    def adjacency(self) -> Adjacency:
+        ''' method to return the neighbors of every cell in CSR form (see
+            Adjacency), which all the searches take their moves from; the
+            arrays are built on first use and rebuilt only after the grid has
+            been edited, so a search pays for no bounds or blocked checks
+        Returns:
+            the Maze's Adjacency over its open cells (the start included, so
+            searches that must not re-enter it still check passable)
+        '''
+        adjacency = self._adjacency
+        if adjacency is None or adjacency.version() != self._version:
+            adjacency = self._adjacency = Adjacency(self._codes().translate(Maze._OPEN), \
+                                                    self._num_cols, self._version)
+        return adjacency
+
+    def is_reachable(self, a: Position, b: Position) -> bool:
+        ''' method to determine in O(1) (after a one-off labeling of the
+            grid) whether there is any path between two cells
+        Parameters:
+            a: Position of one cell
+            b: Position of the other cell
+        Returns:
+            True if both cells are open and connected, False o/w
+        '''
+        return self._componentIndex().connected(self._flatIndex(a), self._flatIndex(b))
+
+    def path_from(self, start: Position) -> 'List[Position] | None':
+        ''' method to find a shortest path from any cell to the Maze goal
+            using a cached BFS tree rooted at the goal; the tree is built by
+            the first call (one reverse BFS over the grid) and rebuilt only
+            after the grid has been edited, so each query costs O(path length)
+        Parameters:
+            start: Position of the cell to start from
+        Returns:
+            the list of Positions from start to the goal (inclusive), or None
+            if the goal can't be reached from start
+        '''
+        tree = self._goal_tree
+        if tree is None or tree.version() != self._version:
+            tree = self._goal_tree = GoalTree(self._codes().translate(Maze._OPEN), self._num_cols, \
+                                              self._flatIndex(self._goal.getPosition()), self._version)
+        path = tree.path_from(self._flatIndex(start))
+        if path is None:
+            return None
+        return [self._positionOf(i) for i in path]
+
+    def path_cache_nbytes(self) -> int:
+        ''' method to report the memory held by the path_from cache
+        Returns:
+            the size of the cached goal tree in bytes (0 if none is built)
+        '''
+        return 0 if self._goal_tree is None else self._goal_tree.nbytes()
+
+    def replanner(self) -> Replanner:
+        ''' method to return the Replanner attached to this Maze (creating it
+            on first use), which keeps A*'s state between edits so that after
+            cells are blocked/unblocked through it, replan() only repairs the
+            part of the search affected by the change
+        Returns:
+            the Maze's Replanner
+        '''
+        if self._replanner is None:
+            self._replanner = Replanner(self)
+        return self._replanner
+
+    def hierarchy(self, cluster_size: int = 10) -> HierarchicalPlanner:
+        ''' method to return the HierarchicalPlanner attached to this Maze,
+            building it (entrances and intra-cluster distances for every
+            cluster) on first use or when a different cluster size is asked for
+        Parameters:
+            cluster_size: the number of rows and columns in each cluster
+        Returns:
+            the Maze's HierarchicalPlanner; see its stats() for preprocessing
+            time and memory, and its set_blocked for cluster-local updates
+        '''
+        if self._hierarchy is None or self._hierarchy._size != cluster_size:
+            self._hierarchy = HierarchicalPlanner(self, cluster_size)
+        return self._hierarchy
+
+    @_recorded
+    def hpa_star(self, cluster_size: int = 10) -> Union[Cell, None]:
+        ''' method to perform hierarchical A* (see Hierarchy): search the
+            abstract cluster graph, then refine the clusters on the route with
+            cell-level A*; much less work per query on very large grids, at the
+            cost of paths that may be slightly longer than the shortest
+        Parameters:
+            cluster_size: the number of rows and columns in each cluster
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        '''
+        planner = self.hierarchy(cluster_size)
+        return self._flatSearch(lambda passable, cols, start, goal, parents, stats, hooks: \
+                                planner.search(start, goal, parents, stats, hooks))
+
+    def contraction(self) -> ContractedGraph:
+        ''' method to return the contracted graph of this Maze (see
+            Contraction): dead ends filled and corridors collapsed into
+            weighted edges between junctions, for its start and goal; it is
+            built on first use and rebuilt only after the grid has been edited
+        Returns:
+            the Maze's ContractedGraph; see its stats() for how much the
+            grid was reduced
+        '''
+        graph = self._contraction
+        if graph is None or graph.version() != self._version:
+            graph = self._contraction = ContractedGraph(self._codes().translate(Maze._OPEN), \
+                        self._num_cols, self._flatIndex(self._start.getPosition()), \
+                        self._flatIndex(self._goal.getPosition()), self.adjacency(), self._version)
+        return graph
+
+    def landmarks(self, count: int = 8, selection: str = "farthest") -> Landmarks:
+        ''' method to return the ALT landmarks of this Maze (see Landmarks),
+            placed in the start's component: they are loaded from the file
+            saved alongside the Maze if there is one for this grid, or else
+            built (one BFS per landmark) on first use, and rebuilt only after
+            the grid has been edited or other settings are asked for
+        Parameters:
+            count:     number of landmarks
+            selection: how to place them, "farthest" or "corners"
+        Returns:
+            the Maze's Landmarks
+        Raises:
+            ValueError if count is less than 1 or selection is unknown
+        '''
+        if selection not in LANDMARK_SELECTIONS:
+            raise ValueError(f"selection must be one of {', '.join(LANDMARK_SELECTIONS)}")
+        landmarks = self._landmarks
+        if landmarks is not None and landmarks.version() == self._version and \
+           landmarks.count() == count and landmarks.selection() == selection:
+            return landmarks
+        open_cells = self._codes().translate(Maze._OPEN)
+        if self._landmarks_path is not None:
+            try:
+                saved = Landmarks.load(self._landmarks_path, open_cells, self._num_cols, self._version)
+                if saved.count() == count and saved.selection() == selection:
+                    self._landmarks = saved
+                    return saved
+            except (OSError, ValueError):
+                self._landmarks_path = None     # gone, or for another grid
+        self._landmarks = Landmarks(open_cells, self._num_cols, self._flatIndex(self._start.getPosition()), \
+                                    count, selection, self.adjacency(), self._version)
+        return self._landmarks
+
+    @_recorded
+    def alt_a_star(self, count: int = 8, selection: str = "farthest") -> Union[Cell, None]:
+        ''' method to perform A* with the ALT heuristic (see landmarks): the
+            largest lower bound the triangle inequality gives through any
+            landmark, which, unlike the Manhattan distance, counts the
+            detours walls force, so far fewer cells are expanded in mazes;
+            the path is a shortest one
+        Parameters:
+            count:     number of landmarks
+            selection: how to place them, "farthest" or "corners"
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        '''
+        return self._flatSearch(lambda passable, cols, start, goal, parents, stats, hooks: \
+                                flat_alt(passable, cols, start, goal, parents, \
+                                         self.landmarks(count, selection), stats, hooks, self.adjacency()))
+
+    @_recorded
+    def bounded_a_star(self, epsilon: float = 0.1) -> Union[Cell, None]:
+        ''' method to perform weighted A* (see Anytime): the heuristic counts
+            1 + epsilon times over, so the search heads for the goal with far
+            fewer expansions, and the path is at most 1 + epsilon times the
+            shortest (e.g., at most 10% longer for 0.1)
+        Parameters:
+            epsilon: how much longer than the shortest the path may be, as a
+                     fraction of it (0 for plain A*)
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        Raises:
+            ValueError if epsilon is negative
+        '''
+        if epsilon < 0:
+            raise ValueError("epsilon must not be negative")
+        adjacency = self.adjacency()
+        return self._flatSearch(lambda passable, cols, start, goal, parents, stats, hooks: \
+                                flat_bounded_a_star(passable, cols, start, goal, parents, \
+                                                    epsilon, stats, hooks, adjacency))
+
+    @_recorded
+    def anytime_a_star(self, time_limit: float = None, epsilon: float = 1.0, decrement: float = 0.2, \
+                             on_improve: Callable[[Improvement], None] = None) -> Union[Cell, None]:
+        ''' method to perform ARA* (see Anytime.AnytimeSearch): a weighted
+            A* with weight 1 + epsilon finds a first path quickly, then the
+            weight is lowered by decrement at a time and the same search is
+            repaired for better paths, until the path is proven shortest or
+            time runs out
+        Parameters:
+            time_limit: most seconds to search (no limit if None)
+            epsilon:    the first heuristic weight is 1 + epsilon
+            decrement:  how much the weight drops after each path
+            on_improve: called with an Improvement (its path a list of
+                        Positions) for each better path, along with the
+                        factor it is proven to be within of the shortest
+        Returns:
+            the Maze goal Cell, linked along the best path found, or None if
+            the goal can't be reached or no path was found in time
+        Raises:
+            ValueError if epsilon is negative or decrement isn't positive
+        '''
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        if epsilon < 0:
+            raise ValueError("epsilon must not be negative")
+        if decrement <= 0:
+            raise ValueError("decrement must be positive")
+        if self._ruledOut():
+            return None
+        search = AnytimeSearch(self._passable(), self._num_cols, self._flatIndex(self._start.getPosition()), \
+                               self._flatIndex(self._goal.getPosition()), epsilon, decrement, \
+                               self._stats, self._hooks, self.adjacency())
+        for improvement in search.improvements(deadline):
+            if on_improve is not None:
+                on_improve(improvement._replace(path = [self._positionOf(i) for i in improvement.path]))
+        best = search.best()
+        if best is None:
+            if search.done():
+                self._exhausted()
+            return None
+
+        path = best.path
+        parents = self._parents if self._compact else array('i', [-1]) * (self._num_rows * self._num_cols)
+        for before, i in zip(path, path[1:]):
+            parents[i] = before
+        if not self._compact:
+            self._linkPath(path[-1], path[0], parents)
+        return self._goal
+
+    @_recorded
+    def contracted_search(self, heuristic: bool = True) -> Union[Cell, None]:
+        ''' method to perform A* over the contracted graph (see contraction),
+            expanding the corridors on its route back into cells; the path is
+            a shortest one, and the counts are of junctions, not cells
+        Parameters:
+            heuristic: False to run Dijkstra's algorithm instead
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        '''
+        return self._flatSearch(lambda passable, cols, start, goal, parents, stats, hooks: \
+                                self.contraction().search(start, goal, parents, stats, hooks, heuristic))
+
+    def stepper(self, method: str = "a_star", batch: int = 100) -> Stepper:
+        ''' method to create a Stepper for this Maze: a search that runs a
+            batch of expansions at a time (see Stepper.step and Stepper.run),
+            so it can be time-boxed, interleaved with other work, or stopped
+            early with the path to the closest cell reached so far
+        Parameters:
+            method: the search to run, "dfs", "bfs" or "a_star"
+            batch:  default number of expansions per step
+        Returns:
+            a new Stepper (several may run on the same Maze)
+        '''
+        return Stepper(self, method, batch)
+
+    def budgeted_search(self, method: str = "a_star", max_expansions: int = None, \
+                              time_limit: float = None) -> Union[Cell, None, BudgetExhausted]:
+        ''' method to search within an expansion and/or time budget
+        Parameters:
+            method:         the search to run, "dfs", "bfs" or "a_star"
+            max_expansions: most expansions to do (no limit if None)
+            time_limit:     most seconds to spend (no limit if None)
+        Returns:
+            a Cell object corresponding to the Maze goal, None if no goal can
+            be found, or a BudgetExhausted (holding the best partial path) if
+            the budget ran out first
+        '''
+        return self.stepper(method).run(max_expansions, time_limit)
+
+    def _checkBlockable(self, position: Position) -> None:
+        ''' helper method raising ValueError if the cell at position may not
+            be blocked or unblocked (it is the start or goal, or is outside
+            the grid) '''
+        if not (0 <= position.row < self._num_rows and 0 <= position.col < self._num_cols):
+            raise ValueError(f"{position} is outside the grid")
+        if position == self._start.getPosition() or position == self._goal.getPosition():
+            raise ValueError("the start and goal cells can't be blocked")
+
+    def set_blocked(self, position: Position, flag: bool) -> None:
+        ''' method to block or unblock a single cell, keeping the component
+            labels (if built) up to date incrementally
+        Parameters:
+            position: Position of the cell to change
+            flag:     True to block the cell, False to make it empty
+        Raises:
+            ValueError if the position is the start or goal, or is outside
+            the grid
+        '''
+        self._checkBlockable(position)
+        cell = self._cellAt(position.row, position.col)
+        if cell.isBlocked() == flag:
+            return
+        cell._contents = Contents.BLOCKED if flag else Contents.EMPTY
+        self._version += 1
+        if self._components is not None:
+            if flag:
+                self._components.block(self._flatIndex(position))
+            else:
+                self._components.unblock(self._flatIndex(position))
+
+    def set_weight(self, position: Position, weight: int) -> None:
+        ''' method to set the cost of moving into a cell, for the weighted
+            searches (dijkstra and terrain_a_star); every cell costs 1 until
+            a weight is set, and the other searches always count steps
+        Parameters:
+            position: Position of the cell
+            weight:   the cost, an integer from 1 to 255
+        Raises:
+            ValueError if the position is outside the grid or the weight is
+            out of range
+        '''
+        if not (0 <= position.row < self._num_rows and 0 <= position.col < self._num_cols):
+            raise ValueError(f"{position} is outside the grid")
+        if not 1 <= weight <= 255:
+            raise ValueError("weight must be an integer from 1 to 255")
+        if self._weights is None:
+            self._weights = bytearray(b"\x01") * (self._num_rows * self._num_cols)
+        self._weights[self._flatIndex(position)] = weight
+
+    def get_weight(self, position: Position) -> int:
+        ''' method to return the cost of moving into a cell '''
+        return 1 if self._weights is None else self._weights[self._flatIndex(position)]
+
+    def set_weights(self, weights: bytes) -> None:
+        ''' method to set the cost of moving into every cell at once
+        Parameters:
+            weights: one cost (1 to 255) per cell, indexed by row * cols + col
+                     (e.g., from Generators.random_weights), or None to make
+                     every cell cost 1 again
+        Raises:
+            ValueError if weights has the wrong length or holds a 0
+        '''
+        if weights is None:
+            self._weights = None
+            return
+        if len(weights) != self._num_rows * self._num_cols:
+            raise ValueError("weights must have one entry per cell")
+        weights = bytearray(weights)
+        if 0 in weights:
+            raise ValueError("weight must be an integer from 1 to 255")
+        self._weights = weights
+
+    def render(self, stream: TextIO = None, path: List[Position] = None, \
+                     window: Tuple[int, int, int, int] = None, step: int = 1) -> None:
+        ''' method to write the Maze as text, one row at a time, with cells
+            delimited by vertical pipes (see Render.render)
+        Parameters:
+            stream: the text stream to write to (standard output if None)
+            path:   Positions to show as Contents.PATH (other than the start
+                    and goal), without changing the grid
+            window: (first row, first col, number of rows, number of cols) of
+                    the part of the Maze to show, or None for all of it
+            step:   show each step x step block of cells as one character
+        '''
+        render(sys.stdout if stream is None else stream, self._rowCodes, \
+               self._num_rows, self._num_cols, _SYMBOLS, \
+               () if path is None else path, PATH_CODE, (START_CODE, GOAL_CODE), \
+               window, step)
+
     def __str__(self) -> str:
         ''' creates a str version of the Maze, showing contents, with cells
             delimited by vertical pipes
         Returns:
             a str representation of the Maze
         '''
-        maze_str = ""
-        for row in self._grid:  # row : List[Cell]
-            maze_str += "|" + "|".join([cell._contents for cell in row]) + "|\n"
-        return maze_str[:-1]  # remove the final \n
+        buffer = io.StringIO()
+        self.render(buffer)
+        return buffer.getvalue()[:-1]  # remove the final \n
 
     def getStart(self) -> Cell:
         ''' accessor method to return the Cell object corresponding to the Maze start
@@ -211,120 +1083,216 @@ class Maze:
             a list of valid Cell objects (in N/S/W/E exploration) for further
             consideration
         '''
-        cell_list =[]
-
-        position = search_cell.getPosition()
-        #checking to see if we can move to the north cell
-        if position.row -1 >= 0 :
-            cell = self._grid[position.row-1][position.col]
-            if cell.isBlocked() or cell == self._start:
-                pass
-            else:
-                cell_list.append(cell)
-
-        #checking for the south cell
-        if position.row +1 < self._num_rows:
-            cell = self._grid[position.row+1][position.col]
-            if cell.isBlocked() or cell == self._start:
-                pass
-            else:
-                cell_list.append(cell)
-
-
-        #checking for west cell
-        if position.col - 1 >= 0:
-            cell = self._grid[position.row][position.col-1]
-            if cell.isBlocked() or cell == self._start:
-                pass
-            else:
-                cell_list.append(cell)
-        #checking for east cell
-        if position.col +1 < self._num_cols:
-            cell = self._grid[position.row][position.col+1]
-            if cell.isBlocked() or cell == self._start:
-                pass
-            else:
+        i = self._flatIndex(search_cell.getPosition())
+        if self._mapped():
+            # rows of a mapped grid are read as the search reaches them
+            if self._row_reader is None or self._row_reader[0] != self._version:
+                self._row_reader = (self._version, RowReader(self._codes().translate(Maze._OPEN), \
+                                                             self._num_cols))
+            neighbors = self._row_reader[1].neighbors(i)
+        else:
+            neighbors = self.adjacency().neighbors(i)
+        cell_list = []
+        for i in neighbors:
+            cell = self._cellAt(*divmod(i, self._num_cols))
+            if cell != self._start:
                 cell_list.append(cell)
         return cell_list
 
 
+    def _cellHooks(self) -> tuple:
+        ''' method to wrap the on_push/on_expand hooks (if any) for the
+            Cell-based searches, which call them with Cells rather than ids
+        Returns:
+            a tuple (on_push, on_expand), each a function of a Cell or None
+        '''
+        hooks = self._hooks
+        if hooks is None:
+            return None, None
+        wrap = lambda hook: None if hook is None else \
+                            (lambda cell: hook(self._flatIndex(cell._position)))
+        return wrap(hooks.on_push), wrap(hooks.on_expand)
+
+    def _searchDone(self, goal: Union[Cell, None], pops: int, peak: int) -> Union[Cell, None]:
+        ''' method for the Cell-based searches to record their counts (every
+            cell popped but the goal is expanded) and report the goal
+        Parameters:
+            goal: the goal Cell if it was reached, None o/w
+            pops: the number of cells taken off the frontier
+            peak: the largest frontier size seen
+        Returns:
+            goal
+        '''
+        self._stats.count(self._num_pushes, pops, pops - (goal is not None), peak)
+        if goal is None:
+            self._exhausted()
+        hooks = self._hooks
+        if goal is not None and hooks is not None and hooks.on_goal is not None:
+            hooks.on_goal(self._flatIndex(goal._position))
+        return goal
+
+    def set_hooks(self, hooks: SearchHooks) -> None:
+        ''' method to register the callbacks every later search makes (see
+            SearchStats.SearchHooks), each called with a flat cell id
+        Parameters:
+            hooks: the SearchHooks to use, or None to remove them
+        '''
+        self._hooks = hooks
+
+    def last_stats(self) -> SearchStats:
+        ''' method to return the stats of the most recent search (None if
+            there hasn't been one)
+        '''
+        return self._stats
+
+    def search(self, method: str = "a_star", hooks: SearchHooks = None, \
+                     trace_memory: bool = False, **options) -> SearchStats:
+        ''' method to run one of the search methods and return its stats
+            (whether the goal was found, pushes, pops, expansions, peak
+            frontier size, path length and wall time); the goal Cell, if
+            found, is then linked to its parents as usual for showPath
+        Parameters:
+            method:       name of the search, one of Maze.SEARCHES
+            hooks:        SearchHooks to use for this search only (in place of
+                          any set with set_hooks)
+            trace_memory: whether to also record the peak memory allocated
+                          during the search, using tracemalloc (which slows
+                          the search down considerably)
+            options:      passed on to the search method, e.g., queue for
+                          dijkstra or cluster_size for hpa_star
+        Returns:
+            the SearchStats of the search
+        Raises:
+            ValueError if method is not one of Maze.SEARCHES
+        '''
+        if method not in Maze.SEARCHES:
+            raise ValueError(f"method must be one of {', '.join(Maze.SEARCHES)}")
+        saved_hooks = self._hooks
+        if hooks is not None:
+            self._hooks = hooks
+        started = trace_memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            getattr(self, method)(**options)
+            if trace_memory:
+                self._stats.memory_peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            self._hooks = saved_hooks
+            if started:
+                tracemalloc.stop()
+        return self._stats
+
+    @_recorded
     def dfs(self) -> Union[Cell, None]:
         ''' method to perform DFS (using a stack) to implement maze searching
         Returns:
             a Cell object corresponding to the Maze goal, or None if no goal
             can be found
         '''
+        if self._engine == "flat":
+            return self._flatSearch(self._flatKernel(flat_dfs))
+
+        if self._ruledOut():
+            return None
+
         #Use DFS + stack:
         #    stack: push new Cell objects to be explored
         #            (which will also keep track of the parent)
         #    list:  cells already explored
+        on_push, on_expand = self._cellHooks()
         mazeStack = Stack()
         current_cell = self.getStart()
         mazeStack.push(current_cell)
+        if on_push is not None: on_push(current_cell)
 
         visited_blocks = []
         visited_blocks.append(current_cell)
         self._num_pushes +=1
+        pops, peak = 0, 1
 
 
         while not mazeStack.is_empty():
             current_cell = mazeStack.pop()
+            pops += 1
             if current_cell.isGoal():
-                print(f"The number of pushes:{self._num_pushes}")
-                return current_cell
+                return self._searchDone(current_cell, pops, peak)
+            if on_expand is not None: on_expand(current_cell)
 
 
             valid_locals = self.getSearchLocations(current_cell)
 
 
-            for i in range (len(valid_locals)):
-                if valid_locals[i] not in visited_blocks:
-                    mazeStack.push(valid_locals[i])
-                    visited_blocks.append(valid_locals[i])
-                    valid_locals[i]._parent = current_cell
-                    self._num_pushes +=1
+            # push all of the unvisited neighbors in one call, keeping their
+            # N/S/W/E order
+            new_cells = [cell for cell in valid_locals if cell not in visited_blocks]
+            for cell in new_cells:
+                visited_blocks.append(cell)
+                cell._parent = current_cell
+            mazeStack.extend(new_cells)
+            self._num_pushes += len(new_cells)
+            if on_push is not None:
+                for cell in new_cells: on_push(cell)
+            peak = max(peak, len(mazeStack))
 
-        print(f"The number of pushes:{self._num_pushes}")
-        return None
+        return self._searchDone(None, pops, peak)
 
 
+    @_recorded
     def bfs(self) -> Union[Cell, None]:
         ''' method to perform BFS (using a queue) to implement maze searching
         Returns:
             a Cell object corresponding to the Maze goal, or None if no goal
             can be found
         '''
+        if self._engine == "flat":
+            return self._flatSearch(self._flatKernel(flat_bfs))
+
+        if self._ruledOut():
+            return None
+
         #Use BFS + queue:
         #    queue: push new Cell objects to be explored
         #            (which will also keep track of the parent)
         #    list:  cells already explored
+        on_push, on_expand = self._cellHooks()
         mazeQ = Queue()
         current_cell = self.getStart()
         mazeQ.push(current_cell)
+        if on_push is not None: on_push(current_cell)
 
         visited_blocks = []
         visited_blocks.append(current_cell)
         self._num_pushes +=1
+        pops, peak = 0, 1
 
 
         while not mazeQ.is_empty():
             current_cell = mazeQ.pop()
+            pops += 1
             if current_cell.isGoal():
-                print(f"The number of pushes:{self._num_pushes}")
-                return current_cell
+                return self._searchDone(current_cell, pops, peak)
+            if on_expand is not None: on_expand(current_cell)
 
             valid_locals = self.getSearchLocations(current_cell)
 
 
-            for i in range (len(valid_locals)):
-                if valid_locals[i] not in visited_blocks:
-                    mazeQ.push(valid_locals[i])
-                    visited_blocks.append(valid_locals[i])
-                    valid_locals[i]._parent = current_cell
-                    self._num_pushes += 1
+            # push all of the unvisited neighbors in one call, keeping their
+            # N/S/W/E order
+            new_cells = [cell for cell in valid_locals if cell not in visited_blocks]
+            for cell in new_cells:
+                visited_blocks.append(cell)
+                cell._parent = current_cell
+            mazeQ.extend(new_cells)
+            self._num_pushes += len(new_cells)
+            if on_push is not None:
+                for cell in new_cells: on_push(cell)
+            peak = max(peak, len(mazeQ))
 
-        print(f"The number of pushes:{self._num_pushes}")
-        return None
+        return self._searchDone(None, pops, peak)
 
 
 
@@ -340,31 +1308,54 @@ class Maze:
 
 
 
+    @_recorded
     def a_star(self) -> 'Cell | None':
-        to_explore = PriorityQueue()
+        ''' method to perform A* (using a PriorityQueue) to implement maze
+            searching, with the Manhattan distance as the heuristic
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        '''
+        if self._engine == "flat":
+            return self._flatSearch(self._flatKernel(flat_a_star))
+
+        if self._ruledOut():
+            return None
+
+        # the queue holds each cell at most once, keyed by its flat id, with
+        # priority (f, h); closed holds the ids of cells already expanded
+        to_explore = IndexedPriorityQueue()
         explored = dict()
+        closed = set()
         n = self.getStart()
-        get_neighbors = self.getSearchLocations
         g= 0
         n.setCost(g)
         h = self.manhattan(n)
         n.setHeuristic(h)    # also keep track inside n
         f = g+h
 
-        to_explore.insert(f, n)
+        on_push, on_expand = self._cellHooks()
+        to_explore.insert((f, h), self._flatIndex(n.getPosition()))
         explored[n.getPosition()] = g  # {(r,c) : g(n)}
         self._num_pushes +=1
+        if on_push is not None: on_push(n)
+        pops, peak = 0, 1
 
 
         while not to_explore.is_empty() :
             e = to_explore.remove_min()	# e is an Entry
-            n = e._value         # n is a Cell
+            closed.add(e._value)
+            n = self._cellAt(*divmod(e._value, self._num_cols))   # n is a Cell
+            pops += 1
             if n == self.getGoal():
-                print(f"The number of pushes:{self._num_pushes}")
-                return n
+                return self._searchDone(n, pops, peak)
+            if on_expand is not None: on_expand(n)
 
 
             for m in self.getSearchLocations(n):
+                m_id = self._flatIndex(m.getPosition())
+                if m_id in closed:
+                    continue
                 updated_m_cost = n.getCost() + 1   	# cost is one step away from n
                 if m.getPosition() not in explored or updated_m_cost < explored[m.getPosition()]:
                     m.setCost(updated_m_cost)
@@ -373,43 +1364,194 @@ class Maze:
                     m.setHeuristic(h)    # set heuristic
                     g= updated_m_cost
                     f = g+ h
-                    to_explore.insert(f, m)
+                    to_explore.update_or_insert((f, h), m_id)
                     m._parent = n
                     # remember to update m's g(m), h(m) and parent
                     self._num_pushes +=1
+                    if on_push is not None: on_push(m)
+            peak = max(peak, len(to_explore))
 
-        print(f"The number of pushes:{self._num_pushes}")
-        return None
+        return self._searchDone(None, pops, peak)
 
 
 
 
+    @_recorded
+    def bidirectional_bfs(self) -> Union[Cell, None]:
+        ''' method to perform BFS from the start and the goal at the same time,
+            stopping once the two searches meet (see flat_bidirectional_bfs);
+            it finds a path of the same (shortest) length as bfs while
+            usually pushing far fewer cells
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        '''
+        return self._flatSearch(functools.partial(flat_bidirectional_bfs, adjacency = self.adjacency()))
+
+    @_recorded
+    def bidirectional_a_star(self) -> Union[Cell, None]:
+        ''' method to perform A* from the start towards the goal and from the
+            goal towards the start at the same time, with the Manhattan
+            distance as the heuristic in both directions (see
+            flat_bidirectional_a_star); the path found is a shortest one
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        '''
+        return self._flatSearch(functools.partial(flat_bidirectional_a_star, adjacency = self.adjacency()))
+
+    @_recorded
+    def jump_point_search(self) -> Union[Cell, None]:
+        ''' method to perform Jump Point Search (A* over jump points only, with
+            the Manhattan distance as the heuristic; see JumpPoint); the path
+            found has the same length as the one from a_star, and every cell
+            along it is linked to its parent so showPath works as usual
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        '''
+        return self._flatSearch(flat_jump_point_search)
+
+    @_recorded
+    def dijkstra(self, queue: str = "bucket") -> Union[Cell, None]:
+        ''' method to find a least-cost path with Dijkstra's algorithm, where
+            moving into a cell costs its weight (see set_weight), using a
+            BucketQueue (Dial's algorithm) or a heap; runs on flat arrays
+            whatever the engine
+        Parameters:
+            queue: one of Maze.QUEUES
+        Returns:
+            a Cell object corresponding to the Maze goal, or None if no goal
+            can be found
+        Raises:
+            ValueError if queue is not one of Maze.QUEUES
+        '''
+        return self._leastCost(False, queue)
+
+    @_recorded
+    def terrain_a_star(self, queue: str = "bucket") -> Union[Cell, None]:
+        ''' method to find a least-cost path with A*, where moving into a cell
+            costs its weight (see set_weight), with the Manhattan distance
+            times the smallest weight as the heuristic; see dijkstra
+        '''
+        return self._leastCost(True, queue)
+
+    def _leastCost(self, heuristic: bool, queue: str) -> Union[Cell, None]:
+        ''' the body of dijkstra and terrain_a_star '''
+        if queue not in Maze.QUEUES:
+            raise ValueError(f"queue must be one of {', '.join(Maze.QUEUES)}")
+        weights = self._weights
+        if weights is None:
+            weights = b"\x01" * (self._num_rows * self._num_cols)
+        adjacency = self.adjacency()
+        return self._flatSearch(lambda passable, cols, start, goal, parents, stats, hooks: \
+                                flat_least_cost(passable, cols, start, goal, parents, weights, \
+                                                heuristic, queue, stats, hooks, adjacency))
+
+    @_recorded
+    def multi_search(self, starts: Iterable[Position], goals: Iterable[Position], \
+                           heuristic: bool = True) -> Union[Cell, None]:
+        ''' method to find, in one search, a shortest path between any of a
+            set of start cells and any of a set of goal cells (see MultiSearch):
+            every start is put on the frontier at once, the heuristic is the
+            Manhattan distance to the nearest goal, and the first goal reached
+            is the answer -- one call in place of a search for every pair; the
+            Maze's own start and goal play no part unless they are listed
+        Parameters:
+            starts:    Positions of the cells to search from
+            goals:     Positions of the cells to search for
+            heuristic: False to search without the heuristic (in BFS order)
+        Returns:
+            the goal Cell reached, linked by its parents back to the start
+            its path begins at (so showPath draws it), or None if no goal can
+            be reached from any start
+        Raises:
+            ValueError if starts or goals is empty, or holds a Position that
+            is outside the grid or blocked
+        '''
+        sources, targets = [], []
+        for ids, positions in ((sources, starts), (targets, goals)):
+            for position in positions:
+                if not (0 <= position.row < self._num_rows and 0 <= position.col < self._num_cols):
+                    raise ValueError(f"{position} is outside the grid")
+                if self._cellAt(position.row, position.col).isBlocked():
+                    raise ValueError(f"{position} is blocked")
+                ids.append(self._flatIndex(position))
+        if not sources or not targets:
+            raise ValueError("starts and goals must not be empty")
+
+        components = self._components       # only used if already built (see _ruledOut)
+        if components is not None and \
+           not {components.label(i) for i in sources} & {components.label(i) for i in targets}:
+            self._stats.count(0, 0, 0, 0)
+            return None
+        n = self._num_rows * self._num_cols
+        parents = self._parents if self._compact else array('i', [-1]) * n
+        found, num_pushes = flat_multi_search(self._codes().translate(Maze._OPEN), self._num_cols, \
+                                              sources, targets, parents, heuristic, \
+                                              self._stats, self._hooks, self.adjacency())
+        self._num_pushes += num_pushes
+        if found < 0:
+            self._exhausted()
+            return None
+        if not self._compact:
+            source = found
+            while parents[source] >= 0:
+                source = parents[source]
+            self._linkPath(found, source, parents)
+            self._cellAt(*divmod(source, self._num_cols))._parent = None
+        return self._cellAt(*divmod(found, self._num_cols))
+
+    def distance_field(self, source: Position = None) -> 'np.ndarray':
+        ''' method to compute the number of steps from a source cell to every
+            cell in the Maze, using the NumPy wavefront BFS in DistanceField
+            (one array operation per BFS layer rather than one Python loop
+            iteration per cell)
+        Parameters:
+            source: Position to measure from (defaults to the Maze start)
+        Returns:
+            a rows x cols int32 NumPy array of distances, with -1 for blocked
+            and unreachable cells; see field_path to recover a path from it
+        Raises:
+            ImportError if numpy is not installed
+        '''
+        if source is None:
+            source = self._start.getPosition()
+        mask = open_mask(bytes(self._codes()), self._num_rows, self._num_cols, BLOCKED_CODE)
+        return wavefront(mask, source)
+
+    def field_path(self, field: 'np.ndarray', target: Position = None) -> List[Position]:
+        ''' method to recover a shortest path from a distance_field result by
+            gradient descent from the target back to the field's source
+        Parameters:
+            field:  a distance grid as returned by distance_field
+            target: Position the path should end at (defaults to the Maze goal)
+        Returns:
+            a list of Positions from the source to the target, or an empty list
+            if the target can't be reached
+        '''
+        if target is None:
+            target = self._goal.getPosition()
+        return [Position(row, col) for row, col in descend(field, target)]
+
     def showPath(self, goal: Cell) -> None:
-        ''' method to update the path from start to goal, identifying the steps
-            along the way as belonging to the path (updating the cell via
-            .markOnPath, which will change that cell's ._contents to
-            Contents.PATH), printing the final resulting solutions
+        ''' method to print the Maze with the path from start to goal (found by
+            following the parents back from the goal) drawn as Contents.PATH;
+            the grid itself is not changed, so the Maze can be searched again
         Parameters:
             goal: a Cell object corresponding to the goal location
         Returns:
-            nothing -- just updates the cells in the grid to identify those on the path
+            nothing -- just prints the solved maze
         '''
 
         path = []
         cell = goal
         while cell._parent is not None:
-            path.append(cell)
+            path.append(cell.getPosition())
             cell = cell._parent
-        path.append(cell)  # should be the start
-
-        path.reverse()
-
-        for cell in path:
-            if cell != self._start and cell != self._goal:
-                cell.markOnPath()
+        path.append(cell.getPosition())  # should be the start
 
-        # print the maze, i.e., using __str__ which will show the solved maze
-        print(self)
+        self.render(path = path)
 
 def main():
     seed = 46545
@@ -419,6 +1561,7 @@ def main():
     goal = m.dfs()
     print("This is dfs path")
     print(goal)
+    print(m.last_stats())
     if goal is not None:
         m.showPath(goal)
 
@@ -427,6 +1570,7 @@ def main():
     goal = m.bfs()
     print("This is bfs path")
     print(goal)
+    print(m.last_stats())
     if goal is not None:
         m.showPath(goal)
 
@@ -435,6 +1579,7 @@ def main():
     goal = m.a_star()
     print("This is a star path")
     print(f"goal cell:{goal}")
+    print(m.last_stats())
     if goal is not None:
         m.showPath(goal)
 
@@ -0,0 +1,262 @@
+# a bit-packed file format for mazes: a fixed-size header giving the grid's
+# dimensions, start and goal, followed by one bit per cell (1 if blocked), row
+# by row, with each row padded to a whole number of bytes; files are opened
+# with mmap, so only the pages holding rows that are actually looked at are
+# ever read from disk
+import mmap
+import struct
+from typing import Iterable, NamedTuple, Tuple
+
+MAGIC   = b"MAZE"
+VERSION = 1
+# magic, format version, (unused), rows, cols, start row, start col, goal row, goal col
+HEADER  = struct.Struct("<4sHH6I")
+
+# maps each contents code to the ASCII digit "1" if it is blocked, "0" o/w;
+# filled in per blocked code by _digitTable
+_DIGITS = {}
+# maps the ASCII digits "0"/"1" back to bytes 0/1
+_BITS   = bytes(1 if byte == ord("1") else 0 for byte in range(256))
+
+class Header(NamedTuple):
+    ''' the dimensions, start and goal stored at the front of a maze file '''
+    rows:  int
+    cols:  int
+    start: Tuple[int, int]
+    goal:  Tuple[int, int]
+
+def _rowBytes(cols: int) -> int:
+    ''' returns the number of bytes used by one packed row of cols cells '''
+    return (cols + 7) // 8
+
+def _digitTable(blocked_code: int) -> bytes:
+    if blocked_code not in _DIGITS:
+        _DIGITS[blocked_code] = bytes(ord("1") if code == blocked_code else ord("0")
+                                      for code in range(256))
+    return _DIGITS[blocked_code]
+
+def pack_row(codes: bytes, blocked_code: int) -> bytes:
+    ''' function to pack one row of contents codes into bits, cell c of the
+        row going to bit c % 8 (least significant first) of byte c // 8
+    Parameters:
+        codes:        one contents code per cell of the row
+        blocked_code: the code used for blocked cells
+    Returns:
+        the packed row, (len(codes) + 7) // 8 bytes long
+    '''
+    # reading the row's digits backwards as a binary number puts cell 0 in
+    # the lowest bit, so the little-endian bytes of that number are the row
+    digits = bytes(codes).translate(_digitTable(blocked_code))[::-1]
+    return int(digits or b"0", 2).to_bytes(_rowBytes(len(codes)), "little")
+
+def unpack_row(packed: bytes, cols: int) -> bytes:
+    ''' function to unpack a row packed by pack_row
+    Parameters:
+        packed: the packed row
+        cols:   the number of cells in the row
+    Returns:
+        a bytes object with one entry per cell, 1 if it is blocked, 0 o/w
+    '''
+    digits = format(int.from_bytes(packed, "little"), f"0{len(packed) * 8}b")
+    return digits[::-1][:cols].encode("ascii").translate(_BITS)
+
+def write(path: str, header: Header, rows: Iterable[bytes], blocked_code: int) -> None:
+    ''' function to save a maze, one row at a time, so the whole grid is never
+        held in memory
+    Parameters:
+        path:         name of the file to create (or overwrite)
+        header:       the maze's dimensions, start and goal
+        rows:         an iterable yielding the contents codes of each row in
+                      turn (header.cols codes per row)
+        blocked_code: the code used for blocked cells; any other code is saved
+                      as an open cell
+    Raises:
+        ValueError if the rows don't match the header's dimensions
+    '''
+    count = 0
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, header.rows, header.cols, *header.start, *header.goal))
+        for codes in rows:
+            if len(codes) != header.cols:
+                raise ValueError(f"row {count} has {len(codes)} cells, expected {header.cols}")
+            file.write(pack_row(codes, blocked_code))
+            count += 1
+    if count != header.rows:
+        raise ValueError(f"got {count} rows, expected {header.rows}")
+
+def read_header(buffer: bytes) -> Header:
+    ''' function to parse and check the header at the front of a maze file
+    Parameters:
+        buffer: the file's contents (e.g., an mmap of the file)
+    Returns:
+        the Header
+    Raises:
+        ValueError if the buffer is not a maze file of this version, or its
+        size doesn't match the header
+    '''
+    if len(buffer) < HEADER.size:
+        raise ValueError("not a maze file (too short)")
+    magic, version, _, rows, cols, start_row, start_col, goal_row, goal_col = \
+        HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("not a maze file (bad magic number)")
+    if version != VERSION:
+        raise ValueError(f"unsupported maze file version {version}")
+    if len(buffer) != HEADER.size + rows * _rowBytes(cols):
+        raise ValueError("maze file size doesn't match its header")
+    for row, col in ((start_row, start_col), (goal_row, goal_col)):
+        if not (row < rows and col < cols):
+            raise ValueError(f"({row}, {col}) is outside the {rows} x {cols} grid")
+    return Header(rows, cols, (start_row, start_col), (goal_row, goal_col))
+
+################################################################################
+class PackedGrid:
+    ''' class presenting a memory-mapped maze file as a flat, writable
+        sequence of contents codes (indexed by row * cols + col), so it can
+        stand in for the bytearray a compact Maze keeps its cells in;
+        blocked/empty cells come from the file's bits, while cells holding any
+        other code (start, goal, path marks) are kept in a small dict on top;
+        the file is mapped copy-on-write, so edits are never written back
+    '''
+    def __init__(self, path: str, blocked_code: int, empty_code: int = 0):
+        ''' initializer method for a PackedGrid; only the header is read
+        Parameters:
+            path:         name of the maze file
+            blocked_code: code to report for cells whose bit is set
+            empty_code:   code to report for cells whose bit is clear
+        Raises:
+            ValueError as for read_header
+        '''
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_COPY)
+        self._header:  Header = read_header(self._map)
+        self._cols:    int    = self._header.cols
+        self._stride:  int    = _rowBytes(self._cols)
+        self._len:     int    = self._header.rows * self._cols
+        self._blocked: int    = blocked_code
+        self._empty:   int    = empty_code
+        self._overlay: dict   = dict()      # index -> code, for other codes
+        # maps the unpacked bits 0/1 to the empty/blocked codes
+        self._decode:  bytes  = bytes([empty_code, blocked_code]) + bytes(254)
+
+    def header(self) -> Header:
+        ''' returns the Header read from the file '''
+        return self._header
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _bit(self, index: int) -> int:
+        row, col = divmod(index, self._cols)
+        return self._map[HEADER.size + row * self._stride + (col >> 3)] >> (col & 7) & 1
+
+    def _row(self, row: int) -> bytes:
+        ''' returns the contents codes of one row, overlay included '''
+        start = HEADER.size + row * self._stride
+        codes = unpack_row(self._map[start:start + self._stride], self._cols).translate(self._decode)
+        if self._overlay:
+            first = row * self._cols
+            marks = [(i - first, code) for i, code in self._overlay.items()
+                     if first <= i < first + self._cols]
+            if marks:
+                codes = bytearray(codes)
+                for col, code in marks:
+                    codes[col] = code
+                codes = bytes(codes)
+        return codes
+
+    def __getitem__(self, index: 'int | slice') -> 'int | bytes':
+        ''' returns the contents code of one cell, or a bytes object of codes
+            for a slice (decoding only the rows the slice covers)
+        '''
+        if isinstance(index, slice):
+            first, stop, step = index.indices(self._len)
+            if stop <= first:
+                return b""
+            rows = range(first // self._cols, (stop - 1) // self._cols + 1)
+            codes = b"".join(self._row(row) for row in rows)
+            offset = rows[0] * self._cols
+            return codes[first - offset:stop - offset:step]
+        code = self._overlay.get(index)
+        if code is not None:
+            return code
+        if not 0 <= index < self._len:
+            if -self._len <= index < 0:
+                return self[index + self._len]
+            raise IndexError("PackedGrid index out of range")
+        return self._blocked if self._bit(index) else self._empty
+
+    def __setitem__(self, index: int, code: int) -> None:
+        ''' sets the contents code of one cell (in memory only) '''
+        if not 0 <= index < self._len:
+            raise IndexError("PackedGrid index out of range")
+        row, col = divmod(index, self._cols)
+        byte = HEADER.size + row * self._stride + (col >> 3)
+        if code == self._blocked:
+            self._map[byte] |= 1 << (col & 7)
+        else:
+            self._map[byte] &= ~(1 << (col & 7)) & 0xFF
+        if code in (self._blocked, self._empty):
+            self._overlay.pop(index, None)
+        else:
+            self._overlay[index] = code
+
+    def __iter__(self):
+        for row in range(self._header.rows):
+            yield from self._row(row)
+
+    def __bytes__(self) -> bytes:
+        return self[:]
+
+    def translate(self, table: bytes) -> 'GridView':
+        ''' returns a lazy view mapping every code through table, like
+            bytes.translate but without decoding the whole grid
+        '''
+        return GridView(self, table)
+
+    def close(self) -> None:
+        ''' releases the memory map; the grid can't be used afterwards '''
+        self._map.close()
+
+################################################################################
+class GridView:
+    ''' read-only view of a PackedGrid with every code mapped through a
+        translation table (see PackedGrid.translate)
+    '''
+    __slots__ = ("_grid", "_table")
+
+    def __init__(self, grid: PackedGrid, table: bytes):
+        self._grid  = grid
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._grid)
+
+    def __getitem__(self, index: 'int | slice') -> 'int | bytes':
+        if isinstance(index, slice):
+            return self._grid[index].translate(self._table)
+        return self._table[self._grid[index]]
+
+    def __iter__(self):
+        for row in range(self._grid._header.rows):
+            yield from self._grid._row(row).translate(self._table)
+
+    def __bytes__(self) -> bytes:
+        return self[:]
+
+def main():
+    import os, tempfile
+    # a 3x10 grid with a wall across the middle row except at the far end
+    codes = [bytes(10), bytes([1] * 9 + [0]), bytes(10)]
+    path = os.path.join(tempfile.gettempdir(), "example.maze")
+    write(path, Header(3, 10, (0, 0), (2, 0)), codes, blocked_code = 1)
+    print(f"file size: {os.path.getsize(path)} bytes")
+    grid = PackedGrid(path, blocked_code = 1)
+    print(grid.header())
+    for row in range(3):
+        print("".join("X" if code else "." for code in grid[row * 10:(row + 1) * 10]))
+    grid.close()
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
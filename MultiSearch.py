@@ -0,0 +1,180 @@
+# one search from many sources to many goals: every source is put on the
+# frontier at the start (all at cost 0) and the search stops at the first goal
+# taken off it, which gives the closest source-goal pair in one pass -- e.g.,
+# the nearest exit from here, or which of several agents reaches a cell first
+from PriorityQueue import *
+from SearchStats import *
+from Adjacency import *
+from array import array
+from typing import Callable, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:     # numpy is optional; manhattan_transform falls back to loops
+    np = None
+
+# with more goals than this, the heuristic is read from a distance transform
+# of the whole grid rather than worked out goal by goal for each cell
+_FEW_GOALS = 8
+
+def manhattan_transform(rows: int, cols: int, targets: Iterable[int]) -> array:
+    ''' function to compute, for every cell of a grid, the Manhattan distance
+        to the nearest of a set of target cells (ignoring blocked cells), in
+        time linear in the size of the grid: the distance is separable, so a
+        forward and a backward sweep down each column and then along each
+        row, each taking d[k] = min(d[k], d[k - 1] + 1), give it exactly
+    Parameters:
+        rows:    number of rows in the grid
+        cols:    number of columns in the grid
+        targets: flat ids (row * cols + col) of the target cells, at least one
+    Returns:
+        an int array with one distance per cell, indexed by row * cols + col
+    '''
+    n, far = rows * cols, rows + cols
+    targets = list(targets)
+    if np is not None:
+        d = np.full(n, far, dtype = np.int32)
+        d[targets] = 0
+        d = d.reshape(rows, cols)
+        for axis, shape in ((0, (rows, 1)), (1, (1, cols))):
+            # with e[k] = d[k] - k the forward sweep is a running minimum of e,
+            # and with e[k] = d[k] + k the backward one is a running minimum
+            # from the other end
+            k = np.arange(shape[axis], dtype = np.int32).reshape(shape)
+            d = np.minimum.accumulate(d - k, axis = axis) + k
+            d = np.flip(np.minimum.accumulate(np.flip(d + k, axis), axis = axis), axis) - k
+        return array('i', d.astype(np.int32).tobytes())
+
+    d = array('i', [far]) * n
+    for t in targets:
+        d[t] = 0
+    # one raster pass looking N and W, then one in reverse looking S and E
+    for i in range(n):
+        if i >= cols and d[i - cols] + 1 < d[i]:
+            d[i] = d[i - cols] + 1
+        if i % cols and d[i - 1] + 1 < d[i]:
+            d[i] = d[i - 1] + 1
+    for i in range(n - 1, -1, -1):
+        if i + cols < n and d[i + cols] + 1 < d[i]:
+            d[i] = d[i + cols] + 1
+        if (i + 1) % cols and d[i + 1] + 1 < d[i]:
+            d[i] = d[i + 1] + 1
+    return d
+
+def nearest_goal_heuristic(rows: int, cols: int, goals: List[int]) -> Callable[[int], int]:
+    ''' function to build the multi-goal heuristic: the smallest Manhattan
+        distance from a cell to any goal (admissible and consistent, as the
+        minimum of consistent heuristics); with a few goals it is worked out
+        on demand, with many it is looked up in a manhattan_transform table
+    Parameters:
+        rows:  number of rows in the grid
+        cols:  number of columns in the grid
+        goals: flat ids of the goal cells
+    Returns:
+        a function from a flat cell id to its estimate
+    '''
+    if len(goals) > _FEW_GOALS:
+        return manhattan_transform(rows, cols, goals).__getitem__
+    places = [divmod(goal, cols) for goal in goals]
+    def heuristic(i: int) -> int:
+        row, col = divmod(i, cols)
+        return min(abs(goal_row - row) + abs(goal_col - col) for goal_row, goal_col in places)
+    return heuristic
+
+def flat_multi_search(open_cells: bytes, cols: int, sources: List[int], goals: List[int], \
+                      parents: array, heuristic: bool = True, stats: SearchStats = None, \
+                      hooks: SearchHooks = None, adjacency: Adjacency = None) -> Tuple[int, int]:
+    ''' function to perform A* (or, without the heuristic, uniform-cost
+        search, which with unit steps expands cells in BFS order) from a set of
+        sources to a set of goals over flat cell ids, stopping at the first
+        goal removed from the queue; its path is a shortest one between any
+        source and any goal
+    Parameters:
+        open_cells: one byte per cell, 1 if the cell is not blocked, 0 o/w
+        cols:       number of columns in the grid
+        sources:    flat ids of the cells to search from
+        goals:      flat ids of the cells to search for
+        parents:    int array (one entry per cell) that receives the id of
+                    the cell each reached cell was reached from; each source
+                    is given -1, so following parents from the goal found
+                    ends at the source its path starts from
+        heuristic:  whether to guide the search with nearest_goal_heuristic
+        stats:      SearchStats to add the counts to (if any)
+        hooks:      SearchHooks to call as cells are pushed/expanded (if any)
+        adjacency:  Adjacency of the grid to take neighbors from (one is
+                    built for the search if None)
+    Returns:
+        a tuple (id of the goal reached or -1 if none can be, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    n = len(open_cells)
+    if adjacency is None:
+        adjacency = Adjacency(open_cells, cols)
+    offsets, targets = adjacency.offsets, adjacency.targets
+    estimate = nearest_goal_heuristic(n // cols, cols, goals) if heuristic else (lambda i: 0)
+    is_goal = bytearray(n)
+    for goal in goals:
+        is_goal[goal] = 1
+    cost = array('i', [-1]) * n     # g(n) for each cell, -1 if not yet seen
+    closed = bytearray(n)           # cells already expanded
+    to_explore = IndexedPriorityQueue()
+
+    for source in sources:
+        if cost[source] == 0:
+            continue                # listed twice
+        cost[source] = 0
+        parents[source] = -1
+        h = estimate(source)
+        to_explore.insert((h, h), source)
+        if on_push is not None: on_push(source)
+    num_pushes, pops, peak, found = len(to_explore), 0, len(to_explore), -1
+
+    while not to_explore.is_empty():
+        i = to_explore.remove_min()._value
+        pops += 1
+        closed[i] = 1
+        if is_goal[i]:
+            found = i
+            break
+        if on_expand is not None: on_expand(i)
+
+        updated_cost = cost[i] + 1      # cost is one step away from i
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if not closed[j] and (cost[j] < 0 or updated_cost < cost[j]):
+                cost[j] = updated_cost
+                h = estimate(j)
+                to_explore.update_or_insert((updated_cost + h, h), j)
+                parents[j] = i
+                num_pushes += 1
+                if on_push is not None: on_push(j)
+        if len(to_explore) > peak:
+            peak = len(to_explore)
+
+    if stats is not None:
+        stats.count(num_pushes, pops, pops - (found >= 0), peak)
+    if found >= 0 and hooks is not None and hooks.on_goal is not None:
+        hooks.on_goal(found)
+    return found, num_pushes
+
+def main():
+    # a 4x6 grid with two agents on the left and three exits on the right
+    #   A . X . . E
+    #   . . X . . .
+    #   . . . . X E
+    #   A X . . . E
+    open_cells = bytes([1, 1, 0, 1, 1, 1,
+                        1, 1, 0, 1, 1, 1,
+                        1, 1, 1, 1, 0, 1,
+                        1, 0, 1, 1, 1, 1])
+    print(manhattan_transform(4, 6, [5, 17, 23]))
+    for heuristic in (True, False):
+        parents = array('i', [-1]) * len(open_cells)
+        stats = SearchStats("flat_multi_search")
+        goal, _ = flat_multi_search(open_cells, 6, [0, 18], [5, 17, 23], parents, heuristic, stats)
+        path = [goal]
+        while parents[path[-1]] >= 0:
+            path.append(parents[path[-1]])
+        print(f"heuristic {heuristic}: path {path[::-1]}, expansions {stats.expansions}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# a shortest-path tree rooted at the goal: one reverse BFS records, for every
+# cell that can reach the goal, the next cell to step to, so the path from any
+# start is read off by following those pointers
+from Queue import *
+from array import array
+from typing import List
+import sys
+
+class GoalTree:
+    ''' class holding a BFS tree rooted at a goal cell over the open cells of
+        a grid (cells addressed by their flat id, row * cols + col)
+    '''
+    __slots__ = ("_goal", "_successors", "_version")
+
+    def __init__(self, open_cells: bytes, cols: int, goal: int, version: int = 0):
+        ''' initializer method for a GoalTree, running the reverse BFS
+        Parameters:
+            open_cells: one byte per cell, 1 if the cell is not blocked, 0 o/w
+            cols:       number of columns in the grid
+            goal:       id of the goal cell (the root of the tree)
+            version:    the grid version the tree was built from, so the owner
+                        can tell when it has gone stale
+        '''
+        n = len(open_cells)
+        successors = array('i', [-1]) * n       # next cell towards the goal
+        successors[goal] = goal
+        queue = Queue()
+        queue.push(goal)
+        while not queue.is_empty():
+            i = queue.pop()
+            col = i % cols
+            fresh = [j for j in (i - cols if i >= cols else -1,
+                                 i + cols if i + cols < n else -1,
+                                 i - 1 if col > 0 else -1,
+                                 i + 1 if col + 1 < cols else -1)
+                     if j >= 0 and open_cells[j] and successors[j] < 0]
+            for j in fresh:
+                successors[j] = i
+            queue.extend(fresh)
+
+        self._goal:       int   = goal
+        self._successors: array = successors
+        self._version:    int   = version
+
+    def version(self) -> int:
+        ''' returns the grid version the tree was built from '''
+        return self._version
+
+    def path_from(self, start: int) -> 'List[int] | None':
+        ''' returns a shortest path to the goal in O(path length)
+        Parameters:
+            start: id of the cell to start from
+        Returns:
+            the list of cell ids from start to the goal (inclusive), or None
+            if the goal can't be reached from start
+        '''
+        successors = self._successors
+        if successors[start] < 0:
+            return None
+        path = [start]
+        while path[-1] != self._goal:
+            path.append(successors[path[-1]])
+        return path
+
+    def nbytes(self) -> int:
+        ''' returns the memory used by the tree, in bytes '''
+        return sys.getsizeof(self._successors)
+
+def main():
+    # a 3x4 grid with a wall down the middle column except at the bottom
+    #   . . X .
+    #   . . X .
+    #   . . . G
+    open_cells = bytes([1, 1, 0, 1,
+                        1, 1, 0, 1,
+                        1, 1, 1, 1])
+    tree = GoalTree(open_cells, 4, 11)
+    for start in (0, 3, 2):
+        print(f"path from {start}: {tree.path_from(start)}")
+    print(f"tree size: {tree.nbytes()} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -61,6 +61,157 @@ class PriorityQueue(Generic[E]):
         else:
             return self._container[0]
 
+class IndexedPriorityQueue(Generic[E]):
+    ''' class to implement a binary min-heap of unique items (e.g., integer
+        cell ids) that also tracks where each item sits in the heap, so an
+        item's priority can be lowered in place (decrease-key) rather than
+        pushing a duplicate entry; ties between equal priorities are broken
+        by the order in which items were first inserted, so the order of
+        removal is deterministic
+    '''
+    __slots__ = ('_heap', '_index', '_count')
+
+    def __init__(self):
+        self._heap:  list[list]  = list()   # [(priority, insertion order), item]
+        self._index: dict        = dict()   # item -> position in _heap
+        self._count: int         = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def is_empty(self) -> bool:
+        return len(self._heap) == 0
+
+    def contains(self, item: V) -> bool:
+        ''' indicates whether the given item is currently in the queue '''
+        return item in self._index
+
+    def priority(self, item: V) -> K:
+        ''' returns the current priority of an item in the queue
+        Raises:
+            KeyError if the item is not in the queue
+        '''
+        return self._heap[self._index[item]][0][0]
+
+    def insert(self, key: K, item: V) -> None:
+        ''' inserts an item that is not already in the queue
+        Parameters:
+            key:  the priority of the item (e.g., a tuple (f, h))
+            item: the (hashable) item to insert
+        Raises:
+            ValueError if the item is already in the queue
+        '''
+        if item in self._index:
+            raise ValueError(f"{item} is already in the queue")
+        self._heap.append([(key, self._count), item])
+        self._count += 1
+        self._index[item] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def decrease_key(self, key: K, item: V) -> None:
+        ''' lowers the priority of an item already in the queue
+        Parameters:
+            key:  the new priority, which must not be larger than the current one
+            item: the item to update
+        Raises:
+            KeyError if the item is not in the queue
+            ValueError if the new priority is larger than the current one
+        '''
+        position = self._index[item]
+        current, order = self._heap[position][0]
+        if current < key:
+            raise ValueError(f"new priority {key} is larger than {current}")
+        self._heap[position][0] = (key, order)
+        self._sift_up(position)
+
+    def update_or_insert(self, key: K, item: V) -> bool:
+        ''' inserts the item if it is not in the queue, or lowers its priority
+            if the given key is smaller than its current one
+        Returns:
+            True if the queue changed, False o/w
+        '''
+        position = self._index.get(item)
+        if position is None:
+            self.insert(key, item)
+            return True
+        current, order = self._heap[position][0]
+        if key < current:
+            self._heap[position][0] = (key, order)
+            self._sift_up(position)
+            return True
+        return False
+
+    def remove(self, item: V) -> Entry:
+        ''' removes an item from anywhere in the queue
+        Returns:
+            the removed Entry
+        Raises:
+            KeyError if the item is not in the queue
+        '''
+        position = self._index.pop(item)
+        removed = self._heap[position]
+        last = self._heap.pop()
+        if position < len(self._heap):
+            self._heap[position] = last
+            self._index[last[1]] = position
+            self._sift_up(position)
+            self._sift_down(self._index[last[1]])
+        return Entry(removed[0][0], removed[1])
+
+    def remove_min(self) -> Entry:
+        if len(self._heap) == 0:
+            raise EmptyError("can't remove from empty heap")
+        last = self._heap.pop()
+        if len(self._heap) == 0:
+            smallest = last
+        else:
+            smallest = self._heap[0]
+            self._heap[0] = last
+            self._index[last[1]] = 0
+            self._sift_down(0)
+        del self._index[smallest[1]]
+        return Entry(smallest[0][0], smallest[1])
+
+    def min(self) -> Entry:
+        if len(self._heap) == 0:
+            raise EmptyError("can't remove from empty heap")
+        return Entry(self._heap[0][0][0], self._heap[0][1])
+
+    def _sift_up(self, position: int) -> None:
+        heap, index = self._heap, self._index
+        entry = heap[position]
+        order = entry[0]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if order < heap[parent][0]:
+                heap[position] = heap[parent]
+                index[heap[position][1]] = position
+                position = parent
+            else:
+                break
+        heap[position] = entry
+        index[entry[1]] = position
+
+    def _sift_down(self, position: int) -> None:
+        heap, index = self._heap, self._index
+        size = len(heap)
+        entry = heap[position]
+        order = entry[0]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if heap[child][0] < order:
+                heap[position] = heap[child]
+                index[heap[position][1]] = position
+                position = child
+            else:
+                break
+        heap[position] = entry
+        index[entry[1]] = position
+
 def main():
     heap = [1,2,3,4,5,6,7,8,9]
     #hq.heapify(heap)
@@ -80,5 +231,16 @@ def main():
     while not pq.is_empty():
         print(pq.remove_min())
 
+    ipq = IndexedPriorityQueue()
+    ipq.insert((5, 1), 'task1')
+    ipq.insert((3, 2), 'task2')
+    ipq.insert((3, 2), 'task3')
+    ipq.update_or_insert((2, 0), 'task1')   # decreases task1's priority
+    print(f"Contains task2: {ipq.contains('task2')}")
+
+    print("Removing indexed elements:")
+    while not ipq.is_empty():
+        print(ipq.remove_min())
+
 if __name__ == "__main__":
     main()
@@ -1,6 +1,6 @@
 # see https://medium.com/@steveYeah/using-generics-in-python-99010e5056eb
-from typing import Generic, TypeVar
-from LinkedList import *
+from typing import Generic, Iterable, List, TypeVar
+from array import array
 
 T = TypeVar("T")  # allows variable T to be used to represent a generic type
 
@@ -10,12 +10,40 @@ class EmptyError(Exception):
         self.message = message
 
 class Queue(Generic[T]):
-    ''' class to implement a queue ADT using a Python list'''
+    ''' class to implement a queue ADT using a growable ring buffer, either a
+        Python list or (for integer items such as cell ids) a typed array
+    '''
 
-    __slots__ = ("_data")           # will be a Python list
+    __slots__ = ("_data", "_front", "_size", "_typecode")
 
-    def __init__(self):
-        self._data: list[T] = LinkedList()    # typing _data to be a list of type T
+    def __init__(self, typecode: str = None, capacity: int = 16):
+        ''' initializer method for a Queue object
+        Parameters:
+            typecode: optional array typecode (e.g., 'l') to store items in a
+                      typed array.array instead of a Python list
+            capacity: number of slots to allocate up front (doubled when full)
+        '''
+        self._typecode = typecode
+        self._data     = self._allocate(max(capacity, 1))
+        self._front    = 0          # slot holding the leftmost element
+        self._size     = 0
+
+    def _allocate(self, capacity: int) -> 'list[T] | array':
+        ''' returns an empty buffer of the given number of slots '''
+        if self._typecode is None:
+            return [None] * capacity
+        return array(self._typecode, [0]) * capacity
+
+    def _grow(self, needed: int) -> None:
+        ''' enlarges the buffer (at least doubling it) so it can hold the given
+            number of elements, unwrapping the contents to start at slot 0
+        '''
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+        ordered = self._data[self._front:] + self._data[:self._front]
+        self._data  = ordered[:self._size] + self._allocate(capacity - self._size)
+        self._front = 0
 
     def __len__(self) -> int:
         ''' allows the len function to be called using an Queue object, e.g.,
@@ -24,7 +52,7 @@ class Queue(Generic[T]):
         Returns:
             number of elements in the queue, as an integer
         '''
-        return len(self._data)
+        return self._size
 
     def push(self, item: T) -> None:
         ''' pushes a given item of arbitrary type onto the queue
@@ -33,8 +61,42 @@ class Queue(Generic[T]):
         Returns:
             None
         '''
-        self._data.add_right(item)
-        #self._data.append(item)
+        data = self._data
+        if self._size == len(data):
+            self._grow(self._size + 1)
+            data = self._data
+        end = self._front + self._size
+        if end >= len(data):
+            end -= len(data)
+        data[end] = item
+        self._size += 1
+
+    def extend(self, items: 'list[T]') -> None:
+        ''' pushes every item of a list (or tuple) onto the queue, in order,
+            copying them into the buffer with at most two slice assignments
+        Parameters:
+            items: a list or tuple of items
+        Returns:
+            None
+        '''
+        count = len(items)
+        size  = self._size + count
+        if size > len(self._data):
+            self._grow(size)
+        data = self._data
+        capacity = len(data)
+        end = self._front + self._size
+        if end >= capacity:
+            end -= capacity
+        if self._typecode is not None:
+            items = array(self._typecode, items)
+        if end + count <= capacity:
+            data[end:end + count] = items
+        else:
+            first = capacity - end      # slots before wrapping around
+            data[end:] = items[:first]
+            data[:count - first] = items[first:]
+        self._size = size
 
     def pop(self) -> T:
         ''' removes the leftmost element from the queue and returns that element
@@ -43,41 +105,52 @@ class Queue(Generic[T]):
         Raises:
             EmptyError exception if the queue is empty
         '''
-        if len(self._data) == 0:
+        if self._size == 0:
             raise EmptyError('Error in Queue.pop(): stack is empty')
-        return self._data.remove_left() # calling Python list pop()
+        front = self._front
+        item = self._data[front]
+        if self._typecode is None:
+            self._data[front] = None    # don't keep a reference to the item
+        front += 1
+        self._front = 0 if front == len(self._data) else front
+        self._size -= 1
+        return item
+
+    def drain(self) -> List[T]:
+        ''' removes every element from the queue
+        Returns:
+            a list of the removed items, leftmost first
+        '''
+        items = list(self._data[self._front:self._front + self._size])
+        items.extend(self._data[:self._size - len(items)])
+        self._data  = self._allocate(len(self._data))
+        self._front = 0
+        self._size  = 0
+        return items
 
     def top(self) -> T:
-        ''' returns the topmost element from the stack without modifying the stack
+        ''' returns the most recently pushed element without modifying the queue
         Returns:
-            the topmost item, of arbitrary type
+            the rightmost item, of arbitrary type
         Raises:
-            EmptyError exception if the stack is empty
+            EmptyError exception if the queue is empty
         '''
-        if len(self._data) == 0:
+        if self._size == 0:
             raise EmptyError('Error in Queue.top(): stack is empty')
-        #return self._data[-1]
-        return self._data._tail.data
+        return self._data[(self._front + self._size - 1) % len(self._data)]
 
     def is_empty(self) -> bool:
-        ''' indicates whether the stack is empty
+        ''' indicates whether the queue is empty
         Returns:
-            True if the stack is empty, False otherwise
+            True if the queue is empty, False otherwise
         '''
-        return len(self._data) == 0
+        return self._size == 0
 
     def __str__(self) -> str:
         ''' returns an str implementation of the Queue '''
         string = " <- "
-        #string = "---top---\n"
-        a = self._data._head
-        while a != None:
-            string += f"{a.data} "
-            a = a.next
-
-            #for i in range(len(self._data) - 1, -1, -1):
-            #string += str(self._data[i]) + "\n"
-        #string += "---bot---"
+        for i in range(self._size):
+            string += f"{self._data[(self._front + i) % len(self._data)]} "
         string += "<-"
         return string
 
@@ -94,6 +167,14 @@ def main():
     print(MyQueue.top())
     #print(MyQueue)
 
+    IdQueue = Queue('l', capacity = 4)
+    IdQueue.extend([1, 2, 3])
+    IdQueue.pop()
+    IdQueue.extend([4, 5, 6, 7])   # wraps around, then grows
+    print(IdQueue)
+    print("Draining the queue:")
+    print(IdQueue.drain())
+    print(IdQueue.is_empty())
 
 
 if __name__ == "__main__":
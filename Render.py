@@ -0,0 +1,113 @@
+# text rendering of a grid of contents codes, written to a stream one row (or
+# one band of rows, when downsampling) at a time, so the picture is never built
+# in memory and a path can be drawn over the grid without changing it
+from typing import Callable, Iterable, TextIO, Tuple
+
+def _pathMarks(path: Iterable[Tuple[int, int]]) -> dict:
+    ''' groups the (row, col) cells of a path by row '''
+    marks = dict()
+    for row, col in path:
+        marks.setdefault(row, set()).add(col)
+    return marks
+
+def render(stream: TextIO, row_codes: Callable[[int, int, int], bytes], \
+           rows: int, cols: int, symbols: dict, \
+           path: Iterable[Tuple[int, int]] = (), path_code: int = None, \
+           keep: Iterable[int] = (), window: Tuple[int, int, int, int] = None, \
+           step: int = 1) -> None:
+    ''' function to write a grid as text, one line per row, with every cell
+        shown by its symbol and delimited by vertical pipes
+    Parameters:
+        stream:    the text stream to write to
+        row_codes: function (row, first col, last col + 1) returning the
+                   contents codes of that part of a row
+        rows:      number of rows in the grid
+        cols:      number of columns in the grid
+        symbols:   maps each contents code to the character shown for it
+        path:      (row, col) cells to draw with the symbol of path_code,
+                   e.g., a path found by a search; the grid is not changed
+        path_code: the code whose symbol the path is drawn with
+        keep:      codes the path is not drawn over (e.g., start and goal)
+        window:    (first row, first col, number of rows, number of cols) of
+                   the part of the grid to show, or None for all of it
+        step:      downsampling factor -- each character stands for a
+                   step x step block of cells (see _renderBlocks), so a huge
+                   grid can be previewed; 1 shows every cell
+    Raises:
+        ValueError if step is less than 1 or the window is empty
+    '''
+    top, left, height, width = (0, 0, rows, cols) if window is None else window
+    height = min(height, rows - top)
+    width  = min(width, cols - left)
+    if top < 0 or left < 0 or height <= 0 or width <= 0:
+        raise ValueError("the window must overlap the grid")
+    if step < 1:
+        raise ValueError("step must be at least 1")
+
+    marks = _pathMarks(path)
+    keep  = set(keep)
+    if step > 1:
+        _renderBlocks(stream, row_codes, top, left, height, width, symbols, marks, path_code, keep, step)
+        return
+
+    for row in range(top, top + height):
+        codes = row_codes(row, left, left + width)
+        if row in marks:
+            codes = bytearray(codes)
+            for col in marks[row]:
+                if left <= col < left + width and codes[col - left] not in keep:
+                    codes[col - left] = path_code
+        # decoding as latin-1 turns each code into the character whose
+        # ordinal is the code, which str.translate then maps to its symbol
+        text = bytes(codes).decode("latin-1").translate(symbols)
+        stream.write("|" + "|".join(text) + "|\n")
+
+def _renderBlocks(stream: TextIO, row_codes: Callable[[int, int, int], bytes], \
+                  top: int, left: int, height: int, width: int, symbols: dict, \
+                  marks: dict, path_code: int, keep: set, step: int) -> None:
+    ''' helper for render that shows each step x step block of cells as one
+        character: a code in keep if the block holds one, else the path if it
+        passes through the block, else the code held by most of its cells;
+        only one row of cells and one band of counts are held at a time
+    '''
+    num_blocks = (width + step - 1) // step
+    for band in range(top, top + height, step):
+        counts = [dict() for _ in range(num_blocks)]
+        for row in range(band, min(band + step, top + height)):
+            codes = row_codes(row, left, left + width)
+            for block in range(num_blocks):
+                count = counts[block]
+                chunk = codes[block * step:(block + 1) * step]
+                for code in set(chunk):
+                    count[code] = count.get(code, 0) + chunk.count(code)
+            for col in marks.get(row, ()):
+                if left <= col < left + width:
+                    counts[(col - left) // step][None] = 1
+        shown = []
+        for count in counts:
+            kept = [code for code in count if code in keep]
+            if kept:
+                shown.append(kept[0])
+            elif None in count:
+                shown.append(path_code)
+            else:
+                shown.append(max(count, key = count.get))
+        text = bytes(shown).decode("latin-1").translate(symbols)
+        stream.write("|" + "|".join(text) + "|\n")
+
+def main():
+    import sys
+    # a 6x12 grid of codes: 0 empty, 1 blocked, with a path along the top row
+    grid = [bytes([0] * 12), bytes([1] * 10 + [0, 0]), bytes(12),
+            bytes([0, 0] + [1] * 10), bytes(12), bytes([1] * 6 + [0] * 6)]
+    symbols = {0: " ", 1: "░", 2: "*"}
+    row_codes = lambda row, first, last: grid[row][first:last]
+    path = [(0, col) for col in range(12)]
+    render(sys.stdout, row_codes, 6, 12, symbols, path, path_code = 2)
+    print()
+    render(sys.stdout, row_codes, 6, 12, symbols, window = (1, 4, 3, 6))
+    print()
+    render(sys.stdout, row_codes, 6, 12, symbols, path, path_code = 2, step = 2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# incremental replanning with Lifelong Planning A* (LPA*): the g values of an
+# A* search are kept between queries, and after cells are blocked or unblocked
+# only the cells whose shortest distance actually changed are re-expanded
+from PriorityQueue import *
+from array import array
+from typing import List, Tuple
+
+INF = 2 ** 31 - 1   # "no path" marker that still fits in an array('i')
+
+class Replanner:
+    ''' class that keeps LPA* state for a Maze's fixed start and goal, so the
+        path can be repaired after edits instead of searching from scratch;
+        edits should go through set_blocked (edits made directly on the Maze
+        are noticed through its version and cause a full restart)
+    '''
+    def __init__(self, maze: 'Maze'):
+        ''' initializer method for a Replanner
+        Parameters:
+            maze: the Maze to plan on; its start and goal stay fixed
+        '''
+        self._maze  = maze
+        self._cols  = maze._num_cols
+        self._start = maze._flatIndex(maze.getStart().getPosition())
+        self._goal  = maze._flatIndex(maze.getGoal().getPosition())
+        self._goal_row, self._goal_col = divmod(self._goal, self._cols)
+        self._num_expansions = 0    # cells expanded by the last replan()
+        self._reset()
+
+    def _reset(self) -> None:
+        ''' helper method to (re)start LPA* from scratch on the current grid '''
+        maze = self._maze
+        self._open = bytearray(maze._codes().translate(maze._OPEN))
+        n = len(self._open)
+        self._g   = array('i', [INF]) * n
+        self._rhs = array('i', [INF]) * n
+        self._rhs[self._start] = 0
+        self._queue = IndexedPriorityQueue()
+        self._queue.insert(self._key(self._start), self._start)
+        self._version = maze._version
+
+    def _heuristic(self, i: int) -> int:
+        row, col = divmod(i, self._cols)
+        return abs(self._goal_row - row) + abs(self._goal_col - col)
+
+    def _key(self, i: int) -> Tuple[int, int]:
+        best = min(self._g[i], self._rhs[i])
+        return (best + self._heuristic(i), best) if best < INF else (INF, INF)
+
+    def _neighbors(self, i: int) -> List[int]:
+        ''' returns the in-grid cells N/S/W/E of cell i, blocked or not '''
+        cols, n = self._cols, len(self._open)
+        col = i % cols
+        return [j for j in (i - cols if i >= cols else -1,
+                            i + cols if i + cols < n else -1,
+                            i - 1 if col > 0 else -1,
+                            i + 1 if col + 1 < cols else -1) if j >= 0]
+
+    def _updateVertex(self, i: int) -> None:
+        ''' recomputes rhs(i), the best g of a neighbor plus one step, and puts
+            i on the queue if (and only if) it is now inconsistent '''
+        if i != self._start:
+            best = INF
+            if self._open[i]:
+                for j in self._neighbors(i):
+                    if self._open[j] and self._g[j] < best - 1:
+                        best = self._g[j] + 1
+            self._rhs[i] = best
+        if self._queue.contains(i):
+            self._queue.remove(i)
+        if self._g[i] != self._rhs[i]:
+            self._queue.insert(self._key(i), i)
+
+    def set_blocked(self, position: 'Position', flag: bool) -> None:
+        ''' method to block or unblock a cell of the Maze, marking the cells
+            whose rhs may have changed so the next replan() repairs them
+        Parameters:
+            position: Position of the cell to change
+            flag:     True to block the cell, False to make it empty
+        Raises:
+            ValueError as for Maze.set_blocked
+        '''
+        # checked before indexing, as a column past the edge would wrap
+        # around to a cell of the next row
+        self._maze._checkBlockable(position)
+        if self._version != self._maze._version:
+            self._maze.set_blocked(position, flag)
+            return      # replan() will restart from scratch anyway
+        i = self._maze._flatIndex(position)
+        if self._open[i] == (not flag):
+            return
+        self._maze.set_blocked(position, flag)
+        self._version = self._maze._version
+        self._open[i] = 0 if flag else 1
+        self._updateVertex(i)
+        for j in self._neighbors(i):
+            self._updateVertex(j)
+
+    def replan(self) -> 'List[Position] | None':
+        ''' method to bring the search up to date with all edits so far and
+            return a shortest path; only cells whose distance from the start
+            changed are expanded, which is recorded in num_expansions()
+        Returns:
+            the list of Positions from the start to the goal (inclusive), or
+            None if the goal can't be reached
+        '''
+        if self._version != self._maze._version:
+            self._reset()
+
+        g, rhs, queue, goal = self._g, self._rhs, self._queue, self._goal
+        expansions = 0
+        while not queue.is_empty() and \
+              (queue.min()._key < self._key(goal) or rhs[goal] != g[goal]):
+            i = queue.remove_min()._value
+            expansions += 1
+            if g[i] > rhs[i]:
+                g[i] = rhs[i]                       # becomes consistent
+                for j in self._neighbors(i):
+                    self._updateVertex(j)
+            else:
+                g[i] = INF                          # underconsistent: reset
+                self._updateVertex(i)
+                for j in self._neighbors(i):
+                    self._updateVertex(j)
+        self._num_expansions = expansions
+
+        if g[goal] >= INF:
+            return None
+        # walk back from the goal, always to the open neighbor with least g
+        path = [goal]
+        i = goal
+        while i != self._start:
+            i = min((j for j in self._neighbors(i) if self._open[j]), key = lambda j: g[j])
+            path.append(i)
+        path.reverse()
+        return [self._maze._positionOf(i) for i in path]
+
+    def num_expansions(self) -> int:
+        ''' returns the number of cells expanded by the last replan() '''
+        return self._num_expansions
+
+def main():
+    from Maze import Maze
+    import random
+    random.seed(46545)
+    maze = Maze(compact = True)
+    planner = maze.replanner()
+    path = planner.replan()
+    print(f"initial path: {len(path) - 1} steps, {planner.num_expansions()} expansions")
+
+    # block a cell in the middle of the path and repair it
+    planner.set_blocked(path[len(path) // 2], True)
+    path = planner.replan()
+    print(f"after blocking: {None if path is None else len(path) - 1} steps, "
+          f"{planner.num_expansions()} expansions")
+
+if __name__ == "__main__":
+    main()
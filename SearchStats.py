@@ -0,0 +1,82 @@
+# what a search did, recorded as it runs: counters filled in by the search
+# itself (in place of printing "The number of pushes"), and optional callbacks
+# for profiling that a search only calls when they have been registered
+from typing import Callable, Dict
+
+class SearchHooks:
+    ''' class holding the callbacks a search makes as it runs, each called with
+        the flat id (row * cols + col) of a cell; any of them may be left None,
+        and a search with no hooks at all pays only a test for None
+    '''
+    __slots__ = ("on_push", "on_expand", "on_goal")
+
+    def __init__(self, on_push:   Callable[[int], None] = None, \
+                       on_expand: Callable[[int], None] = None, \
+                       on_goal:   Callable[[int], None] = None):
+        ''' initializer method for a SearchHooks object
+        Parameters:
+            on_push:   called for every cell put on the frontier
+            on_expand: called for every cell whose neighbors are generated
+            on_goal:   called once with the goal when it is reached
+        '''
+        self.on_push   = on_push
+        self.on_expand = on_expand
+        self.on_goal   = on_goal
+
+class SearchStats:
+    ''' class recording the work done by one search '''
+    __slots__ = ("method", "found", "pushes", "pops", "expansions", "peak_frontier",
+                 "path_length", "path_cost", "wall_time", "memory_peak")
+
+    def __init__(self, method: str = ""):
+        ''' initializer method for a SearchStats object, all counts zero
+        Parameters:
+            method: name of the search the stats are for
+        '''
+        self.method:        str   = method
+        self.found:         bool  = False
+        self.pushes:        int   = 0       # cells put on the frontier
+        self.pops:          int   = 0       # cells taken off the frontier
+        self.expansions:    int   = 0       # cells whose neighbors were generated
+        self.peak_frontier: int   = 0       # largest frontier size seen
+        self.path_length:   int   = None    # steps from start to goal, if found
+        self.path_cost:     int   = None    # the sum of their weights (see Maze.set_weight)
+        self.wall_time:     float = 0.0     # seconds
+        self.memory_peak:   int   = None    # bytes, if traced with tracemalloc
+
+    def count(self, pushes: int, pops: int, expansions: int, peak_frontier: int) -> None:
+        ''' method for a search to add its counts (a search made of several
+            smaller ones, such as hierarchical A*, calls it once for each)
+        '''
+        self.pushes     += pushes
+        self.pops       += pops
+        self.expansions += expansions
+        self.peak_frontier = max(self.peak_frontier, peak_frontier)
+
+    def as_dict(self) -> Dict[str, object]:
+        ''' returns the stats as a dict, e.g., for writing out as JSON '''
+        return {name: getattr(self, name) for name in SearchStats.__slots__}
+
+    def __str__(self) -> str:
+        stats = f"{self.method}: pushes {self.pushes}, pops {self.pops}, " \
+                f"expansions {self.expansions}, peak frontier {self.peak_frontier}, " \
+                f"path length {self.path_length}, {self.wall_time * 1000:.2f} ms"
+        if self.path_cost is not None and self.path_cost != self.path_length:
+            stats += f", path cost {self.path_cost}"
+        if self.memory_peak is not None:
+            stats += f", peak memory {self.memory_peak} bytes"
+        return stats
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def main():
+    stats = SearchStats("example")
+    stats.count(pushes = 10, pops = 7, expansions = 6, peak_frontier = 4)
+    stats.count(pushes = 3, pops = 3, expansions = 2, peak_frontier = 2)
+    stats.found, stats.path_length, stats.wall_time = True, 8, 0.0012
+    print(stats)
+    print(stats.as_dict())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+# a solve service for other processes on the same host: an asyncio server on a
+# local TCP or Unix socket that reads one JSON request per line and answers
+# each with one JSON line (in the order they finish, tagged with their "id"), e.g.
+#   {"id": 1, "generate": {"rows": 500, "cols": 500, "seed": 3}, "method": "bfs"}
+#   {"id": 2, "file": "big.maze", "start": [0, 0], "goal": [99, 120], "timeout": 2}
+#   {"cancel": 2}
+# The searches run in worker processes, and each worker keeps the grids (and
+# Mazes) it has built, so repeated queries on the same grid skip loading or
+# generating it; requests for a grid always go to the same worker.
+#   python SolveService.py --unix /tmp/maze.sock --workers 4
+from Maze import *
+from Generators import generate
+from MazeFile import PackedGrid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+import argparse
+import asyncio
+import functools
+import json
+import os
+import socket
+
+################################################################################
+# worker side: every worker process attaches to the cancel board, a shared
+# memory block with one byte per request slot that the server sets to 1 to
+# stop the search running in that slot
+
+class Cancelled(Exception):
+    ''' raised inside a worker's search when its slot is flagged '''
+
+_board = None                                       # the cancel board
+_grids: 'OrderedDict[tuple, tuple]' = OrderedDict() # grid key -> (codes, rows, cols, start, goal)
+_mazes: 'OrderedDict[tuple, Maze]'  = OrderedDict() # (grid key, start, goal) -> Maze
+_cache_size = 8
+
+def _initWorker(board_name: str, cache_size: int) -> None:
+    global _board, _cache_size
+    _board = shared_memory.SharedMemory(name = board_name)
+    _cache_size = cache_size
+
+def _remember(cache: OrderedDict, key: tuple, value: object) -> None:
+    ''' adds an entry to one of the worker caches, dropping the least
+        recently used one if the cache is full '''
+    cache[key] = value
+    if len(cache) > _cache_size:
+        cache.popitem(last = False)
+
+def _integer(value: object, name: str) -> int:
+    ''' returns a request field that must be an integer, raising TypeError if
+        it is anything else (a bool included) '''
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(f"{name} must be an integer")
+    return value
+
+def _position(value: object, name: str) -> Tuple[int, int]:
+    ''' returns a request field that must be a [row, col] pair of integers,
+        as a tuple, raising TypeError if it is anything else '''
+    if not isinstance(value, (list, tuple)) or len(value) != 2 or \
+       any(isinstance(x, bool) or not isinstance(x, int) for x in value):
+        raise TypeError(f"{name} must be a [row, col] pair of integers")
+    return (value[0], value[1])
+
+def _endpoints(request: Dict[str, object]) -> Tuple[tuple, tuple]:
+    ''' returns the start and goal a request asks for (None for the grid's
+        own), raising TypeError if either is not a [row, col] pair '''
+    return tuple(None if request.get(name) is None else _position(request[name], name)
+                 for name in ("start", "goal"))
+
+def _gridKey(request: Dict[str, object]) -> tuple:
+    ''' returns the key identifying the grid a request is for (a file is
+        identified by its name and modification time, so edits are seen);
+        every field is checked and normalized, so the key is hashable and
+        equal specs give equal keys
+    Raises:
+        ValueError if the request names neither a file nor a generation spec,
+        or the grid size is not positive
+        TypeError if a field has the wrong type
+    '''
+    if "file" in request:
+        if not isinstance(request["file"], str):
+            raise TypeError("file must be a string")
+        path = os.path.abspath(request["file"])
+        return ("file", path, os.stat(path).st_mtime_ns)
+    spec = request.get("generate")
+    if not isinstance(spec, dict):
+        raise ValueError("a request needs a \"file\" or a \"generate\" spec")
+    rows, cols = _integer(spec.get("rows"), "rows"), _integer(spec.get("cols"), "cols")
+    if rows < 1 or cols < 1:
+        raise ValueError("rows and cols must be positive")
+    prop_blocked = spec.get("prop_blocked", 0.2)
+    if isinstance(prop_blocked, bool) or not isinstance(prop_blocked, (int, float)):
+        raise TypeError("prop_blocked must be a number")
+    generator = spec.get("generator", "random")
+    if not isinstance(generator, str):
+        raise TypeError("generator must be a string")
+    seed = spec.get("seed")
+    if seed is not None:
+        _integer(seed, "seed")
+    start = _position(spec.get("start", (0, 0)), "start")
+    goal  = _position(spec.get("goal", (rows - 1, cols - 1)), "goal")
+    return ("generate", rows, cols, float(prop_blocked), generator, seed, start, goal)
+
+def _grid(key: tuple) -> tuple:
+    ''' returns the grid for a key, building it if it isn't cached: the
+        contents codes with no start or goal marked, the size, and the
+        default start and goal (the file's, or those of the generation spec)
+    '''
+    if key in _grids:
+        _grids.move_to_end(key)
+        return _grids[key]
+    if key[0] == "file":
+        packed = PackedGrid(key[1], BLOCKED_CODE, EMPTY_CODE)
+        header = packed.header()
+        grid = (bytes(packed), header.rows, header.cols, tuple(header.start), tuple(header.goal))
+        packed.close()
+    else:
+        _, rows, cols, prop_blocked, generator, seed, start, goal = key
+        if generator not in Maze.GENERATORS:
+            raise ValueError(f"generator must be one of {', '.join(Maze.GENERATORS)}")
+        for row, col in (start, goal):
+            if not (0 <= row < rows and 0 <= col < cols):
+                raise ValueError(f"({row}, {col}) is outside the {rows} x {cols} grid")
+        cells = bytearray(rows * cols)
+        generate(cells, cols, start[0] * cols + start[1], goal[0] * cols + goal[1], \
+                 generator, prop_blocked, BLOCKED_CODE, EMPTY_CODE, seed)
+        grid = (bytes(cells), rows, cols, start, goal)
+    _remember(_grids, key, grid)
+    return grid
+
+def _maze(key: tuple, start: tuple, goal: tuple) -> Maze:
+    ''' returns a Maze over the grid for a key with the given start and goal
+        (tuples as from _endpoints, None for the grid's defaults), reusing a cached one if possible so
+        its component labels and other caches carry over
+    Raises:
+        ValueError if the start or goal is outside the grid or blocked
+    '''
+    codes, rows, cols, default_start, default_goal = _grid(key)
+    start = default_start if start is None else start
+    goal  = default_goal  if goal  is None else goal
+    maze_key = (key, start, goal)
+    if maze_key in _mazes:
+        _mazes.move_to_end(maze_key)
+        return _mazes[maze_key]
+    for row, col in (start, goal):
+        if not (0 <= row < rows and 0 <= col < cols):
+            raise ValueError(f"({row}, {col}) is outside the {rows} x {cols} grid")
+        if codes[row * cols + col] == BLOCKED_CODE:
+            raise ValueError(f"({row}, {col}) is blocked")
+    maze = Maze._fromCells(bytearray(codes), rows, cols, Position(*start), Position(*goal), "flat")
+    _remember(_mazes, maze_key, maze)
+    return maze
+
+def _solve(slot: int, request: Dict[str, object]) -> Dict[str, object]:
+    ''' worker function: runs one request
+    Parameters:
+        slot:    the request's byte on the cancel board
+        request: the decoded request
+    Returns:
+        the reply (without its id): {"ok": True, "path": ..., "stats": ...}
+        or {"ok": False, "error": ...}
+    '''
+    board = _board.buf
+    expansions = 0
+    def check(_: int) -> None:
+        # looking at the board on every 256th expansion keeps the hook cheap
+        nonlocal expansions
+        if expansions & 255 == 0 and board[slot]:
+            raise Cancelled()
+        expansions += 1
+
+    try:
+        method = request.get("method", "a_star")
+        if method not in Maze.SEARCHES:
+            raise ValueError(f"method must be one of {', '.join(Maze.SEARCHES)}")
+        maze = _maze(_gridKey(request), *_endpoints(request))
+        if board[slot]:
+            raise Cancelled()
+        stats = maze.search(method, hooks = SearchHooks(on_expand = check))
+        path = None
+        if stats.found and request.get("path", True):
+            cell, path = maze.getGoal(), []
+            while cell is not None:
+                path.append(list(cell.getPosition()))
+                cell = cell._parent
+            path.reverse()
+        return {"ok": True, "path": path, "stats": stats.as_dict()}
+    except Cancelled:
+        return {"ok": False, "error": "cancelled"}
+    except Exception as error:      # any failure is the client's reply
+        return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+################################################################################
+class SolveService:
+    ''' class running the server side of the service: it hands requests to
+        the workers, at most max_concurrent at a time, and stops any that
+        run past their timeout or are cancelled by the client
+    '''
+    def __init__(self, workers: int = None, max_concurrent: int = None, \
+                       timeout: float = 30.0, cache_size: int = 8):
+        ''' initializer method for a SolveService; the worker processes are
+            started by start()
+        Parameters:
+            workers:        number of worker processes (the number of CPUs if None)
+            max_concurrent: most requests handed to the workers at once (twice
+                            the number of workers if None); others wait
+            timeout:        seconds a request may take, including its wait
+                            for a turn, unless it asks for another timeout
+            cache_size:     number of grids, and of Mazes, each worker keeps
+        '''
+        self._num_workers = workers or os.cpu_count() or 1
+        self._max_concurrent = max_concurrent or 2 * self._num_workers
+        self._timeout    = timeout
+        self._cache_size = cache_size
+        self._workers: List[ProcessPoolExecutor] = []
+        self._board = None
+        self._slots: List[int] = []             # free cancel board slots
+        self._semaphore = None
+        self._server = None
+        self._connections = set()               # the tasks serving connections
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix: str = None) -> None:
+        ''' method to start the workers and listen for connections
+        Parameters:
+            host, port: the TCP address to listen on
+            unix:       the path of a Unix socket to listen on instead
+        '''
+        self._board = shared_memory.SharedMemory(create = True, size = self._max_concurrent)
+        self._board.buf[:] = bytes(self._max_concurrent)
+        self._slots = list(range(self._max_concurrent))
+        self._semaphore = asyncio.Semaphore(self._max_concurrent)
+        # one single-process pool per worker, so that a grid's requests can
+        # all be sent to the worker that has it cached
+        self._workers = [ProcessPoolExecutor(1, initializer = _initWorker, \
+                                             initargs = (self._board.name, self._cache_size))
+                         for _ in range(self._num_workers)]
+        if unix is not None:
+            self._server = await asyncio.start_unix_server(self._serve, unix)
+        else:
+            self._server = await asyncio.start_server(self._serve, host, port)
+
+    def sockets(self) -> list:
+        ''' returns the sockets the service is listening on '''
+        return self._server.sockets
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        ''' method to stop listening, stop any searches still running and shut
+            the workers down '''
+        self._server.close()
+        for connection in list(self._connections):
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions = True)
+        await self._server.wait_closed()
+        self._board.buf[:] = b"\x01" * self._max_concurrent
+        for worker in self._workers:
+            worker.shutdown(wait = True, cancel_futures = True)
+        self._board.close()
+        self._board.unlink()
+
+    async def solve(self, request: Dict[str, object]) -> Dict[str, object]:
+        ''' method to run one request on the workers
+        Parameters:
+            request: the decoded request (see the top of this file)
+        Returns:
+            the reply, without its id
+        '''
+        loop = asyncio.get_running_loop()
+        timeout = request.get("timeout", self._timeout)
+        try:
+            if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or \
+               not 0 < timeout < float("inf"):
+                raise ValueError("timeout must be a positive number")
+            key = _gridKey(request)
+            _endpoints(request)
+        except (OSError, TypeError, ValueError) as error:
+            return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        deadline = loop.time() + timeout
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": "timeout"}
+
+        slot = self._slots.pop()
+        self._board.buf[slot] = 0
+        worker = self._workers[hash(key) % len(self._workers)]
+        future = loop.run_in_executor(worker, _solve, slot, request)
+        # the slot (and the turn) is only given back once the worker is done
+        # with it, which after a timeout or cancellation is at its next look
+        # at the board
+        future.add_done_callback(lambda _: self._release(slot))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self._board.buf[slot] = 1
+            return {"ok": False, "error": "timeout"}
+        except asyncio.CancelledError:
+            self._board.buf[slot] = 1
+            raise
+
+    def _release(self, slot: int) -> None:
+        self._slots.append(slot)
+        self._semaphore.release()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        ''' method handling one connection: each request runs as its own task,
+            so a client can send several at once and cancel them by id '''
+        self._connections.add(asyncio.current_task())
+        tasks: Dict[object, asyncio.Task] = {}
+
+        def reply(message: Dict[str, object]) -> None:
+            if not writer.is_closing():
+                writer.write(json.dumps(message).encode() + b"\n")
+
+        async def answer(request_id: object, request: Dict[str, object]) -> None:
+            # every request gets a reply, whatever goes wrong in solving it
+            try:
+                message = await self.solve(request)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                message = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+            message["id"] = request_id
+            reply(message)
+
+        def finished(request_id: object, task: asyncio.Task) -> None:
+            # a task cancelled before it got to run never sees the
+            # CancelledError, so cancelled requests are answered here, as
+            # are any whose reply failed to go out
+            tasks.pop(request_id, None)
+            if task.cancelled():
+                reply({"ok": False, "error": "cancelled", "id": request_id})
+            elif task.exception() is not None:
+                error = task.exception()
+                reply({"ok": False, "error": f"{type(error).__name__}: {error}", "id": request_id})
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:        # the client is done sending; finish its requests
+                    await asyncio.gather(*tasks.values(), return_exceptions = True)
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("a request must be a JSON object")
+                    for field in ("id", "cancel"):
+                        if isinstance(request.get(field), (list, dict)):
+                            raise ValueError(f"{field} must be a string, number or null")
+                except ValueError as error:
+                    reply({"ok": False, "error": f"bad request: {error}"})
+                    continue
+                if "cancel" in request:
+                    task = tasks.get(request["cancel"])
+                    if task is not None:
+                        task.cancel()
+                    continue
+                request_id = request.get("id")
+                task = tasks[request_id] = asyncio.create_task(answer(request_id, request))
+                task.add_done_callback(functools.partial(finished, request_id))
+        except asyncio.CancelledError:
+            pass                    # the service is closing
+        finally:
+            for task in list(tasks.values()):
+                task.cancel()
+            writer.close()
+            self._connections.discard(asyncio.current_task())
+
+def query(requests: List[Dict[str, object]], host: str = "127.0.0.1", port: int = 8765, \
+          unix: str = None) -> List[Dict[str, object]]:
+    ''' function for a (blocking) client: sends requests over one connection
+        and waits for a reply to each
+    Parameters:
+        requests:   the requests, each a dict (see the top of this file); give
+                    them distinct ids to tell the replies apart
+        host, port: the TCP address of the service
+        unix:       the path of its Unix socket instead
+    Returns:
+        the replies, in the order they came back
+    '''
+    if unix is not None:
+        connection = socket.socket(socket.AF_UNIX)
+        connection.connect(unix)
+    else:
+        connection = socket.create_connection((host, port))
+    with connection, connection.makefile("rwb") as stream:
+        for request in requests:
+            stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        expected = sum("cancel" not in request for request in requests)
+        return [json.loads(stream.readline()) for _ in range(expected)]
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description = "Serve maze solving over a local socket.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "TCP address to listen on")
+    parser.add_argument("--port", type = int, default = 8765, help = "TCP port to listen on")
+    parser.add_argument("--unix", help = "Unix socket to listen on instead of TCP")
+    parser.add_argument("--workers", type = int, help = "worker processes (default: one per CPU)")
+    parser.add_argument("--max-concurrent", type = int,
+                        help = "most requests running at once (default: twice the workers)")
+    parser.add_argument("--timeout", type = float, default = 30.0,
+                        help = "default seconds allowed per request")
+    parser.add_argument("--cache-size", type = int, default = 8,
+                        help = "grids (and Mazes) each worker keeps in memory")
+    args = parser.parse_args(argv)
+
+    async def serve() -> None:
+        service = SolveService(args.workers, args.max_concurrent, args.timeout, args.cache_size)
+        await service.start(args.host, args.port, args.unix)
+        print(f"listening on {args.unix or f'{args.host}:{args.port}'}")
+        try:
+            await service.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
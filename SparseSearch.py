@@ -0,0 +1,193 @@
+# search kernels for grids too big to touch all at once (e.g., a maze file
+# searched in place through a memory map): they take the same arguments as the
+# FlatSearch kernels, but keep their state in dicts and sets rather than
+# arrays with one entry per cell, and decode a row of the grid only the first
+# time a search looks at it, so a search costs time and memory in proportion
+# to the cells it reaches rather than to the size of the grid
+from Stack import *
+from Queue import *
+from PriorityQueue import *
+from SearchStats import *
+from FlatSearch import _finish
+from array import array
+from typing import Dict, List, Tuple
+
+class SparseInts(dict):
+    ''' dict standing in for an int array with one entry per cell: cells that
+        were never set read as default, and only the cells that were set take
+        up memory
+    '''
+    __slots__ = ("_default",)
+
+    def __init__(self, default: int = 0):
+        super().__init__()
+        self._default = default
+
+    def __missing__(self, index: int) -> int:
+        return self._default
+
+################################################################################
+class RowReader:
+    ''' class giving the passable N/S/W/E neighbors of cells of a flat grid,
+        decoding each row (one slice of passable) the first time it's needed
+    '''
+    __slots__ = ("_passable", "_cols", "_num_rows", "_rows")
+
+    def __init__(self, passable: bytes, cols: int):
+        ''' initializer method for a RowReader; no row is read yet
+        Parameters:
+            passable: one byte per cell, non-zero if the cell may be moved
+                      into; only needs to support slicing (e.g., a GridView)
+            cols:     number of columns in the grid
+        '''
+        self._passable = passable
+        self._cols     = cols
+        self._num_rows = len(passable) // cols
+        self._rows: Dict[int, bytes] = dict()   # row -> its passable bytes
+
+    def passable(self, i: int) -> int:
+        ''' returns the passable byte of cell i '''
+        row, col = divmod(i, self._cols)
+        codes = self._rows.get(row)
+        if codes is None:
+            first = row * self._cols
+            codes = self._rows[row] = bytes(self._passable[first:first + self._cols])
+        return codes[col]
+
+    def neighbors(self, i: int) -> List[int]:
+        ''' returns the passable cells N/S/W/E of cell i, in that order '''
+        cols = self._cols
+        row, col = divmod(i, cols)
+        return [j for j in (i - cols if row > 0 else -1,
+                            i + cols if row + 1 < self._num_rows else -1,
+                            i - 1 if col > 0 else -1,
+                            i + 1 if col + 1 < cols else -1)
+                if j >= 0 and self.passable(j)]
+
+    def rows_read(self) -> int:
+        ''' returns the number of rows decoded so far '''
+        return len(self._rows)
+
+def sparse_dfs(passable: bytes, cols: int, start: int, goal: int, \
+               parents: array, stats: SearchStats = None, \
+               hooks: SearchHooks = None) -> Tuple[int, int]:
+    ''' function to perform DFS over flat cell ids as flat_dfs does, reading
+        rows on demand; see flat_dfs for a description of the parameters
+        (parents may also be a SparseInts)
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    return _sparseUninformed(Stack(), passable, cols, start, goal, parents, stats, hooks)
+
+def sparse_bfs(passable: bytes, cols: int, start: int, goal: int, \
+               parents: array, stats: SearchStats = None, \
+               hooks: SearchHooks = None) -> Tuple[int, int]:
+    ''' function to perform BFS over flat cell ids as flat_bfs does, reading
+        rows on demand; see sparse_dfs for the parameters
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    return _sparseUninformed(Queue(), passable, cols, start, goal, parents, stats, hooks)
+
+def _sparseUninformed(frontier: 'Stack | Queue', passable: bytes, cols: int, start: int, \
+                      goal: int, parents: array, stats: SearchStats, \
+                      hooks: SearchHooks) -> Tuple[int, int]:
+    ''' the body of sparse_dfs and sparse_bfs, which differ only in the frontier '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    grid = RowReader(passable, cols)
+    visited = {start}
+    frontier.push(start)
+    num_pushes, pops, peak, found = 1, 0, 1, -1
+    if on_push is not None: on_push(start)
+
+    while not frontier.is_empty():
+        i = frontier.pop()
+        pops += 1
+        if i == goal:
+            found = i
+            break
+        if on_expand is not None: on_expand(i)
+
+        fresh = [j for j in grid.neighbors(i) if j not in visited]
+        for j in fresh:
+            visited.add(j)
+            parents[j] = i
+        frontier.extend(fresh)
+        num_pushes += len(fresh)
+        if on_push is not None:
+            for j in fresh: on_push(j)
+        if num_pushes - pops > peak:
+            peak = num_pushes - pops
+
+    _finish(stats, hooks, found, num_pushes, pops, pops - (found >= 0), peak)
+    return found, num_pushes
+
+def sparse_a_star(passable: bytes, cols: int, start: int, goal: int, \
+                  parents: array, stats: SearchStats = None, \
+                  hooks: SearchHooks = None) -> Tuple[int, int]:
+    ''' function to perform A* over flat cell ids as flat_a_star does (the
+        Manhattan distance as the heuristic, each cell expanded at most
+        once), reading rows on demand; see sparse_dfs for the parameters
+    Returns:
+        a tuple (goal id or -1 if the goal can't be reached, number of pushes)
+    '''
+    on_push, on_expand = (None, None) if hooks is None else (hooks.on_push, hooks.on_expand)
+    grid = RowReader(passable, cols)
+    cost: Dict[int, int] = {start: 0}   # g(n) of each cell seen so far
+    closed = set()                      # cells already expanded
+    goal_row, goal_col = divmod(goal, cols)
+    to_explore = IndexedPriorityQueue()
+
+    row, col = divmod(start, cols)
+    h = abs(goal_row - row) + abs(goal_col - col)
+    to_explore.insert((h, h), start)
+    num_pushes, pops, peak, found = 1, 0, 1, -1
+    if on_push is not None: on_push(start)
+
+    while not to_explore.is_empty():
+        i = to_explore.remove_min()._value
+        pops += 1
+        closed.add(i)
+        if i == goal:
+            found = i
+            break
+        if on_expand is not None: on_expand(i)
+
+        updated_cost = cost[i] + 1
+        for j in grid.neighbors(i):
+            if j not in closed and updated_cost < cost.get(j, updated_cost + 1):
+                cost[j] = updated_cost
+                row, col_j = divmod(j, cols)
+                h = abs(goal_row - row) + abs(goal_col - col_j)
+                to_explore.update_or_insert((updated_cost + h, h), j)
+                parents[j] = i
+                num_pushes += 1
+                if on_push is not None: on_push(j)
+        if len(to_explore) > peak:
+            peak = len(to_explore)
+
+    _finish(stats, hooks, found, num_pushes, pops, pops - (found >= 0), peak)
+    return found, num_pushes
+
+# the sparse counterpart of each FlatSearch kernel that has one
+SPARSE_KERNELS = {"flat_dfs": sparse_dfs, "flat_bfs": sparse_bfs, "flat_a_star": sparse_a_star}
+
+def main():
+    # a 3x4 grid with a wall down the middle column except at the bottom
+    #   S . X .
+    #   . . X .
+    #   . . . G
+    passable = bytes([0, 1, 0, 1,
+                      1, 1, 0, 1,
+                      1, 1, 1, 1])
+    for kernel in (sparse_dfs, sparse_bfs, sparse_a_star):
+        parents = SparseInts(-1)
+        stats = SearchStats(kernel.__name__)
+        found, _ = kernel(passable, 4, 0, 11, parents, stats)
+        path = [found]
+        while path[-1] != 0:
+            path.append(parents[path[-1]])
+        print(f"{kernel.__name__}: path {path[::-1]}, {stats.expansions} expansions")
+
+if __name__ == "__main__":
+    main()
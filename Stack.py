@@ -1,6 +1,6 @@
 # see https://medium.com/@steveYeah/using-generics-in-python-99010e5056eb
-from typing import Generic, TypeVar
-from LinkedList import *
+from typing import Generic, List, TypeVar
+from array import array
 
 T = TypeVar("T")  # allows variable T to be used to represent a generic type
 
@@ -10,12 +10,22 @@ class EmptyError(Exception):
         self.message = message
 
 class Stack(Generic[T]):
-    ''' class to implement a stack ADT using a Python list '''
+    ''' class to implement a stack ADT using a growable buffer, either a Python
+        list or (for integer items such as cell ids) a typed array; a stack
+        only ever works at its right end, so unlike Queue it never needs to
+        wrap around
+    '''
 
-    __slots__ = ("_data")
+    __slots__ = ("_data", "_typecode")
 
-    def __init__(self):
-        self._data: list[T] = LinkedList()   # typing _data to be a list of type T
+    def __init__(self, typecode: str = None):
+        ''' initializer method for a Stack object
+        Parameters:
+            typecode: optional array typecode (e.g., 'l') to store items in a
+                      typed array.array instead of a Python list
+        '''
+        self._typecode = typecode
+        self._data: list[T] = [] if typecode is None else array(typecode)
 
     def __len__(self) -> int:
         ''' allows the len function to be called using an ArrayStack object, e.g.,
@@ -33,8 +43,17 @@ class Stack(Generic[T]):
         Returns:
             None
         '''
-        self._data.add_right(item)
-        #self._data.append(item)
+        self._data.append(item)
+
+    def extend(self, items: 'list[T]') -> None:
+        ''' pushes every item of a list (or tuple) onto the stack, in order, so
+            the last item ends up on top
+        Parameters:
+            items: a list or tuple of items
+        Returns:
+            None
+        '''
+        self._data.extend(items)
 
     def pop(self) -> T:
         ''' removes the topmost element from the stack and returns that element
@@ -45,7 +64,16 @@ class Stack(Generic[T]):
         '''
         if len(self._data) == 0:
             raise EmptyError('Error in ArrayStack.pop(): stack is empty')
-        return self._data.remove_right()  # calling Python list pop()
+        return self._data.pop()  # calling Python list pop()
+
+    def drain(self) -> List[T]:
+        ''' removes every element from the stack
+        Returns:
+            a list of the removed items, topmost first
+        '''
+        items = list(reversed(self._data))
+        del self._data[:]
+        return items
 
     def top(self) -> T:
         ''' returns the topmost element from the stack without modifying the stack
@@ -56,7 +84,7 @@ class Stack(Generic[T]):
         '''
         if len(self._data) == 0:
             raise EmptyError('Error in ArrayStack.top(): stack is empty')
-        return self._data._tail
+        return self._data[-1]
 
     def is_empty(self) -> bool:
         ''' indicates whether the stack is empty
@@ -68,14 +96,8 @@ class Stack(Generic[T]):
     def __str__(self) -> str:
         ''' returns an str implementation of the ArrayStack '''
         string = "---top---\n"
-        a = self._data._tail
-        while a != None:
-            #print(f"{a.data}")
-            string += f"{a.data}\n"
-            a = a.prev
-            #print(f"{a.data}")
-            #string += f"{a.data} + \n"
-            #string += str(self._data[i]) + "\n"
+        for i in range(len(self._data) - 1, -1, -1):
+            string += f"{self._data[i]}\n"
         string += "---bot---"
         return string
 
@@ -108,6 +130,11 @@ def main():
     print("Checking if the stack is empty:")
     print(MyStack.is_empty())
 
+    IdStack = Stack('l')
+    IdStack.extend([1, 2, 3])
+    print("Draining a stack of cell ids:")
+    print(IdStack.drain())
+
 
 if __name__ == "__main__":
     main()
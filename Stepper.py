@@ -0,0 +1,295 @@
+# searches that can be paused: each kernel here is a generator that gives back
+# control after a number of expansions, so a caller can enforce a deadline or
+# an expansion budget, interleave many searches, or stop early and take the
+# path to the closest cell reached so far
+from Stack import *
+from Queue import *
+from PriorityQueue import *
+from Adjacency import *
+from array import array
+from typing import Generator, List, Tuple, Union
+import time
+
+# what a stepping kernel yields after each batch of expansions: the number of
+# expansions so far, and the id of the reached cell closest (by Manhattan
+# distance) to the goal; sending it a number sets the size of the next batch
+Progress = Tuple[int, int]
+
+def iter_dfs(passable: bytes, cols: int, start: int, goal: int, parents: array, \
+             batch: int, adjacency: Adjacency = None) -> Generator[Progress, int, Tuple[int, int]]:
+    ''' generator performing DFS over flat cell ids (as flat_dfs does), pausing
+        after every batch expansions
+    Parameters:
+        passable:  one byte per cell, non-zero if the cell may be moved into
+                   (i.e., it is neither blocked nor the start)
+        cols:      number of columns in the grid
+        start:     id of the start cell
+        goal:      id of the goal cell
+        parents:   int array (one entry per cell) that receives the id of the
+                   cell each reached cell was reached from
+        batch:     number of expansions before the first pause
+        adjacency: Adjacency of the grid to take neighbors from (one is
+                   built from passable if None)
+    Yields:
+        the Progress so far; send() a number to change the next batch size
+    Returns:
+        (as StopIteration.value) a tuple (goal id or -1 if the goal can't be
+        reached, number of expansions)
+    '''
+    return (yield from _iterUninformed(Stack(), passable, cols, start, goal, parents, batch, adjacency))
+
+def iter_bfs(passable: bytes, cols: int, start: int, goal: int, parents: array, \
+             batch: int, adjacency: Adjacency = None) -> Generator[Progress, int, Tuple[int, int]]:
+    ''' generator performing BFS over flat cell ids (as flat_bfs does), pausing
+        after every batch expansions; see iter_dfs for the parameters
+    '''
+    return (yield from _iterUninformed(Queue(), passable, cols, start, goal, parents, batch, adjacency))
+
+def _iterUninformed(frontier: 'Stack | Queue', passable: bytes, cols: int, start: int, \
+                    goal: int, parents: array, batch: int, adjacency: Adjacency) \
+                    -> Generator[Progress, int, Tuple[int, int]]:
+    ''' the body of iter_dfs and iter_bfs, which differ only in the frontier '''
+    n = len(passable)
+    if adjacency is None:
+        adjacency = Adjacency(passable, cols)
+    offsets, targets = adjacency.offsets, adjacency.targets
+    goal_row, goal_col = divmod(goal, cols)
+    row, col = divmod(start, cols)
+    best, best_h = start, abs(goal_row - row) + abs(goal_col - col)
+    visited = bytearray(n)
+    frontier.push(start)
+    visited[start] = 1
+    expansions, left = 0, batch
+
+    while not frontier.is_empty():
+        i = frontier.pop()
+        if i == goal:
+            return i, expansions
+        fresh = [j for j in targets[offsets[i]:offsets[i + 1]] if passable[j] and not visited[j]]
+        for j in fresh:
+            visited[j] = 1
+            parents[j] = i
+            row, col = divmod(j, cols)
+            h = abs(goal_row - row) + abs(goal_col - col)
+            if h < best_h:
+                best, best_h = j, h
+        frontier.extend(fresh)
+
+        expansions += 1
+        left -= 1
+        if left == 0:
+            left = (yield expansions, best) or batch
+    return -1, expansions
+
+def iter_a_star(passable: bytes, cols: int, start: int, goal: int, parents: array, \
+                batch: int, adjacency: Adjacency = None) -> Generator[Progress, int, Tuple[int, int]]:
+    ''' generator performing A* over flat cell ids (as flat_a_star does),
+        pausing after every batch expansions; see iter_dfs for the parameters
+    '''
+    n = len(passable)
+    if adjacency is None:
+        adjacency = Adjacency(passable, cols)
+    offsets, targets = adjacency.offsets, adjacency.targets
+    cost = array('i', [-1]) * n
+    closed = bytearray(n)
+    goal_row, goal_col = divmod(goal, cols)
+    to_explore = IndexedPriorityQueue()
+
+    row, col = divmod(start, cols)
+    h = abs(goal_row - row) + abs(goal_col - col)
+    best, best_h = start, h
+    cost[start] = 0
+    to_explore.insert((h, h), start)
+    expansions, left = 0, batch
+
+    while not to_explore.is_empty():
+        i = to_explore.remove_min()._value
+        closed[i] = 1
+        if i == goal:
+            return i, expansions
+
+        updated_cost = cost[i] + 1
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if passable[j] and not closed[j] and \
+               (cost[j] < 0 or updated_cost < cost[j]):
+                cost[j] = updated_cost
+                row, col_j = divmod(j, cols)
+                h = abs(goal_row - row) + abs(goal_col - col_j)
+                to_explore.update_or_insert((updated_cost + h, h), j)
+                parents[j] = i
+                if h < best_h:
+                    best, best_h = j, h
+
+        expansions += 1
+        left -= 1
+        if left == 0:
+            left = (yield expansions, best) or batch
+    return -1, expansions
+
+# the searches that can be stepped, by Maze method name
+KERNELS = {"dfs": iter_dfs, "bfs": iter_bfs, "a_star": iter_a_star}
+
+################################################################################
+class BudgetExhausted:
+    ''' class for the result of a search stopped by its budget before it
+        finished (as opposed to None, which means the goal can't be reached)
+    '''
+    __slots__ = ("expansions", "elapsed", "best", "distance", "path")
+
+    def __init__(self, expansions: int, elapsed: float, best: 'Position', \
+                       distance: int, path: 'List[Position]'):
+        self.expansions: int   = expansions     # expansions done before stopping
+        self.elapsed:    float = elapsed        # seconds spent searching
+        self.best:  'Position' = best           # reached cell closest to the goal
+        self.distance:   int   = distance       # its Manhattan distance to the goal
+        self.path: 'List[Position]' = path      # from the start to best
+
+    def __str__(self) -> str:
+        return f"budget exhausted after {self.expansions} expansions ({self.elapsed * 1000:.2f} ms); " \
+               f"closest cell {tuple(self.best)}, {self.distance} from the goal"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+################################################################################
+class Stepper:
+    ''' class running one of the stepping kernels on a Maze a batch of
+        expansions at a time; it keeps its own parent array, so several
+        Steppers on the same Maze can be interleaved
+    '''
+    def __init__(self, maze: 'Maze', method: str = "a_star", batch: int = 100):
+        ''' initializer method for a Stepper; no search is done yet
+        Parameters:
+            maze:   the Maze to search (between its start and goal)
+            method: the search to run, one of KERNELS
+            batch:  default number of expansions per step
+        Raises:
+            ValueError if method is not one of KERNELS or batch is less than 1
+        '''
+        if method not in KERNELS:
+            raise ValueError(f"method must be one of {', '.join(KERNELS)}")
+        if batch < 1:
+            raise ValueError("batch must be at least 1")
+        self._maze   = maze
+        self._kernel = KERNELS[method]
+        self._batch  = batch
+        self._start  = maze._flatIndex(maze.getStart().getPosition())
+        self._goal   = maze._flatIndex(maze.getGoal().getPosition())
+        self._parents = array('i', [-1]) * (maze._num_rows * maze._num_cols)
+        self._search = None             # the kernel's generator, once started
+        self._expansions = 0
+        self._best    = self._start
+        self._elapsed = 0.0
+        self._found   = None            # goal id or -1 once finished
+
+    def done(self) -> bool:
+        ''' indicates whether the search has finished (found the goal or
+            shown it can't be reached) '''
+        return self._found is not None
+
+    def expansions(self) -> int:
+        ''' returns the number of expansions done so far '''
+        return self._expansions
+
+    def step(self, expansions: int = None) -> bool:
+        ''' method to run the search for one batch of expansions
+        Parameters:
+            expansions: size of this batch (the Stepper's default if None)
+        Returns:
+            True if the search has finished, False o/w
+        '''
+        if self.done():
+            return True
+        began = time.perf_counter()
+        try:
+            if self._search is None:
+                maze = self._maze
+                if maze._ruledOut():
+                    self._found = -1
+                    return True
+                self._search = self._kernel(maze._passable(), maze._num_cols, self._start, \
+                                            self._goal, self._parents, expansions or self._batch, \
+                                            maze.adjacency())
+                self._expansions, self._best = next(self._search)
+            else:
+                self._expansions, self._best = self._search.send(expansions or self._batch)
+        except StopIteration as stop:
+            self._found, self._expansions = stop.value
+            if self._found < 0:
+                self._maze._exhausted()
+        finally:
+            self._elapsed += time.perf_counter() - began
+        return self.done()
+
+    def run(self, max_expansions: int = None, time_limit: float = None) \
+            -> "Union['Cell', None, BudgetExhausted]":
+        ''' method to step the search until it finishes or a budget runs out
+            (budgets count from this call, and are checked between batches)
+        Parameters:
+            max_expansions: most expansions to do in this call (no limit if None)
+            time_limit:     most seconds to spend in this call (no limit if None)
+        Returns:
+            as for result()
+        '''
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        target = None if max_expansions is None else self._expansions + max_expansions
+        while not self.done():
+            if target is not None and self._expansions >= target:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            batch = self._batch if target is None else min(self._batch, target - self._expansions)
+            self.step(batch)
+        return self.result()
+
+    def best_path(self) -> 'List[Position]':
+        ''' returns the path from the start to the reached cell closest to the
+            goal (the whole path, once the goal has been found) '''
+        i = self._goal if self._found is not None and self._found >= 0 else self._best
+        path = [i]
+        while path[-1] != self._start:
+            path.append(self._parents[path[-1]])
+        path.reverse()
+        return [self._maze._positionOf(i) for i in path]
+
+    def result(self) -> "Union['Cell', None, BudgetExhausted]":
+        ''' method to report where the search stands
+        Returns:
+            the Maze goal Cell (linked to its parents for showPath) if the
+            search found it, None if the goal can't be reached, or a
+            BudgetExhausted if the search hasn't finished
+        '''
+        maze = self._maze
+        if self._found is None:
+            row, col = divmod(self._best, maze._num_cols)
+            goal = maze.getGoal().getPosition()
+            return BudgetExhausted(self._expansions, self._elapsed, maze._positionOf(self._best), \
+                                   abs(goal.row - row) + abs(goal.col - col), self.best_path())
+        if self._found < 0:
+            return None
+        maze._linkPath(self._goal, self._start, self._parents)
+        maze.getStart()._parent = None
+        return maze.getGoal()
+
+def main():
+    from Maze import Maze, Position
+    # interleave three searches on different mazes, 50 expansions at a time,
+    # until the first one finishes
+    mazes = [Maze(60, 60, 0.2, Position(0, 0), Position(59, 59), compact = True, \
+                  generator = "random", seed = seed) for seed in range(3)]
+    steppers = [Stepper(maze, method, batch = 50) for maze, method in zip(mazes, KERNELS)]
+    while not any(stepper.done() for stepper in steppers):
+        for stepper in steppers:
+            stepper.step()
+    for method, stepper in zip(KERNELS, steppers):
+        result = stepper.result()
+        print(f"{method}: {result if isinstance(result, BudgetExhausted) else 'finished'}")
+
+    # a time-boxed solve
+    stepper = Stepper(Maze(300, 300, 0.2, Position(0, 0), Position(299, 299), compact = True, \
+                           generator = "kruskal", seed = 1), "a_star")
+    print(stepper.run(time_limit = 0.01))
+    print(f"finished: {stepper.run() is not None}, {stepper.expansions()} expansions")
+
+if __name__ == "__main__":
+    main()